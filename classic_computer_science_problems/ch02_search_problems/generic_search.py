@@ -4,17 +4,26 @@ A module containing classes and search algorithm functions.
 
 n.b.: Need custom priority queue class defined to act like max heap (i.e. pops out the highest priority item first)
 because the built-in `queue.PriorityQueue` class is min heap (i.e. pops out the lowest priority item first).
+
+Every search function takes a `lean` flag. By default, each state pushed onto the frontier is wrapped in a `Node`.
+With `lean=True`, the frontier holds bare states and a dictionary maps each reached state to the state it was reached from;
+`Node`s are only built for the states along the path to the goal once it is found,
+so `node_to_path` works on the result either way.
 """
 
 from typing import *
 from collections import deque
 from heapq import heappush, heappop
+from itertools import count, repeat
+from dataclasses import dataclass
 T = TypeVar('T')
 
 
 class Node(Generic[T]):
     """A wrapper around a state that keeps track of how we got from one state to another."""
     
+    __slots__ = ('state', 'parent', 'cost', 'heuristic')	# no per-instance `__dict__`
+    
     def __init__(self, state: T, parent: 'Node' = None, cost: float = 0.0, heuristic: float = 0.0) -> None:
         self.state: T = state
         self.parent: Optional[Node] = parent
@@ -25,7 +34,8 @@ class Node(Generic[T]):
         if not isinstance(other, Node):
             return NotImplemented
         else:
-            return (self.cost + self.heuristic) < (other.cost + other.heuristic)
+            # prefer the lower total cost, then the lower heuristic
+            return (self.cost + self.heuristic, self.heuristic) < (other.cost + other.heuristic, other.heuristic)
 
 
 def node_to_path(node: Node[T]) -> list[T]:
@@ -40,6 +50,19 @@ def node_to_path(node: Node[T]) -> list[T]:
     return path
 
 
+def _rebuild_nodes(parents: dict[T, Optional[T]], goal: T, costs: Optional[dict[T, float]] = None) -> Node[T]:
+    """
+    Build the chain of `Node`s from the initial state to `goal` out of the `parents` dictionary of a lean search.
+    """
+    states: list[T] = [goal]
+    while (parent := parents[states[-1]]) is not None:
+        states.append(parent)
+    node: Optional[Node[T]] = None
+    for state in reversed(states):
+        node = Node(state, node, costs[state] if costs else 0.0)
+    return node
+
+
 class PriorityQueue(Generic[T]):
     """ A queue that keeps its elements in an internal order so that the first element popped out is always the highest priority element."""
     
@@ -52,6 +75,9 @@ class PriorityQueue(Generic[T]):
     def pop(self) -> T:
         return heappop(self._container)
     
+    def __len__(self) -> int:
+        return len(self._container)
+    
     def __repr__(self) -> str:
         return f"{type(self).__name__}({repr(self._container)})"
     
@@ -61,12 +87,16 @@ class PriorityQueue(Generic[T]):
 
 def depth_first_search(initial: T,
                        goal_test: Callable[T, bool],
-                       successors: Callable[T, Iterator[T]]
+                       successors: Callable[T, Iterator[T]],
+                       lean: bool = False
                        ) -> Optional[Node[T]]:
     """
     Implement a depth-first search algorithm
     using Python's built-in list to stack next states to explore.
     """
+    if lean:
+        return _lean_graph_search(initial, goal_test, successors, depth_first=True)
+    
     frontier: list[Node] = []
     explored: set[T] = {initial}
     
@@ -87,12 +117,16 @@ def depth_first_search(initial: T,
 
 def breadth_first_search(initial: T,
                          goal_test: Callable[T, bool],
-                         successors: Callable[T, Iterator[T]]
+                         successors: Callable[T, Iterator[T]],
+                         lean: bool = False
                          ) -> Optional[Node[T]]:
     """
     Implement a breadth-first search algorithm
     using `collections.deque` class to queue next states to explore.
     """
+    if lean:
+        return _lean_graph_search(initial, goal_test, successors, depth_first=False)
+    
     frontier: deque[Node] = deque()
     explored: set[T] = {initial}
     
@@ -110,39 +144,115 @@ def breadth_first_search(initial: T,
                 explored.add(child)
                 frontier.append(Node(child, current_node))
     return None
+
+
+def _lean_graph_search(initial: T,
+                       goal_test: Callable[T, bool],
+                       successors: Callable[T, Iterator[T]],
+                       depth_first: bool
+                       ) -> Optional[Node[T]]:
+    """
+    Depth-first (stack) or breadth-first (queue) search keeping only bare states on the frontier.
+    `parents` doubles as the explored set.
+    """
+    frontier: deque[T] = deque([initial])
+    pop: Callable[[], T] = frontier.pop if depth_first else frontier.popleft
+    parents: dict[T, Optional[T]] = {initial: None}
     
+    while frontier:
+        current_state: T = pop()
+        
+        if goal_test(current_state):
+            return _rebuild_nodes(parents, current_state)
+        
+        for child in successors(current_state):
+            if child not in parents:
+                parents[child] = current_state
+                frontier.append(child)
+    return None
     
 
+
+@dataclass
+class SearchStats:
+    """ Counters filled in by `a_star_search`. """
+    expanded: int = 0	# states whose successors were generated
+    generated: int = 0	# frontier pushes
+    stale: int = 0	# frontier entries skipped because a cheaper path to their state had been found since
+    reopened: int = 0	# expanded states pushed again with a cheaper cost (only with `consistent=False`)
+
+
 def a_star_search(initial: T, goal_test: Callable[T, bool],
-                  successors: Callable[T, Iterator[T]],
-                  heuristic: Callable[T, float]
+                  successors: Callable[T, Iterator[T]] | Callable[T, Iterator[tuple[T, float]]],
+                  heuristic: Callable[T, float],
+                  lean: bool = False,
+                  weighted: bool = False,
+                  consistent: bool = False,
+                  stats: Optional[SearchStats] = None
                   ) -> Optional[Node[T]]:
     """
-    Implement an A* starch algorithm using `queue.PriorityQueue` to
-    keep Node's in order of priority, which is its total cost (cost + heuristic).
+    Implement an A* starch algorithm using a heap to
+    keep states in order of priority, which is its total cost (cost + heuristic).
+    Ties are broken in favor of the lower heuristic (i.e. the state that looks closer to the goal),
+    then in insertion order.
+    
+    weighted: bool
+        if True, `successors` yields (state, step cost) pairs; otherwise every step costs 1.0
+    consistent: bool
+        if True, the heuristic is assumed consistent (never drops by more than the step cost),
+        so an expanded state is closed for good; otherwise (the default, which is correct with any admissible heuristic)
+        it is reopened when a cheaper path to it turns up
+    stats: SearchStats
+        if given, its counters are incremented as the search runs
+    
+    Frontier entries whose state has been reached more cheaply since they were pushed are skipped when popped.
     """
-    frontier: PriorityQueue[Node[T]] = PriorityQueue()
-    explored: dict[T, float] = {initial: 0.0}
+    if stats is None:
+        stats = SearchStats()
+    
+    # heap entries are (total cost, heuristic, insertion order, cost, state, node);
+    # in lean mode `node` is None and `parents` keeps track of the path instead
+    frontier: list[tuple[float, float, int, float, T, Optional[Node[T]]]] = []
+    tiebreaker: Iterator[int] = count()
+    explored: dict[T, float] = {initial: 0.0}	# cheapest known cost to each reached state
+    closed: set[T] = set()
+    parents: dict[T, Optional[T]] = {initial: None}
     
-    frontier.push(
-        Node(initial, None, 0.0, heuristic(initial))
-    )
+    h: float = heuristic(initial)
+    heappush(frontier, (h, h, next(tiebreaker), 0.0, initial, None if lean else Node(initial, None, 0.0, h)))
+    stats.generated += 1
     
     while frontier:
-        current_node: Node[T] = frontier.pop()
-        current_state: T = current_node.state
+        _, _, _, current_cost, current_state, current_node = heappop(frontier)
+        if current_cost > explored[current_state]:
+            stats.stale += 1
+            continue
         
         if goal_test(current_state):
-            return current_node
+            return _rebuild_nodes(parents, current_state, explored) if lean else current_node
         
-        for child in successors(current_state):
-            new_cost: float = current_node.cost + 1.0
+        closed.add(current_state)
+        stats.expanded += 1
+        
+        children: Iterable[tuple[T, float]] = (
+            successors(current_state) if weighted else zip(successors(current_state), repeat(1.0))
+        )
+        for child, step_cost in children:
+            if consistent and child in closed:
+                continue
+            new_cost: float = current_cost + step_cost
             
             if child not in explored or explored[child] > new_cost:
+                if child in closed:
+                    closed.remove(child)
+                    stats.reopened += 1
                 explored[child] = new_cost
-                frontier.push(
-                    Node(child, current_node, new_cost, heuristic(child))
-                )
+                h = heuristic(child)
+                if lean:
+                    parents[child] = current_state
+                    child_node: Optional[Node[T]] = None
+                else:
+                    child_node = Node(child, current_node, new_cost, h)
+                heappush(frontier, (new_cost + h, h, next(tiebreaker), new_cost, child, child_node))
+                stats.generated += 1
     return None
-
-    
\ No newline at end of file
@@ -0,0 +1,179 @@
+# grid_search.py
+"""
+A script implementing an A* search specialized for `maze.Maze`, plus a batch API answering many path queries on the same maze.
+
+`generic_search.a_star_search` knows nothing about the maze: every state is a `MazeLocation` namedtuple,
+every step allocates a list of successors, and the Euclidean heuristic of `maze.manhattan_distance`
+underestimates distances on a 4-connected grid so much that nearly every open cell gets expanded.
+
+`grid_a_star` works on the integer cell ids of `Maze.cells` instead:
+
+    - the heap holds (total cost, heuristic, cost, cell id) tuples of plain numbers,
+    - neighbors are found by adding `Maze.offsets` to the cell id (the blocked border makes bounds checks unnecessary),
+    - the heuristic is the true Manhattan distance, which is exact on an open grid,
+    - ties are broken in favor of the lower heuristic, so on open ground the search heads straight for the goal.
+
+The Manhattan distance is consistent on a 4-connected grid, so each cell is expanded at most once.
+
+`solve_many` hands queries out to a pool of processes (threads would not help pure-Python code because of the GIL),
+each of which receives the maze once.
+"""
+from typing import *
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+import os
+
+from generic_search import Node, node_to_path
+from maze import Maze, MazeLocation, BLOCKED_CODE
+
+Path = list[MazeLocation]
+
+
+def grid_a_star(maze: Maze,
+                start: Optional[MazeLocation] = None,
+                goal: Optional[MazeLocation] = None
+                ) -> Optional[Node[MazeLocation]]:
+    """
+    Find a shortest path from `start` to `goal` (the maze's own by default) with A* on cell ids.
+    Return the last `Node` of the path like `generic_search.a_star_search`, or None if there is no path.
+    """
+    start = maze.start if start is None else start
+    goal = maze.goal if goal is None else goal
+    cells: bytearray = maze.cells
+    offsets: tuple[int, ...] = maze.offsets
+    stride: int = maze.columns + 2
+    first, last = maze.cell_id(start), maze.cell_id(goal)
+    if cells[first] == BLOCKED_CODE or cells[last] == BLOCKED_CODE:
+        return None
+    goal_row, goal_column = divmod(last, stride)
+
+    def heuristic(cell: int) -> int:
+        row, column = divmod(cell, stride)
+        return abs(row - goal_row) + abs(column - goal_column)
+
+    costs: dict[int, int] = {first: 0}
+    parents: dict[int, int] = {first: -1}
+    h: int = heuristic(first)
+    frontier: list[tuple[int, int, int, int]] = [(h, h, 0, first)]
+
+    while frontier:
+        _, _, cost, cell = heappop(frontier)
+        if cost > costs[cell]:
+            continue	# stale entry
+        if cell == last:
+            return _to_nodes(maze, parents, costs, last)
+        new_cost: int = cost + 1
+        for offset in offsets:
+            child: int = cell + offset
+            if cells[child] != BLOCKED_CODE and new_cost < costs.get(child, new_cost + 1):
+                costs[child] = new_cost
+                parents[child] = cell
+                h = heuristic(child)
+                heappush(frontier, (new_cost + h, h, new_cost, child))
+    return None
+
+
+def _to_nodes(maze: Maze, parents: dict[int, int], costs: dict[int, int], last: int) -> Node[MazeLocation]:
+    """ Build the chain of `Node`s from the start to cell `last` out of `parents`. """
+    cells: list[int] = [last]
+    while parents[cells[-1]] >= 0:
+        cells.append(parents[cells[-1]])
+    node: Optional[Node[MazeLocation]] = None
+    for cell in reversed(cells):
+        node = Node(maze.location(cell), node, float(costs[cell]))
+    return node
+
+
+# the maze shared by all tasks within a worker process, set by `_init_worker()`
+_shared_maze: Optional[Maze] = None
+
+
+def _init_worker(maze: Maze) -> None:
+    global _shared_maze
+    _shared_maze = maze
+
+
+def _solve_chunk(maze: Maze, queries: list[tuple[MazeLocation, MazeLocation]]) -> list[Optional[Path]]:
+    return [
+        node_to_path(node) if (node := grid_a_star(maze, start, goal)) else None
+        for start, goal in queries
+    ]
+
+
+def _solve_chunk_in_worker(queries: list[tuple[MazeLocation, MazeLocation]]) -> list[Optional[Path]]:
+    return _solve_chunk(_shared_maze, queries)
+
+
+def solve_many(maze: Maze,
+               queries: Iterable[tuple[MazeLocation, MazeLocation]],
+               workers: Optional[int] = None,
+               chunk_size: int = 64
+               ) -> list[Optional[Path]]:
+    """
+    Answer every (start, goal) query on `maze` with `grid_a_star` and return the paths (None where there is none)
+    in the order of `queries`.
+
+    workers: int
+        number of processes (`os.cpu_count()` by default); with 1 everything runs in this process
+    chunk_size: int
+        number of queries sent to a worker at a time
+    """
+    queries = [(MazeLocation(*start), MazeLocation(*goal)) for start, goal in queries]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(queries) <= chunk_size:
+        return _solve_chunk(maze, queries)
+
+    chunks: list[list[tuple[MazeLocation, MazeLocation]]] = [
+        queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)
+    ]
+    paths: list[Optional[Path]] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(maze,)) as pool:
+        for chunk_paths in pool.map(_solve_chunk_in_worker, chunks):
+            paths.extend(chunk_paths)
+    return paths
+
+
+if __name__ == '__main__':
+
+    import functools
+    import random
+    import time
+
+    from rich import print
+
+    from generic_search import a_star_search, SearchStats
+    from maze import manhattan_distance
+
+    random.seed(22)
+    size: int = 300
+    maze: Maze = Maze(size, size, 0.2, goal=MazeLocation(size - 1, size - 1))
+
+    stats: SearchStats = SearchStats()
+    start_time: float = time.perf_counter()
+    generic: Optional[Node[MazeLocation]] = a_star_search(
+        maze.start, maze.goal_test, maze.successors,
+        functools.partial(manhattan_distance, maze.goal), consistent=True, stats=stats
+    )
+    print(f"generic A*: {time.perf_counter() - start_time:.3f} s, {stats.expanded} cells expanded")
+
+    start_time = time.perf_counter()
+    specialized: Optional[Node[MazeLocation]] = grid_a_star(maze)
+    print(f"grid A*: {time.perf_counter() - start_time:.3f} s")
+    if generic and specialized:
+        assert len(node_to_path(generic)) == len(node_to_path(specialized))
+        print(f"path length: {len(node_to_path(specialized))}")
+
+    # answer a batch of random queries
+    open_cells: list[MazeLocation] = [
+        MazeLocation(row, column)
+        for row in range(size) for column in range(size)
+        if maze.cells[maze.cell_id(MazeLocation(row, column))] != BLOCKED_CODE
+    ]
+    queries: list[tuple[MazeLocation, MazeLocation]] = [
+        (random.choice(open_cells), random.choice(open_cells)) for _ in range(500)
+    ]
+    start_time = time.perf_counter()
+    paths: list[Optional[Path]] = solve_many(maze, queries)
+    elapsed: float = time.perf_counter() - start_time
+    print(f"solve_many: {len(queries)} queries in {elapsed:.3f} s ({len(queries) / elapsed:.0f} queries/s), "
+          f"{sum(path is not None for path in paths)} solved")
@@ -10,11 +10,13 @@ import random
 import functools
 import math
 
-from generic_search import Node, node_to_path, depth_first_search, breadth_first_search, PriorityQueue, a_star_search
+from generic_search import Node, node_to_path, depth_first_search, breadth_first_search, PriorityQueue, a_star_search, SearchStats
 
 
 DIRECTIONS = UP, DOWN, LEFT, RIGHT = (1, 0), (-1, 0), (0, -1), (0, 1)
 EMPTY, BLOCKED, START, GOAL, PATH = ' ', 'X', 'S', 'G', '*'
+EMPTY_BYTE, BLOCKED_BYTE = EMPTY.encode('ascii'), BLOCKED.encode('ascii')
+BLOCKED_CODE: int = ord(BLOCKED)
 
 
 MazeLocation: tuple[int, int] = namedtuple('MazeLocation', ['row', 'column'])
@@ -36,9 +38,14 @@ def manhattan_distance(loc0: MazeLocation, loc1: MazeLocation) -> float:
 
 class Maze:
     """
-    Represent a maze as a grid (list of lists).
+    Represent a maze as a grid packed into a `bytearray`, one byte (the cell's character) per cell.
     
     Use sparseness to control how many empty spaces there are.
+    
+    The grid is surrounded by a border of blocked cells that is never displayed.
+    Each cell, border included, has an integer id (its position in the `bytearray`),
+    so the neighbors of a cell are found by adding fixed offsets to its id, without any bounds checks.
+    `MazeLocation`s are converted to and from ids with `cell_id()` and `location()`.
     """
     
     def __init__(self,
@@ -50,69 +57,85 @@ class Maze:
                  )-> None:
         self.rows, self.columns = rows, columns
         self.start, self.goal = start, goal
-        self.grid: list[list[str]] = [
-            [
-                EMPTY for c in range(columns)
-            ]
-            for _ in range(rows)
-        ]
         
-        # populate _grid with blocked cells
+        self._stride: int = columns + 2	# row length including the left and right border
+        self.cells: bytearray = bytearray(BLOCKED_BYTE) * ((rows + 2) * self._stride)
+        # offsets to the neighbors of a cell id in the same order as `DIRECTIONS`
+        self.offsets: tuple[int, ...] = tuple(
+            updown * self._stride + leftright for updown, leftright in DIRECTIONS
+        )
+        
+        # populate the grid with blocked cells
         self._randomly_fill(self.rows, self.columns, sparseness)
-        self.grid[self.start.row][self.start.column] = START
-        self.grid[self.goal.row][self.goal.column] = GOAL
+        self.cells[self.cell_id(self.start)] = ord(START)
+        self.cells[self.cell_id(self.goal)] = ord(GOAL)
     
     def _randomly_fill(self, rows: int, columns: int, sparseness: float):
         """
-        Randomly fill self._grid with `Cell.BLOCKED`.
+        Randomly fill the grid with `BLOCKED` one row at a time:
+        draw one random byte per cell and translate bytes below `sparseness * 256` into `BLOCKED`, the others into `EMPTY`.
+        (`sparseness` is thus rounded to a multiple of 1/256.)
         """
+        threshold: int = round(sparseness * 256)
+        table: bytes = BLOCKED_BYTE * threshold + EMPTY_BYTE * (256 - threshold)
         for row in range(rows):
-            for column in range(columns):
-                if random.uniform(0, 1) < sparseness:
-                    self.grid[row][column] = BLOCKED
+            first: int = self.cell_id(MazeLocation(row, 0))
+            self.cells[first:first + columns] = random.randbytes(columns).translate(table)
+    
+    def cell_id(self, ml: MazeLocation) -> int:
+        """ Return the id of the cell at `ml`. """
+        return (ml.row + 1) * self._stride + ml.column + 1
+    
+    def location(self, cell: int) -> MazeLocation:
+        """ Return the location of the cell with id `cell`. """
+        row, column = divmod(cell, self._stride)
+        return MazeLocation(row - 1, column - 1)
+    
+    @property
+    def grid(self) -> list[list[str]]:
+        """ A copy of the grid as a list of lists of cell characters. """
+        return [list(row) for row in self._row_strings()]
+    
+    def _row_strings(self) -> Iterator[str]:
+        for row in range(self.rows):
+            first: int = self.cell_id(MazeLocation(row, 0))
+            yield self.cells[first:first + self.columns].decode('ascii')
     
     def __str__(self) -> str:
-        return '\n'.join(
-            [
-                ''.join([cell for cell in row])
-                 for row in self.grid
-            ]
-        )
+        return '\n'.join(self._row_strings())
 
     def goal_test(self, ml: MazeLocation) -> bool:
         """Is`ml` is the goal of this maze?"""
         return ml == self.goal
     
+    def cell_successors(self, cell: int) -> list[int]:
+        """ List the ids of the cells next to cell `cell` available to move. """
+        cells: bytearray = self.cells
+        return [
+            cell + offset
+            for offset in self.offsets
+            if cells[cell + offset] != BLOCKED_CODE
+        ]
+    
     def successors(self, ml: MazeLocation) -> list[MazeLocation]:
         """ List next maze locations available to move. """
-        
-        successors: list[MazeLocation] = []
-        
-        def check_index_range(ml: MazeLocation):
-            return (0 <= ml.row < self.rows) and \
-                (0 <= ml.column < self.columns)
-        
-        for direction in DIRECTIONS:
-            loc = move(ml, *direction)
-            if check_index_range(loc) and self.grid[loc.row][loc.column] != BLOCKED:
-                successors.append(loc)
-        return successors
+        return [self.location(cell) for cell in self.cell_successors(self.cell_id(ml))]
 
     def mark(self, path: list[MazeLocation]) -> None:
         """
-        Mark cells listed in `path` with `Cell.PATH` by modifying `self.grid`.
+        Mark cells listed in `path` with `PATH`.
         """
         for ml in path:
             if ml != self.start and ml != self.goal:
-                self.grid[ml.row][ml.column] = PATH
+                self.cells[self.cell_id(ml)] = ord(PATH)
     
     def clear_path(self, path: list[MazeLocation]) -> None:
         """
-        Mark cells listed in `path` as `Cell.EMPTY` by modifying data in `self.grid`. 
+        Mark cells listed in `path` as `EMPTY`.
         """
         for ml in path:
             if ml != self.start and ml != self.goal:
-                self.grid[ml.row][ml.column] = EMPTY
+                self.cells[self.cell_id(ml)] = ord(EMPTY)
 
 
 
@@ -158,12 +181,16 @@ if __name__ == '__main__':
     # test generic_search.a_star_search()
     print("[b]Testing A-star search [/b]")
     heuristic = functools.partial(manhattan_distance, maze.goal)
+    stats: SearchStats = SearchStats()
     solution3 = a_star_search(
         maze.start,
         maze.goal_test,
         maze.successors,
-        heuristic
+        heuristic,
+        consistent=True,	# `manhattan_distance` is the Euclidean distance, which is consistent on a 4-connected grid of unit steps
+        stats=stats
     )
+    print(stats)
     if not solution3:
         print("No solution found using A-star search")
     else:
@@ -0,0 +1,152 @@
+# test_search.py
+"""
+A pytest script testing the search functions of `generic_search` and `grid_search` on the mazes of this chapter.
+"""
+import unittest
+import functools
+import random
+from typing import *
+
+from generic_search import (
+    node_to_path, depth_first_search, breadth_first_search, a_star_search, SearchStats
+)
+from maze import Maze, MazeLocation, manhattan_distance, BLOCKED_CODE
+from grid_search import grid_a_star, solve_many
+
+
+# a weighted graph on which the heuristic is admissible but not consistent:
+# it overestimates nothing, but drops by 4 from A to C, which are 1 apart
+EDGES: dict[str, list[tuple[str, float]]] = {
+    'S': [('A', 1.0), ('B', 2.0)],
+    'A': [('C', 1.0)],
+    'B': [('C', 2.0)],
+    'C': [('G', 3.0)],
+    'G': [],
+}
+HEURISTIC: dict[str, float] = {'S': 0.0, 'A': 4.0, 'B': 0.0, 'C': 0.0, 'G': 0.0}
+
+
+def random_maze(seed: int, size: int = 30) -> Maze:
+    random.seed(seed)
+    return Maze(size, size, 0.25, goal=MazeLocation(size - 1, size - 1))
+
+
+def open_cells(maze: Maze) -> list[MazeLocation]:
+    return [
+        MazeLocation(row, column)
+        for row in range(maze.rows) for column in range(maze.columns)
+        if maze.cells[maze.cell_id(MazeLocation(row, column))] != BLOCKED_CODE
+    ]
+
+
+class LeanSearchTests(unittest.TestCase):
+
+    """ Tests for the `lean` mode of the search functions. """
+
+    def test_same_paths(self):
+        """ Lean DFS, BFS and A* return the same paths as their `Node` versions, or None in the same mazes. """
+        for seed in range(10):
+            maze = random_maze(seed)
+            heuristic = functools.partial(manhattan_distance, maze.goal)
+            for search in (
+                functools.partial(depth_first_search, maze.start, maze.goal_test, maze.successors),
+                functools.partial(breadth_first_search, maze.start, maze.goal_test, maze.successors),
+                functools.partial(a_star_search, maze.start, maze.goal_test, maze.successors, heuristic),
+            ):
+                normal, lean = search(), search(lean=True)
+                self.assertEqual(normal is None, lean is None)
+                if normal is not None:
+                    self.assertEqual(node_to_path(lean), node_to_path(normal))
+                    self.assertEqual(lean.cost, normal.cost)
+
+
+class AStarTests(unittest.TestCase):
+
+    """ Tests for the weighted successors and the reopening of `a_star_search`. """
+
+    def search(self, **options) -> tuple[list[str], float, SearchStats]:
+        stats = SearchStats()
+        node = a_star_search('S', lambda state: state == 'G', EDGES.__getitem__, HEURISTIC.__getitem__,
+                             weighted=True, stats=stats, **options)
+        return node_to_path(node), node.cost, stats
+
+    def test_reopening(self):
+        """ By default, a closed state is reopened when a cheaper path to it turns up, which finds the cheapest path. """
+        for lean in (False, True):
+            path, cost, stats = self.search(lean=lean)
+            self.assertEqual(path, ['S', 'A', 'C', 'G'])
+            self.assertEqual(cost, 5.0)
+            self.assertEqual(stats.reopened, 1)
+
+    def test_consistent(self):
+        """ With `consistent=True`, closed states stay closed, which misses the cheapest path under this heuristic. """
+        path, cost, stats = self.search(consistent=True)
+        self.assertEqual(path, ['S', 'B', 'C', 'G'])
+        self.assertEqual(cost, 7.0)
+        self.assertEqual(stats.reopened, 0)
+
+    def test_unit_steps(self):
+        """ Without `weighted`, every step costs 1. """
+        node = a_star_search('S', lambda state: state == 'G', lambda state: [child for child, _ in EDGES[state]],
+                             lambda state: 0.0)
+        self.assertEqual(len(node_to_path(node)), 4)
+        self.assertEqual(node.cost, 3.0)
+
+
+class MazeTests(unittest.TestCase):
+
+    """ Tests for the packed grid of `Maze`. """
+
+    def test_cell_ids(self):
+        """ Cell ids and locations convert both ways, and the grid is walled in by its border. """
+        random.seed(0)
+        maze = Maze(7, 11, 0.0, goal=MazeLocation(6, 10))
+        ids = set()
+        for row in range(-1, 8):
+            for column in range(-1, 12):
+                location = MazeLocation(row, column)
+                cell = maze.cell_id(location)
+                self.assertEqual(maze.location(cell), location)
+                ids.add(cell)
+                if row in (-1, 7) or column in (-1, 11):
+                    self.assertEqual(maze.cells[cell], BLOCKED_CODE)
+        self.assertEqual(len(ids), len(maze.cells))
+        self.assertEqual(sorted(maze.successors(MazeLocation(0, 0))), [MazeLocation(0, 1), MazeLocation(1, 0)])
+        self.assertEqual(sorted(maze.successors(MazeLocation(6, 10))), [MazeLocation(5, 10), MazeLocation(6, 9)])
+        for location in (MazeLocation(0, 5), MazeLocation(3, 10)):
+            self.assertEqual(len(maze.successors(location)), 3)
+
+
+class GridSearchTests(unittest.TestCase):
+
+    """ Tests for `grid_a_star` and `solve_many`. """
+
+    def test_shortest_paths(self):
+        """ `grid_a_star` finds paths as short as those of `a_star_search`, and no path where it finds none. """
+        for seed in range(10):
+            maze = random_maze(seed)
+            expected = a_star_search(maze.start, maze.goal_test, maze.successors,
+                                     functools.partial(manhattan_distance, maze.goal), consistent=True)
+            node = grid_a_star(maze)
+            self.assertEqual(node is None, expected is None)
+            if node is not None:
+                path = node_to_path(node)
+                self.assertEqual(len(path), len(node_to_path(expected)))
+                self.assertEqual((path[0], path[-1]), (maze.start, maze.goal))
+                self.assertTrue(all(step in maze.successors(previous) for previous, step in zip(path, path[1:])))
+
+    def test_solve_many(self):
+        """ The paths come back in the order of the queries, with one process or two. """
+        maze = random_maze(1)
+        cells = open_cells(maze)
+        rng = random.Random(2)
+        queries = [(rng.choice(cells), rng.choice(cells)) for _ in range(50)]
+        queries.append((maze.start, MazeLocation(-1, 0)))	# the border is blocked: no path
+        expected = [node_to_path(node) if (node := grid_a_star(maze, start, goal)) else None for start, goal in queries]
+        self.assertIsNone(expected[-1])
+        self.assertEqual(solve_many(maze, queries, workers=1), expected)
+        self.assertEqual(solve_many(maze, queries, workers=2, chunk_size=8), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# all_different.py
+"""
+A module defining `AllDifferentConstraint`, a global constraint requiring its variables to take pairwise different values.
+
+Each value met in the domains is given a bit of an integer, so that a set of values is a bitmask:
+
+    - during the search the constraint is incremental: it keeps the mask of the values taken so far,
+        so checking a new value is a single AND instead of building `set(assignment.values())`,
+    - with an inference function of `propagation`, it removes the taken values from the other domains
+        and then looks for Hall sets: if k unassigned variables can only take values among the same k values,
+        those values are used up by them and can be removed from the domains of every other variable.
+
+The Hall sets looked for are the domains of the variables themselves (a simple, quadratic version of Régin's matching-based
+filtering), which already catches the common cases, e.g. two variables that can only take 3 or 5.
+"""
+from typing import *
+
+from csp import Constraint, ConstraintSatisfactionProblem
+from propagation import Trail, _prune
+
+V = TypeVar('V') # variable type
+D = TypeVar('D') # domain type
+
+
+class AllDifferentConstraint(Constraint[V, D]):
+
+    incremental: bool = True
+    propagates: bool = True
+
+    def __init__(self, variables: list[V]) -> None:
+        super().__init__(variables)
+        self.bits: dict[D, int] = {}	# the bit standing for each value met so far
+        self.used: int = 0	# mask of the values taken by the variables assigned during the search
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.variables!r})'
+
+    def bit(self, value: D) -> int:
+        """ Return the bit standing for `value`, giving it the next free one if it is new. """
+        bit: Optional[int] = self.bits.get(value)
+        if bit is None:
+            bit = self.bits[value] = 1 << len(self.bits)
+        return bit
+
+    def mask(self, values: Iterable[D]) -> int:
+        """ Return the bitmask of `values`. """
+        mask: int = 0
+        for value in values:
+            mask |= self.bit(value)
+        return mask
+
+    def satisfied(self, assignment: dict[V, D]) -> bool:
+        """ No two assigned variables of the constraint share a value. """
+        values: list[D] = [assignment[var] for var in self.variables if var in assignment]
+        return len(set(values)) == len(values)
+
+    def reset(self) -> None:
+        self.used = 0
+
+    def on_assign(self, variable: V, value: D) -> bool:
+        bit: int = self.bit(value)
+        if self.used & bit:
+            return False
+        self.used |= bit
+        return True
+
+    def on_unassign(self, variable: V, value: D) -> None:
+        self.used &= ~self.bit(value)
+
+    def propagate(self, csp: ConstraintSatisfactionProblem[V, D], variable: Optional[V],
+                  assignment: dict[V, D], trail: Trail) -> bool:
+        """ Remove the values taken by the assigned variables, then the values used up by Hall sets, from the domains. """
+        used: int = 0
+        for var in self.variables:
+            if var in assignment:
+                bit: int = self.bit(assignment[var])
+                if used & bit:
+                    return False
+                used |= bit
+        free: list[V] = [var for var in self.variables if var not in assignment]
+        masks: list[int] = [self.mask(csp.domains[var]) & ~used for var in free]
+
+        changed: bool = True
+        while changed:
+            changed = False
+            for hall in set(masks):
+                size: int = hall.bit_count()
+                # the variables whose values all lie within `hall`
+                inside: int = sum(mask | hall == hall for mask in masks)
+                if inside > size:
+                    return False	# more variables than values: some domain is empty or will be
+                if inside == size:
+                    for i, mask in enumerate(masks):
+                        if mask | hall != hall and mask & hall:
+                            masks[i] = mask & ~hall
+                            changed = True
+
+        for var, mask in zip(free, masks):
+            domain: list[D] = csp.domains[var]
+            if not _prune(csp, var, [value for value in domain if self.bits[value] & mask], trail):
+                return False
+        return True
@@ -0,0 +1,179 @@
+# benchmark_csp.py
+"""
+A script timing the search strategies and specialized models of this chapter.
+
+Run it from this directory:
+```
+python benchmark_csp.py
+```
+"""
+from typing import *
+import time
+
+from rich import print
+from rich.table import Table
+
+from csp import ConstraintSatisfactionProblem
+from heuristics import minimum_remaining_values
+from map_coloring import MapColoringConstraint
+from propagation import forward_checking
+from queens import queens_csp, BitboardQueens, greedy_placement
+from send_more_money import send_more_money_csp
+
+QUEENS_SIZES: list[int] = [8, 10, 12, 14, 16, 18, 20]
+COUNT_SIZES: list[int] = [6, 8, 10, 12]
+LOCAL_SIZES: list[int] = [1_000, 10_000, 100_000, 1_000_000]
+COLORS: list[str] = ['red', 'green', 'blue']
+
+
+def timed(csp: ConstraintSatisfactionProblem, method: str, **kwargs: Any) -> tuple[Any, float]:
+    """ Run `csp.<method>(**kwargs)` and return its result and its duration in seconds. """
+    start: float = time.perf_counter()
+    result: Any = getattr(csp, method)(**kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark_queens(sizes: list[int] = QUEENS_SIZES) -> Table:
+    """ Time the first solution of N-queens with the generic search and with the bitboard solver. """
+    table: Table = Table(title='N-queens, first solution (seconds)')
+    for column in ('N', 'declaration order', 'MRV + forward checking', 'bitboard'):
+        table.add_column(column, justify='right')
+
+    for n in sizes:
+        row: list[str] = [str(n)]
+        for csp, kwargs in (
+            (queens_csp(n), {}),
+            (queens_csp(n), {'select_variable': minimum_remaining_values, 'inference': forward_checking}),
+            (BitboardQueens(n), {}),
+        ):
+            _, seconds = timed(csp, 'backtracking_search', **kwargs)
+            row.append(f'{seconds:.3f}')
+        table.add_row(*row)
+    return table
+
+
+def benchmark_queens_count(sizes: list[int] = COUNT_SIZES, generic_limit: int = 10) -> Table:
+    """ Time counting every solution of N-queens; the generic search is skipped above `generic_limit`. """
+    table: Table = Table(title='N-queens, all solutions (seconds)')
+    for column in ('N', 'solutions', 'declaration order', 'bitboard'):
+        table.add_column(column, justify='right')
+
+    for n in sizes:
+        count, bitboard = timed(BitboardQueens(n), 'count_solutions')
+        generic: str = '-'
+        if n <= generic_limit:
+            generic_count, seconds = timed(queens_csp(n), 'count_solutions')
+            assert generic_count == count
+            generic = f'{seconds:.3f}'
+        table.add_row(str(n), f'{count:,}', generic, f'{bitboard:.3f}')
+    return table
+
+
+def benchmark_min_conflicts(sizes: list[int] = LOCAL_SIZES) -> Table:
+    """ Time `min_conflicts` on N-queens, starting from `greedy_placement`. """
+    table: Table = Table(title='N-queens, min-conflicts from a greedy placement')
+    for column in ('N', 'build (s)', 'placement (s)', 'moves', 'repair (s)'):
+        table.add_column(column, justify='right')
+
+    for n in sizes:
+        start: float = time.perf_counter()
+        csp: ConstraintSatisfactionProblem[int, int] = queens_csp(n)
+        built: float = time.perf_counter()
+        placement: dict[int, int] = greedy_placement(n, seed=0)
+        placed: float = time.perf_counter()
+        assert csp.min_conflicts(assignment=placement, seed=0) is not None
+        table.add_row(
+            f'{n:,}', f'{built - start:.3f}', f'{placed - built:.3f}',
+            str(csp.stats.nodes), f'{csp.stats.elapsed:.3f}'
+        )
+    return table
+
+
+def clustered_map(n_clusters: int, ring: int = 4, solvable: bool = True) -> ConstraintSatisfactionProblem[str, str]:
+    """
+    Build a map-coloring problem whose only difficulty lies between its first and its last regions.
+    
+    The map is made of `n_clusters` independent clusters, each a hub region surrounded by a ring of `ring` regions
+    (an even number, so three colors suffice) with a small region hanging off each of them,
+    so each cluster can be colored in many ways.
+    The first region declared, the trap, borders only regions declared after every cluster:
+    a region that can only be red if `solvable`, or else a triangle of regions, which together with the trap need four colors.
+    Backtracking in declaration order colors the trap red first and only finds out at the very end,
+    after which it goes through every coloring of the clusters before changing the color of the trap.
+    """
+    regions: list[str] = ['trap']
+    borders: list[tuple[str, str]] = []
+    for cluster in range(n_clusters):
+        hub: str = f'hub {cluster}'
+        ring_regions: list[str] = [f'ring {cluster}.{i}' for i in range(ring)]
+        regions.append(hub)
+        for i, region in enumerate(ring_regions):
+            leaf: str = f'leaf {cluster}.{i}'
+            regions += [region, leaf]
+            borders += [(hub, region), (region, ring_regions[i - 1]), (region, leaf)]
+    if solvable:
+        witnesses: list[str] = ['witness']
+    else:
+        witnesses = ['witness 1', 'witness 2', 'witness 3']
+        borders += [('witness 1', 'witness 2'), ('witness 1', 'witness 3'), ('witness 2', 'witness 3')]
+    regions += witnesses
+    borders += [('trap', witness) for witness in witnesses]
+    
+    domains: dict[str, list[str]] = {region: COLORS for region in regions}
+    if solvable:
+        domains['witness'] = ['red']
+    csp: ConstraintSatisfactionProblem[str, str] = ConstraintSatisfactionProblem(regions, domains)
+    for region1, region2 in borders:
+        csp.add_constraint(MapColoringConstraint(region1, region2))
+    return csp
+
+
+def benchmark_backjumping(cluster_counts: list[int] = [1, 2]) -> Table:
+    """ Compare chronological backtracking with conflict-directed backjumping on `clustered_map` instances. """
+    table: Table = Table(title='Map coloring: chronological backtracking vs. backjumping with nogoods')
+    for column in ('clusters', 'solvable', 'regions', 'nodes', 'seconds', 'nodes (CBJ)', 'seconds (CBJ)',
+                   'backjumps', 'nogoods', 'nogood hits'):
+        table.add_column(column, justify='right')
+
+    for n_clusters in cluster_counts:
+        for solvable in (True, False):
+            chronological: ConstraintSatisfactionProblem[str, str] = clustered_map(n_clusters, solvable=solvable)
+            backjumping: ConstraintSatisfactionProblem[str, str] = clustered_map(n_clusters, solvable=solvable)
+            first = chronological.backtracking_search()
+            second = backjumping.backtracking_search(backjumping=True)
+            assert (first is None) == (second is None) == (not solvable)
+            stats = backjumping.stats
+            table.add_row(
+                str(n_clusters), str(solvable), str(len(chronological.variables)),
+                f'{chronological.stats.nodes:,}', f'{chronological.stats.elapsed:.3f}',
+                f'{stats.nodes:,}', f'{stats.elapsed:.3f}',
+                f'{stats.backjumps:,}', f'{stats.nogoods:,}', f'{stats.nogood_hits:,}'
+            )
+    return table
+
+
+def benchmark_send_more_money() -> Table:
+    """ Compare the set-based distinct-digits check of SEND+MORE=MONEY with `AllDifferentConstraint`. """
+    table: Table = Table(title='SEND+MORE=MONEY')
+    for column in ('distinct digits', 'inference', 'nodes', 'seconds'):
+        table.add_column(column, justify='right')
+
+    for all_different in (False, True):
+        for inference in (None, forward_checking):
+            csp: ConstraintSatisfactionProblem[str, int] = send_more_money_csp(all_different)
+            _, seconds = timed(csp, 'backtracking_search', inference=inference)
+            table.add_row(
+                'AllDifferentConstraint' if all_different else 'set of values',
+                'forward checking' if inference else '-',
+                f'{csp.stats.nodes:,}', f'{seconds:.3f}'
+            )
+    return table
+
+
+if __name__ == '__main__':
+
+    print(benchmark_queens())
+    print(benchmark_queens_count())
+    print(benchmark_min_conflicts())
+    print(benchmark_backjumping())
+    print(benchmark_send_more_money())
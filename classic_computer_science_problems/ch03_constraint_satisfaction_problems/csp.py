@@ -4,14 +4,48 @@ A module containing classes and functions for constraint-satisfaction problem.
 """
 from typing import *
 import collections
+import contextlib
+import os
+import random
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from heuristics import domain_order, first_unassigned
+from nogoods import NogoodStore, Nogood
+from profiling import SearchProfiler
+from propagation import Inference, Trail, UNDO
 
 V = TypeVar('V') # variable type
 D = TypeVar('D') # domain type
+# select_variable(csp, assignment) returns the next variable to assign
+VariableSelector = Callable[['ConstraintSatisfactionProblem[V, D]', dict[V, D]], V]
+# order_values(csp, variable, assignment) returns the values of `variable` in the order to try them
+ValueOrderer = Callable[['ConstraintSatisfactionProblem[V, D]', V, dict[V, D]], Iterable[D]]
 
 
 class Constraint(Generic[V, D], ABC):
-    """ Base class for all constraints """
+    """
+    Base class for all constraints
+    
+    A constraint can also opt into incremental checking by setting `incremental` to True
+    and overriding `reset`, `on_assign` and `on_unassign`.
+    `backtracking_search` then tells it about each assignment as it is made and undone,
+    instead of calling `satisfied` on the whole assignment,
+    so the constraint can keep a summary of the assigned values and check a new one against it in O(1) or O(k).
+    `satisfied` must still be implemented: heuristics and propagation use it on arbitrary assignments.
+    
+    Likewise, a constraint that sets `propagates` to True prunes the domains itself in `propagate`
+    when the inference functions of `propagation` run, instead of having its values checked one by one.
+    
+    `min_conflicts` counts the conflicts of a constraint with `conflicted_variables` and `count_conflicts`,
+    which fall back on `satisfied`. A constraint can override them, along with `start_moves` and `on_move`,
+    to keep counters of the assigned values and answer from them (e.g. with NumPy) instead.
+    """
+    
+    incremental: bool = False
+    propagates: bool = False
     
     def __init__(self, variables: list[V]) -> None:
         """Instantiate with the variables that the constraint is between"""
@@ -21,6 +55,99 @@ class Constraint(Generic[V, D], ABC):
     def satisfied(self, assignment: dict[V, D]) -> bool:
         """(Must be overridden by subclasses)"""
     
+    def pair_satisfied(self, var1: V, value1: D, var2: V, value2: D) -> bool:
+        """
+        Is the constraint satisfied when `var1` takes `value1` and `var2` takes `value2`?
+        Used by constraint propagation on binary constraints;
+        subclasses can override it with a check that does not build an assignment.
+        """
+        return self.satisfied({var1: value1, var2: value2})
+    
+    def conflict_set(self, variable: V, assignment: dict[V, D]) -> Iterable[V]:
+        """
+        Return the assigned variables whose values conflict with that of `variable` under the constraint,
+        which `assignment` violates (used by backjumping): by default all the other assigned variables of the constraint.
+        """
+        return [var for var in self.variables if var != variable and var in assignment]
+    
+    def propagate(self, csp: 'ConstraintSatisfactionProblem[V, D]', variable: Optional[V],
+                  assignment: dict[V, D], trail: Trail) -> bool:
+        """
+        Remove from the domains of the unassigned variables the values that the constraint rules out
+        now that `variable` is assigned (or given the whole `assignment` if `variable` is None), with `propagation._prune`.
+        Return False if some domain becomes empty (propagating constraints only).
+        """
+        raise NotImplementedError
+    
+    def reset(self) -> None:
+        """ Forget every recorded assignment. Called at the start of each search (incremental constraints only). """
+    
+    def on_assign(self, variable: V, value: D) -> bool:
+        """
+        If `variable` can take `value` given the values recorded so far, record it and return True;
+        otherwise record nothing and return False (incremental constraints only).
+        """
+        raise NotImplementedError
+    
+    def on_unassign(self, variable: V, value: D) -> None:
+        """ Forget `value`, recorded for `variable` by a successful `on_assign` (incremental constraints only). """
+        raise NotImplementedError
+    
+    def start_moves(self, assignment: dict[V, D]) -> None:
+        """ Called when `min_conflicts` starts from `assignment`, which may still be partial. """
+    
+    def on_move(self, variable: V, old: Optional[D], new: D) -> None:
+        """ Called when `min_conflicts` changes `variable` from `old` (None if it was unassigned) to `new`. """
+    
+    def conflicted_variables(self, assignment: dict[V, D]) -> Sequence[V]:
+        """ Return the variables involved in a violation of the constraint: by default all of them if it is not satisfied. """
+        return () if self.satisfied(assignment) else self.variables
+    
+    def count_conflicts(self, variable: V, values: Sequence[D], assignment: dict[V, D]) -> Sequence[int]:
+        """
+        Return, for each of `values`, the number of violations of the constraint if `variable` took it
+        and the other variables kept their values in `assignment`: by default 1 if it is not satisfied, 0 otherwise.
+        Overrides may return a NumPy array.
+        """
+        current: Optional[D] = assignment.get(variable)
+        counts: list[int] = []
+        for value in values:
+            assignment[variable] = value
+            counts.append(0 if self.satisfied(assignment) else 1)
+        if current is None:
+            del assignment[variable]
+        else:
+            assignment[variable] = current
+        return counts
+    
+
+class _NeighborSets(dict):
+    """ The variables sharing a constraint with each variable, computed on first access. """
+    
+    def __init__(self, constraints: dict[V, list[Constraint[V, D]]]) -> None:
+        super().__init__()
+        self.constraints: dict[V, list[Constraint[V, D]]] = constraints
+    
+    def __missing__(self, var: V) -> set[V]:
+        neighbors: set[V] = {
+            other for constraint in self.constraints[var] for other in constraint.variables if other != var
+        }
+        self[var] = neighbors
+        return neighbors
+
+
+@dataclass
+class SearchStats:
+    """ Counters of the last search run by a `ConstraintSatisfactionProblem`. """
+    nodes: int = 0	# values tried for a variable (values changed by `min_conflicts`)
+    backtracks: int = 0	# dead ends, i.e. variables that ran out of values to try
+    pruned: int = 0	# values removed from domains by inference
+    restarts: int = 0	# fresh starting points of `min_conflicts`
+    backjumps: int = 0	# levels skipped by backjumping
+    nogoods: int = 0	# nogoods learned by backjumping
+    nogood_hits: int = 0	# values ruled out by a learned nogood
+    elapsed: float = 0.0	# seconds
+
 
 class ConstraintSatisfactionProblem(Generic[V, D]):
     """
@@ -32,7 +159,13 @@ class ConstraintSatisfactionProblem(Generic[V, D]):
     def __init__(self, variables: list[V], domains: dict[V, list[D]]) -> None:
         self.variables: list[V] = variables
         self.domains: dict[V, list[D]] = domains
-        self.constraints: dict[V, list[Constraint[V, D]]] = collections.defaultdict(list)       
+        self.constraints: dict[V, list[Constraint[V, D]]] = collections.defaultdict(list)
+        # variables sharing a constraint, computed lazily: a constraint on all n variables would make n² pairs
+        self.neighbors: dict[V, set[V]] = _NeighborSets(self.constraints)
+        self.arcs: dict[V, list[tuple[V, Constraint[V, D]]]] = collections.defaultdict(list)	# binary constraints to other variables
+        self.stats: SearchStats = SearchStats()
+        self.profiler: Optional[SearchProfiler] = None	# set one to record where the searches spend their time
+        self._variable_set: set[V] = set(variables)
         
         for var in self.variables:
             if var not in self.domains:
@@ -40,10 +173,16 @@ class ConstraintSatisfactionProblem(Generic[V, D]):
 
     def add_constraint(self, constraint: Constraint[V, D]) -> None:
         for var in constraint.variables:
-            if var not in self.variables:
+            if var not in self._variable_set:
                 raise LookupError(f'Variable {var!r} in constraint not in CSP')
             else:
                 self.constraints[var].append(constraint)
+                if var in self.neighbors:	# already computed
+                    self.neighbors[var].update(other for other in constraint.variables if other != var)
+        if len(constraint.variables) == 2:
+            var1, var2 = constraint.variables
+            self.arcs[var1].append((var2, constraint))
+            self.arcs[var2].append((var1, constraint))
     
     def consistent(self, variable: V, assignment: dict[V, D]) -> bool:
         """
@@ -54,25 +193,502 @@ class ConstraintSatisfactionProblem(Generic[V, D]):
             for constraint in self.constraints[variable]
         )
     
-    def backtracking_search(self, assignment: dict[V, D] = {}) -> Optional[dict[V, D]]:
+    def backtracking_search(self,
+                            assignment: Optional[dict[V, D]] = None,
+                            select_variable: Optional[VariableSelector] = None,
+                            order_values: Optional[ValueOrderer] = None,
+                            inference: Optional[Inference] = None,
+                            backjumping: bool = False,
+                            max_nogoods: int = 10_000
+                            ) -> Optional[dict[V, D]]:
+        """
+        Extend `assignment` (empty by default) into a complete assignment that satisfies every constraint.
+        Return None if there is none.
+        
+        select_variable: VariableSelector
+            picks the next variable to assign (default: the first unassigned variable in declaration order);
+            see `heuristics.minimum_remaining_values`
+        order_values: ValueOrderer
+            orders the values to try for that variable (default: domain order);
+            see `heuristics.least_constraining_value`
+        inference: Inference
+            prunes the domains of the unassigned variables after each assignment (default: no pruning);
+            see `propagation.forward_checking` and `propagation.arc_consistency`
+        backjumping: bool
+            use conflict-directed backjumping with nogood learning instead of chronological backtracking
+            (cannot be combined with `inference`, and the values must be hashable)
+        max_nogoods: int
+            the number of nogoods backjumping remembers, the least recently used being forgotten first
+        
+        The number of nodes explored and the time taken are recorded in `self.stats`.
+        The domains are pruned during the search but restored before returning.
+        """
+        if backjumping and inference is not None:
+            raise ValueError('backjumping cannot be combined with inference')
+        with self._searching():
+            if backjumping:
+                solution: Optional[dict[V, D]] = self._backjump_search(
+                    dict(assignment or {}), select_variable, order_values, NogoodStore(max_nogoods)
+                )
+            else:
+                solution = next(
+                    self._search(dict(assignment or {}), select_variable, order_values, inference),
+                    None
+                )
+            return None if solution is None else dict(solution)
+    
+    def iter_solutions(self,
+                       assignment: Optional[dict[V, D]] = None,
+                       select_variable: Optional[VariableSelector] = None,
+                       order_values: Optional[ValueOrderer] = None,
+                       inference: Optional[Inference] = None
+                       ) -> Iterator[dict[V, D]]:
+        """
+        Yield every complete assignment that extends `assignment` and satisfies every constraint, one at a time.
+        The arguments are those of `backtracking_search`.
+        
+        The search resumes only when the next solution is asked for,
+        and the domains are restored once the generator is exhausted or closed.
+        """
+        with self._searching():
+            for solution in self._search(dict(assignment or {}), select_variable, order_values, inference):
+                yield dict(solution)
+    
+    def count_solutions(self,
+                        assignment: Optional[dict[V, D]] = None,
+                        select_variable: Optional[VariableSelector] = None,
+                        order_values: Optional[ValueOrderer] = None,
+                        inference: Optional[Inference] = None,
+                        workers: Optional[int] = 1
+                        ) -> int:
+        """
+        Count the complete assignments that extend `assignment` and satisfy every constraint,
+        without building a dictionary for each of them. The other arguments are those of `backtracking_search`.
+        
+        With `workers` > 1 (or None for `os.cpu_count()`), the search tree is split on the values of the first variable
+        to assign, and the branches are counted by a pool of processes, which receive a copy of the problem once.
+        The problem, its constraints and the heuristics must then be picklable (no lambdas).
+        The counters of the branches are added up in `self.stats`, and `elapsed` is the wall-clock time.
+        """
+        workers = workers or os.cpu_count() or 1
+        assignment = dict(assignment or {})
+        if workers == 1 or all(var in assignment for var in self.variables):
+            with self._searching():
+                return sum(1 for _ in self._search(assignment, select_variable, order_values, inference))
+        
+        variable: V = (select_variable or first_unassigned)(self, assignment)
+        branches: list[dict[V, D]] = [
+            {**assignment, variable: value}
+            for value in (order_values or domain_order)(self, variable, assignment)
+        ]
+        n: int = len(branches)
+        with self._searching():
+            count: int = 0
+            self.stats.nodes += n
+            self.stats.backtracks += 1	# the first variable runs out of values, like in a serial search
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as pool:
+                for branch_count, stats in pool.map(
+                    _count_solutions_in_worker,
+                    branches, [select_variable] * n, [order_values] * n, [inference] * n
+                ):
+                    count += branch_count
+                    self.stats.nodes += stats.nodes
+                    self.stats.backtracks += stats.backtracks
+                    self.stats.pruned += stats.pruned
+            return count
+    
+    def min_conflicts(self,
+                      max_steps: int = 100_000,
+                      assignment: Optional[dict[V, D]] = None,
+                      restart_after: Optional[int] = 1_000,
+                      perturb: float = 0.1,
+                      tabu: int = 10,
+                      seed: Optional[int] = None
+                      ) -> Optional[dict[V, D]]:
+        """
+        Look for a solution by local search rather than backtracking, which scales to much larger problems
+        but cannot tell that there is no solution: return None after `max_steps` moves without finding one.
+        
+        The search starts from `assignment`, completed greedily (each remaining variable, in random order,
+        takes a value with the fewest conflicts with those assigned before it).
+        At each step, a variable involved in a violated constraint is picked at random and given the value
+        with the fewest conflicts, ties broken at random.
+        
+        restart_after: int
+            restart when the number of conflicted variables has not improved for that many steps
+            (None never restarts), by giving random values to a random sample of the variables
+        perturb: float
+            the fraction of the variables a restart changes (at least one); a restart thus costs a number of moves
+            proportional to that sample, instead of redoing the greedy completion, which counts the conflicts
+            of every value of every variable
+        tabu: int
+            a variable that has just been changed is not picked again for that many steps (if there is a choice)
+        seed: int
+            seeds the random choices, for reproducible runs
+        
+        The violated constraints and their conflicted variables are updated after each move
+        for the constraints of the changed variable only.
+        The number of moves and restarts are recorded in `self.stats`.
+        """
+        rng: random.Random = random.Random(seed)
+        constraints: list[Constraint[V, D]] = list({
+            id(constraint): constraint for var in self.variables for constraint in self.constraints[var]
+        }.values())
+        
+        def conflicts(variable: V, current: dict[V, D]) -> Sequence[int]:
+            total: Optional[Sequence[int]] = None
+            for constraint in self.constraints[variable]:
+                counts: Sequence[int] = constraint.count_conflicts(variable, self.domains[variable], current)
+                if total is None:
+                    total = counts
+                elif isinstance(total, list) and isinstance(counts, list):
+                    total = [a + b for a, b in zip(total, counts)]
+                else:
+                    total = total + counts	# NumPy arrays add up element-wise
+            return [0] * len(self.domains[variable]) if total is None else total
+        
+        def best_value(variable: V, current: dict[V, D]) -> D:
+            counts: Sequence[int] = conflicts(variable, current)
+            if isinstance(counts, list):
+                low: int = min(counts)
+                best: Sequence[int] = [i for i, count in enumerate(counts) if count == low]
+            else:
+                best = (counts == counts.min()).nonzero()[0]
+            return self.domains[variable][int(best[rng.randrange(len(best))])]
+        
+        def start(given: dict[V, D]) -> dict[V, D]:
+            current: dict[V, D] = dict(given)
+            for constraint in constraints:
+                constraint.start_moves(current)
+            unassigned: list[V] = [var for var in self.variables if var not in current]
+            rng.shuffle(unassigned)
+            for var in unassigned:
+                value: D = best_value(var, current)
+                current[var] = value
+                for constraint in self.constraints[var]:
+                    constraint.on_move(var, None, value)
+            return current
+        
+        with self._searching():
+            current: dict[V, D] = start(assignment or {})
+            # the violated constraints (by id) with their conflicted variables
+            violated: dict[int, tuple[Constraint[V, D], Sequence[V]]] = {}
+            n_conflicted: int = 0	# sum of the numbers of conflicted variables of the violated constraints
+            
+            def update(constraint: Constraint[V, D]) -> None:
+                nonlocal n_conflicted
+                key: int = id(constraint)
+                if key in violated:
+                    n_conflicted -= len(violated.pop(key)[1])
+                conflicted: Sequence[V] = constraint.conflicted_variables(current)
+                if len(conflicted):
+                    violated[key] = (constraint, conflicted)
+                    n_conflicted += len(conflicted)
             
-        if assignment is None or list(assignment.keys()) == self.variables:
-            return assignment
+            for constraint in constraints:
+                update(constraint)
+            best_seen: int = n_conflicted
+            last_improvement: int = 0
+            moved_at: dict[V, int] = {}	# the step at which each variable was last changed
+            
+            for step in range(max_steps):
+                if not violated:
+                    return dict(current)
+                if restart_after is not None and step - last_improvement > restart_after:
+                    self.stats.restarts += 1
+                    for var in rng.sample(self.variables, max(1, round(perturb * len(self.variables)))):
+                        previous: D = current[var]
+                        current[var] = rng.choice(self.domains[var])
+                        for constraint in self.constraints[var]:
+                            constraint.on_move(var, previous, current[var])
+                    violated.clear()
+                    n_conflicted = 0
+                    for constraint in constraints:
+                        update(constraint)
+                    best_seen, last_improvement = n_conflicted, step
+                    moved_at.clear()
+                    continue
+                
+                # pick a conflicted variable, avoiding the tabu ones for a few tries
+                for _ in range(8):
+                    _, conflicted = rng.choice(list(violated.values())) if len(violated) > 1 else next(iter(violated.values()))
+                    variable: V = conflicted[rng.randrange(len(conflicted))]
+                    if step - moved_at.get(variable, -tabu - 1) > tabu:
+                        break
+                
+                old: D = current[variable]
+                new: D = best_value(variable, current)
+                self.stats.nodes += 1
+                moved_at[variable] = step
+                if new == old:
+                    continue
+                current[variable] = new
+                for constraint in self.constraints[variable]:
+                    constraint.on_move(variable, old, new)
+                    update(constraint)
+                if n_conflicted < best_seen:
+                    best_seen, last_improvement = n_conflicted, step
+            
+            return dict(current) if not violated else None
+    
+    @contextlib.contextmanager
+    def _searching(self) -> Iterator[None]:
+        """
+        Reset `self.stats` for a new search, then time it and restore the domains when it is over.
+        The search is also reported to `self.profiler`, if any.
+        """
+        self.stats = SearchStats()
+        profiler: Optional[SearchProfiler] = self.profiler
+        if profiler is not None:
+            profiler.start()
+        start: float = time.perf_counter()
+        original_domains: dict[V, list[D]] = dict(self.domains)	# pruning replaces domain lists, never mutates them
+        try:
+            yield
+        finally:
+            self.domains.update(original_domains)
+            self.stats.elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.stop(self.stats)
+    
+    def _undo(self, trail: Trail, mark: int = 0) -> None:
+        """ Restore the domains pruned since `trail` had `mark` entries (or call their undo functions), most recent first. """
+        while len(trail) > mark:
+            var, domain = trail.pop()
+            if var is UNDO:
+                domain()
+            else:
+                self.domains[var] = domain
+    
+    def _checkers(self, assignment: dict[V, D]) -> tuple[Callable[[V, D], Optional[Constraint[V, D]]],
+                                                         Callable[[V, D], None]]:
+        """
+        Reset the incremental constraints and return two functions for a search that extends `assignment` in place:
         
-        unassigned: Iterator[V] = (
-            var for var in self.variables
-            if var not in assignment
+        assign(variable, value)
+            checks `variable` = `value` (already in `assignment`) and records it in the incremental constraints;
+            returns the first constraint it violates (having recorded nothing), or None
+        unassign(variable, value)
+            forgets a value recorded by `assign` (before it is removed from `assignment`)
+        
+        Incremental constraints are told about each assignment, the others check the whole assignment.
+        With `self.profiler` set, the constraints are replaced by stand-ins that time their checks.
+        """
+        profiler: Optional[SearchProfiler] = self.profiler
+        checked: Callable[[Constraint[V, D]], Constraint[V, D]] = (
+            (lambda constraint: constraint) if profiler is None else profiler.constraint
         )
+        incremental: dict[V, list[Constraint[V, D]]] = {
+            var: [checked(constraint) for constraint in self.constraints[var] if constraint.incremental]
+            for var in self.variables
+        }
+        whole: dict[V, list[Constraint[V, D]]] = {
+            var: [checked(constraint) for constraint in self.constraints[var] if not constraint.incremental]
+            for var in self.variables
+        }
+        
+        def assign(variable: V, value: D) -> Optional[Constraint[V, D]]:
+            for constraint in whole[variable]:
+                if not constraint.satisfied(assignment):
+                    return constraint
+            recorded: list[Constraint[V, D]] = incremental[variable]
+            for i, constraint in enumerate(recorded):
+                if not constraint.on_assign(variable, value):
+                    for done in recorded[:i]:
+                        done.on_unassign(variable, value)
+                    return constraint
+            return None
         
-        first: V = next(unassigned)
-        for value in self.domains[first]:
-            local_assignment = assignment.copy()
-            local_assignment[first] = value
-            # print(local_assignment)
-            # if we're still consistent, we recurse
-            if self.consistent(first, local_assignment):
-                result: dict[V, D] = self.backtracking_search(local_assignment)
-                # if we didn't find the result, we will end up backtracking
-                if result:
-                    return result
-        return None
\ No newline at end of file
+        def unassign(variable: V, value: D) -> None:
+            for constraint in incremental[variable]:
+                constraint.on_unassign(variable, value)
+        
+        for constraints in incremental.values():
+            for constraint in constraints:
+                constraint.reset()	# a constraint on several variables is reset several times, which is harmless
+        return assign, unassign
+    
+    def _search(self, assignment: dict[V, D],
+                select_variable: Optional[VariableSelector],
+                order_values: Optional[ValueOrderer],
+                inference: Optional[Inference]) -> Iterator[dict[V, D]]:
+        """
+        Depth-first search for complete consistent assignments, yielding `assignment` itself whenever it is one.
+        
+        A single `assignment` dictionary is extended and shrunk in place, and the recursion is unrolled
+        onto an explicit stack, so the depth of the search is not limited by Python's recursion limit.
+        Each stack frame holds the variable being assigned, an iterator over the values left to try,
+        the length of `trail` (the log of pruned domains) before its current value was propagated,
+        and, for the default variable order, the position of the variable in `self.variables`.
+        """
+        order_values = order_values or domain_order
+        if self.profiler is not None:
+            select_variable, order_values, inference = self.profiler.wrap(select_variable, order_values, inference)
+        trail: Trail = []
+        unassigned: set[V] = {var for var in self.variables if var not in assignment}
+        cursor: int = 0	# every variable before `self.variables[cursor]` is assigned (default variable order only)
+        
+        assign, unassign = self._checkers(assignment)
+        for var, value in assignment.items():
+            if assign(var, value) is not None:
+                return
+        if inference is not None and not inference(self, None, assignment, trail):
+            return
+        if not unassigned:
+            yield assignment
+            return
+        
+        def next_frame() -> tuple[V, Iterator[D], int, int]:
+            nonlocal cursor
+            if select_variable is None:
+                while self.variables[cursor] in assignment:
+                    cursor += 1
+                variable: V = self.variables[cursor]
+            else:
+                variable = select_variable(self, assignment)
+            unassigned.remove(variable)
+            return variable, iter(order_values(self, variable, assignment)), len(trail), cursor
+        
+        stack: list[tuple[V, Iterator[D], int, int]] = [next_frame()]
+        stats: SearchStats = self.stats
+        while stack:
+            variable, values, mark, frame_cursor = stack[-1]
+            # undo the value tried last for this variable, if any
+            if variable in assignment:
+                unassign(variable, assignment.pop(variable))
+                if len(trail) > mark:
+                    self._undo(trail, mark)
+            
+            for value in values:
+                assignment[variable] = value
+                stats.nodes += 1
+                # if we're still consistent, we go one level deeper
+                if assign(variable, value) is None:
+                    if inference is None or inference(self, variable, assignment, trail):
+                        break
+                    unassign(variable, value)
+                del assignment[variable]
+                if len(trail) > mark:
+                    self._undo(trail, mark)
+            else:
+                # we've run out of values, so we backtrack
+                stack.pop()
+                unassigned.add(variable)
+                cursor = frame_cursor
+                stats.backtracks += 1
+                continue
+            
+            if not unassigned:
+                yield assignment
+            else:
+                stack.append(next_frame())
+
+    
+    def _backjump_search(self, assignment: dict[V, D],
+                         select_variable: Optional[VariableSelector],
+                         order_values: Optional[ValueOrderer],
+                         nogoods: NogoodStore[V, D]) -> Optional[dict[V, D]]:
+        """
+        Conflict-directed backjumping (Prosser's CBJ) with nogood learning: return a solution extending `assignment`, or None.
+        
+        Each variable on the stack collects a conflict set: the earlier variables whose values ruled out its values,
+        as given by `Constraint.conflict_set` for a violated constraint, or by the other pairs of a matched nogood.
+        When it runs out of values, the search jumps straight back to the most recent variable of its conflict set,
+        which inherits the rest of the set, and the assignments of the set are stored as a nogood.
+        Variables given in `assignment` are never jumped back to.
+        Every value of the domain is checked, including those a filtering `order_values` leaves out.
+        """
+        order_values = order_values or domain_order
+        select_variable = select_variable or first_unassigned
+        if self.profiler is not None:
+            select_variable, order_values, _ = self.profiler.wrap(select_variable, order_values, None)
+        stats: SearchStats = self.stats
+        assign, unassign = self._checkers(assignment)
+        for var, value in assignment.items():
+            if assign(var, value) is not None:
+                return None
+        n: int = len(self.variables)
+        
+        def check(variable: V, value: D) -> Optional[set[V]]:
+            """ Check and record `variable` = `value`; return the variables it conflicts with, or None. """
+            violated: Optional[Constraint[V, D]] = assign(variable, value)
+            if violated is not None:
+                return set(violated.conflict_set(variable, assignment))
+            nogood: Optional[Nogood] = nogoods.match(variable, value, assignment)
+            if nogood is not None:
+                unassign(variable, value)
+                return {var for var, _ in nogood if var != variable}
+            return None
+        
+        # each frame holds a variable, an iterator over the values left to try and its conflict set
+        stack: list[tuple[V, Iterator[D], set[V]]] = []
+        level: dict[V, int] = {}	# the position on the stack of each variable assigned by the search
+        
+        def push() -> None:
+            variable: V = select_variable(self, assignment)
+            level[variable] = len(stack)
+            # `order_values` only sets the order: the values it drops are tried last, so that their culprits
+            # enter the conflict set, without which the search could jump back too far
+            ordered: list[D] = list(order_values(self, variable, assignment))
+            tried: set[D] = set(ordered)
+            ordered.extend(value for value in self.domains[variable] if value not in tried)
+            stack.append((variable, iter(ordered), set()))
+        
+        try:
+            if len(assignment) == n:
+                return assignment
+            push()
+            while stack:
+                variable, values, conflicts = stack[-1]
+                if variable in assignment:
+                    unassign(variable, assignment.pop(variable))
+                
+                for value in values:
+                    assignment[variable] = value
+                    stats.nodes += 1
+                    culprits: Optional[set[V]] = check(variable, value)
+                    if culprits is None:
+                        break
+                    conflicts |= culprits
+                    del assignment[variable]
+                else:
+                    # a dead end: no solution contains the assignments of the conflict set
+                    stats.backtracks += 1
+                    jumpable: list[V] = [var for var in conflicts if var in level]
+                    if not jumpable:
+                        return None
+                    target: V = max(jumpable, key=level.__getitem__)
+                    nogoods.learn(((var, assignment[var]) for var in conflicts), (target, assignment[target]))
+                    stats.backjumps += len(stack) - 1 - level[target] - 1
+                    while stack[-1][0] != target:
+                        var = stack.pop()[0]
+                        del level[var]
+                        if var in assignment:
+                            unassign(var, assignment.pop(var))
+                    stack[-1][2].update(conflicts)
+                    stack[-1][2].discard(target)
+                    continue
+                
+                if len(assignment) == n:
+                    return assignment
+                push()
+            return None
+        finally:
+            stats.nogoods, stats.nogood_hits = nogoods.learned, nogoods.hits
+
+# the problem shared by all tasks within a worker process, set by `_init_worker()`
+_shared_csp: Optional[ConstraintSatisfactionProblem] = None
+
+
+def _init_worker(csp: ConstraintSatisfactionProblem) -> None:
+    global _shared_csp
+    _shared_csp = csp
+    _shared_csp.profiler = None	# its counters would stay in this process
+
+
+def _count_solutions_in_worker(assignment: dict[V, D],
+                               select_variable: Optional[VariableSelector],
+                               order_values: Optional[ValueOrderer],
+                               inference: Optional[Inference]) -> tuple[int, SearchStats]:
+    count: int = _shared_csp.count_solutions(assignment, select_variable, order_values, inference)
+    return count, _shared_csp.stats
@@ -0,0 +1,88 @@
+# heuristics.py
+"""
+A module containing variable-selection and value-ordering heuristics for `ConstraintSatisfactionProblem.backtracking_search`.
+
+Variable selection (`select_variable`):
+    first_unassigned: the first unassigned variable in declaration order (the book's behavior)
+    minimum_remaining_values: the variable with the fewest values left that are consistent with the assignment,
+        ties broken by the largest number of constraints shared with other unassigned variables (degree heuristic)
+
+Value ordering (`order_values`):
+    domain_order: the values in the order they are listed in the domain (the book's behavior)
+    least_constraining_value: the values that rule out the fewest values of the neighboring unassigned variables first
+
+Failing early on the most constrained variable prunes big subtrees,
+while trying the least constraining value first leaves the most room for a solution below it.
+"""
+from typing import *
+
+if TYPE_CHECKING:
+    from csp import ConstraintSatisfactionProblem
+
+V = TypeVar('V') # variable type
+D = TypeVar('D') # domain type
+
+
+def legal_values(csp: 'ConstraintSatisfactionProblem[V, D]', variable: V, assignment: dict[V, D]) -> list[D]:
+    """ Return the values of `variable` that are consistent with `assignment`. """
+    legal: list[D] = []
+    for value in csp.domains[variable]:
+        assignment[variable] = value
+        if csp.consistent(variable, assignment):
+            legal.append(value)
+    assignment.pop(variable, None)
+    return legal
+
+
+def first_unassigned(csp: 'ConstraintSatisfactionProblem[V, D]', assignment: dict[V, D]) -> V:
+    """ Select the first unassigned variable in declaration order. """
+    return next(var for var in csp.variables if var not in assignment)
+
+
+def degree(csp: 'ConstraintSatisfactionProblem[V, D]', variable: V, assignment: dict[V, D]) -> int:
+    """ Count the constraints on `variable` that involve at least one other unassigned variable. """
+    return sum(
+        any(other != variable and other not in assignment for other in constraint.variables)
+        for constraint in csp.constraints[variable]
+    )
+
+
+def minimum_remaining_values(csp: 'ConstraintSatisfactionProblem[V, D]', assignment: dict[V, D]) -> V:
+    """
+    Select the unassigned variable with the fewest legal values left,
+    breaking ties by the highest degree and then by declaration order.
+    """
+    best: Optional[V] = None
+    best_key: tuple[int, int] = (0, 0)
+    for var in csp.variables:
+        if var in assignment:
+            continue
+        remaining: int = len(legal_values(csp, var, assignment))
+        if remaining == 0:
+            return var	# a dead end: fail on it right away
+        key: tuple[int, int] = (remaining, -degree(csp, var, assignment))
+        if best is None or key < best_key:
+            best, best_key = var, key
+    return best
+
+
+def domain_order(csp: 'ConstraintSatisfactionProblem[V, D]', variable: V, assignment: dict[V, D]) -> Iterable[D]:
+    """ Try the values in the order they are listed in the domain. """
+    return csp.domains[variable]
+
+
+def least_constraining_value(csp: 'ConstraintSatisfactionProblem[V, D]', variable: V, assignment: dict[V, D]) -> list[D]:
+    """
+    Try first the values that leave the most legal values to the unassigned neighbors of `variable`.
+    Values inconsistent with `assignment` are dropped, since they would fail anyway.
+    """
+    neighbors: list[V] = [var for var in csp.neighbors[variable] if var not in assignment]
+    values: list[D] = legal_values(csp, variable, assignment)
+    scores: list[int] = []
+    for value in values:
+        assignment[variable] = value
+        scores.append(sum(len(legal_values(csp, neighbor, assignment)) for neighbor in neighbors))
+        del assignment[variable]
+    # `sorted` is stable, so ties keep the domain order
+    order: list[int] = sorted(range(len(values)), key=scores.__getitem__, reverse=True)
+    return [values[i] for i in order]
@@ -18,6 +18,7 @@ from rich import print
 from typing import *
 
 from csp import Constraint, ConstraintSatisfactionProblem
+from propagation import arc_consistency
 
 
 class MapColoringConstraint(Constraint[str, str]):
@@ -38,6 +39,10 @@ class MapColoringConstraint(Constraint[str, str]):
         else:
             return assignment[self.region1] != assignment[self.region2]
     
+    def pair_satisfied(self, var1: str, value1: str, var2: str, value2: str) -> bool:
+        """ Fast path for constraint propagation: the two regions only need different colors. """
+        return value1 != value2
+    
 
 if __name__ == '__main__':
     print('[b]Coloring schema for the map of Australia[/b]:')
@@ -78,4 +83,8 @@ if __name__ == '__main__':
         print('No solution found')
     else:
         print(solution)
+    
+    # maintaining arc consistency finds it without backtracking
+    assert csp.backtracking_search(inference=arc_consistency) == solution
+    print(f'{csp.stats.nodes} nodes, {csp.stats.backtracks} backtracks with arc consistency')
     
\ No newline at end of file
@@ -0,0 +1,70 @@
+# nogoods.py
+"""
+A module defining `NogoodStore`, the memory of conflict-directed backjumping in `ConstraintSatisfactionProblem`.
+
+A nogood is a set of (variable, value) pairs that no solution contains.
+Each time backjumping finds that a variable has no value left, the assignments of its conflict set
+(the variables that ruled out its values) make up a new nogood, so the search will never rebuild that combination,
+however it got there.
+
+The store holds at most `capacity` nogoods and forgets the least recently learned or matched one first.
+Each nogood is watched by one of its pairs, the assignment that backjumping went back to (the most recent one),
+and is only looked at when that pair is assigned again. With the default variable order, the other variables
+of the nogood are then always assigned already; with a dynamic order some matches can be missed,
+which costs search but never correctness. The values must be hashable.
+"""
+from typing import *
+from collections import OrderedDict
+
+V = TypeVar('V') # variable type
+D = TypeVar('D') # domain type
+
+Nogood = frozenset[tuple[V, D]]
+
+
+class NogoodStore(Generic[V, D]):
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self.capacity: int = capacity
+        self._nogoods: OrderedDict[Nogood, tuple[V, D]] = OrderedDict()	# with their watches, least recently used first
+        self._watched: dict[tuple[V, D], set[Nogood]] = {}
+        self.learned: int = 0
+        self.hits: int = 0
+        self.evicted: int = 0
+
+    def __len__(self) -> int:
+        return len(self._nogoods)
+
+    def __contains__(self, nogood: Nogood) -> bool:
+        return nogood in self._nogoods
+
+    def learn(self, pairs: Iterable[tuple[V, D]], watch: tuple[V, D]) -> None:
+        """ Remember that no solution contains all of `pairs`, to be checked when the pair `watch` (one of them) is assigned. """
+        if self.capacity <= 0:
+            return
+        nogood: Nogood = frozenset(pairs)
+        if nogood in self._nogoods:
+            self._nogoods.move_to_end(nogood)
+            return
+        if len(self._nogoods) >= self.capacity:
+            self._forget(next(iter(self._nogoods)))
+            self.evicted += 1
+        self._nogoods[nogood] = watch
+        self._watched.setdefault(watch, set()).add(nogood)
+        self.learned += 1
+
+    def _forget(self, nogood: Nogood) -> None:
+        watch: tuple[V, D] = self._nogoods.pop(nogood)
+        nogoods: set[Nogood] = self._watched[watch]
+        nogoods.discard(nogood)
+        if not nogoods:
+            del self._watched[watch]
+
+    def match(self, variable: V, value: D, assignment: dict[V, D]) -> Optional[Nogood]:
+        """ Return a nogood watched by `variable` = `value` and made of pairs of `assignment`, if one is stored. """
+        for nogood in self._watched.get((variable, value), ()):
+            if assignment.items() >= nogood:
+                self._nogoods.move_to_end(nogood)
+                self.hits += 1
+                return nogood
+        return None
@@ -0,0 +1,196 @@
+# profiling.py
+"""
+A module defining `SearchProfiler`, which records where the searches of a `ConstraintSatisfactionProblem` spend their time.
+
+Attach one to a problem, run any number of searches, then read it:
+```
+csp.profiler = SearchProfiler(sample_interval=0.001)
+csp.backtracking_search(select_variable=minimum_remaining_values, inference=forward_checking)
+print(csp.profiler.table())
+csp.profiler.write_collapsed('search.folded')	# for flamegraph.pl, speedscope, ...
+```
+
+It adds up, over the searches it has watched:
+
+    - the nodes and backtracks of `SearchStats`,
+    - for each `Constraint` subclass, the checks made by the search (`satisfied`, or `on_assign` for incremental
+        constraints), how many of them failed and the time they took,
+    - the calls and time of the variable selection, value ordering and inference functions,
+    - with `sample_interval` set, the call stack of the searching thread, sampled every `sample_interval` seconds
+        by a background thread, as collapsed stacks: one line per distinct stack, `outermost;...;innermost count`.
+
+The checks that heuristics and inference functions make on their own, through `satisfied` or `pair_satisfied`,
+are part of the time of those functions, not of the constraints.
+When `csp.profiler` is None (the default), the search runs exactly the code it would without this module:
+the profiler is only looked up once per search, to wrap the constraints and functions it times.
+"""
+from typing import *
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from rich.table import Table
+
+if TYPE_CHECKING:
+    from csp import Constraint, SearchStats
+
+V = TypeVar('V') # variable type
+D = TypeVar('D') # domain type
+F = TypeVar('F', bound=Callable)
+
+
+@dataclass
+class Timing:
+    """ The calls of a function or checks of a constraint, their failures and the seconds they took. """
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+
+
+class _TimedConstraint(Generic[V, D]):
+    """ Stands for a constraint in the checks of a search, timing its checks; anything else goes to the constraint. """
+
+    __slots__ = ('constraint', 'timing')
+
+    def __init__(self, constraint: 'Constraint[V, D]', timing: Timing) -> None:
+        self.constraint: 'Constraint[V, D]' = constraint
+        self.timing: Timing = timing
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.constraint, name)
+
+    def satisfied(self, assignment: dict[V, D]) -> bool:
+        start: float = time.perf_counter()
+        ok: bool = self.constraint.satisfied(assignment)
+        timing: Timing = self.timing
+        timing.seconds += time.perf_counter() - start
+        timing.calls += 1
+        timing.failures += not ok
+        return ok
+
+    def on_assign(self, variable: V, value: D) -> bool:
+        start: float = time.perf_counter()
+        ok: bool = self.constraint.on_assign(variable, value)
+        timing: Timing = self.timing
+        timing.seconds += time.perf_counter() - start
+        timing.calls += 1
+        timing.failures += not ok
+        return ok
+
+    def on_unassign(self, variable: V, value: D) -> None:
+        start: float = time.perf_counter()
+        self.constraint.on_unassign(variable, value)
+        self.timing.seconds += time.perf_counter() - start
+
+
+class SearchProfiler:
+
+    def __init__(self, sample_interval: Optional[float] = None) -> None:
+        self.sample_interval: Optional[float] = sample_interval	# seconds between two samples of the stack (None: no sampling)
+        self.searches: int = 0
+        self.nodes: int = 0
+        self.backtracks: int = 0
+        self.seconds: float = 0.0
+        self.constraints: dict[str, Timing] = {}	# by name of `Constraint` subclass
+        self.functions: dict[str, Timing] = {}	# by role: 'select_variable', 'order_values', 'inference'
+        self.samples: Counter[str] = Counter()	# collapsed stacks and the number of samples that caught them
+        self._sampler: Optional[threading.Thread] = None
+        self._stop: Optional[threading.Event] = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the sampling thread stays in this process
+        return {**self.__dict__, '_sampler': None, '_stop': None}
+
+    def constraint(self, constraint: 'Constraint[V, D]') -> _TimedConstraint[V, D]:
+        """ Return a stand-in for `constraint` whose checks are counted and timed under its class. """
+        name: str = type(constraint).__name__
+        timing: Optional[Timing] = self.constraints.get(name)
+        if timing is None:
+            timing = self.constraints[name] = Timing()
+        return _TimedConstraint(constraint, timing)
+
+    def wrap(self, select_variable: Optional[F], order_values: Optional[F], inference: Optional[F]
+             ) -> tuple[Optional[F], Optional[F], Optional[F]]:
+        """ Return wrappers of the functions given to a search (None stays None) whose calls are counted and timed. """
+        return (
+            self._timed('select_variable', select_variable),
+            self._timed('order_values', order_values),
+            self._timed('inference', inference)
+        )
+
+    def _timed(self, role: str, function: Optional[F]) -> Optional[F]:
+        """ Time the calls of `function` under `role`; a call returning False (e.g. a wipeout) counts as a failure. """
+        if function is None:
+            return None
+        timing: Optional[Timing] = self.functions.get(role)
+        if timing is None:
+            timing = self.functions[role] = Timing()
+
+        def timed(*args: Any) -> Any:
+            start: float = time.perf_counter()
+            result: Any = function(*args)
+            timing.seconds += time.perf_counter() - start
+            timing.calls += 1
+            timing.failures += result is False
+            return result
+
+        return cast(F, timed)
+
+    def start(self) -> None:
+        """ Start sampling the stack of the calling thread, if sampling is on. Called when a search starts. """
+        if self.sample_interval is not None and self._sampler is None:
+            self._stop = threading.Event()
+            self._sampler = threading.Thread(
+                target=self._sample, args=(threading.get_ident(), self._stop), daemon=True
+            )
+            self._sampler.start()
+
+    def stop(self, stats: 'SearchStats') -> None:
+        """ Stop sampling and add the counters of a finished search. """
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = self._stop = None
+        self.searches += 1
+        self.nodes += stats.nodes
+        self.backtracks += stats.backtracks
+        self.seconds += stats.elapsed
+
+    def _sample(self, thread_id: int, stop: threading.Event) -> None:
+        while not stop.wait(self.sample_interval):
+            frame: Optional[Any] = sys._current_frames().get(thread_id)
+            names: list[str] = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                frame = frame.f_back
+            if names:
+                self.samples[';'.join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        """ Return the sampled stacks in the collapsed format of flamegraph tools, most frequent first. """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.samples.most_common())
+
+    def write_collapsed(self, path: str) -> None:
+        """ Write the sampled stacks in the collapsed format to `path`. """
+        with open(path, 'w') as file:
+            file.write(self.collapsed())
+
+    def table(self) -> Table:
+        """ Return the counters as a table: the constraints, then the functions, the most expensive first. """
+        table: Table = Table(title=(
+            f'{self.searches} search(es): {self.nodes:,} nodes, {self.backtracks:,} backtracks, {self.seconds:.3f} s'
+        ))
+        for column in ('', 'calls', 'failures', 'seconds', 'µs per call'):
+            table.add_column(column, justify='right')
+        for timings in (self.constraints, self.functions):
+            for name, timing in sorted(timings.items(), key=lambda item: -item[1].seconds):
+                table.add_row(
+                    name, f'{timing.calls:,}', f'{timing.failures:,}', f'{timing.seconds:.3f}',
+                    f'{timing.seconds / timing.calls * 1e6:.2f}' if timing.calls else '-'
+                )
+            table.add_section()
+        return table
@@ -0,0 +1,152 @@
+# propagation.py
+"""
+A module containing inference (constraint propagation) functions for `ConstraintSatisfactionProblem.backtracking_search`.
+
+After a variable is assigned, an inference function removes from the domains of the unassigned variables
+the values that can no longer be part of a solution, so that dead ends are found before they are reached.
+
+    forward_checking: remove the values of each unassigned neighbor that conflict with the assignment
+    arc_consistency: forward checking, then AC-3 on the binary constraints between unassigned variables
+        (maintaining arc consistency, a.k.a. MAC)
+
+Every inference function has the signature `inference(csp, variable, assignment, trail) -> bool`.
+It replaces `csp.domains[var]` with a pruned list and records the replaced list on `trail` as (var, old domain),
+so that the search can restore the domains when it backtracks.
+It returns False as soon as some domain becomes empty (a wipeout).
+A propagating constraint that keeps its own record of removed values can instead log a function undoing a change
+with `_record_undo(trail, undo)`, which the search calls when it backtracks past that entry.
+With `variable` None, it propagates the whole `assignment` (and for AC-3 every arc), which is done once before the search.
+
+Binary constraints (those with exactly two variables) are checked pair by pair with `Constraint.pair_satisfied`,
+which subclasses like `MapColoringConstraint` can override with a fast comparison.
+Global constraints with `Constraint.propagates` set, like `all_different.AllDifferentConstraint`,
+prune the domains themselves with `Constraint.propagate`.
+Other constraints are checked with `Constraint.satisfied` on the assignment extended with the candidate value.
+"""
+from typing import *
+from collections import deque
+
+if TYPE_CHECKING:
+    from csp import ConstraintSatisfactionProblem, Constraint
+
+V = TypeVar('V') # variable type
+D = TypeVar('D') # domain type
+
+Trail = list[tuple[V, list[D]]]
+Inference = Callable[['ConstraintSatisfactionProblem[V, D]', Optional[V], dict[V, D], Trail], bool]
+
+UNDO: object = object()	# the variable of the trail entries that hold an undo function instead of a domain
+
+
+def _record_undo(trail: Trail, undo: Callable[[], None]) -> None:
+    """ Log on `trail` a function to call when the search backtracks past this point. """
+    trail.append((UNDO, undo))
+
+
+def _prune(csp: 'ConstraintSatisfactionProblem[V, D]', var: V, kept: list[D], trail: Trail) -> bool:
+    """ Replace the domain of `var` by `kept` if it is smaller. Return False if `kept` is empty. """
+    domain: list[D] = csp.domains[var]
+    if len(kept) < len(domain):
+        trail.append((var, domain))
+        csp.domains[var] = kept
+        csp.stats.pruned += len(domain) - len(kept)
+    return bool(kept)
+
+
+def _check_neighbor(csp: 'ConstraintSatisfactionProblem[V, D]', variable: V, neighbor: V, assignment: dict[V, D]) -> list[D]:
+    """ Return the values of unassigned `neighbor` that are consistent with the constraints it shares with `variable`. """
+    value: D = assignment[variable]
+    binary: list['Constraint[V, D]'] = [
+        constraint for other, constraint in csp.arcs[variable] if other == neighbor
+    ]
+    nary: list['Constraint[V, D]'] = [
+        constraint for constraint in csp.constraints[variable]
+        if len(constraint.variables) != 2 and not constraint.propagates and neighbor in constraint.variables
+    ]
+    kept: list[D] = []
+    for candidate in csp.domains[neighbor]:
+        if not all(constraint.pair_satisfied(variable, value, neighbor, candidate) for constraint in binary):
+            continue
+        if nary:
+            assignment[neighbor] = candidate
+            ok: bool = all(constraint.satisfied(assignment) for constraint in nary)
+            del assignment[neighbor]
+            if not ok:
+                continue
+        kept.append(candidate)
+    return kept
+
+
+def forward_checking(csp: 'ConstraintSatisfactionProblem[V, D]', variable: Optional[V], assignment: dict[V, D], trail: Trail) -> bool:
+    """ Remove the values of the unassigned neighbors of `variable` that conflict with `assignment`. """
+    variables: Iterable[V] = list(assignment) if variable is None else (variable,)
+    for var in variables:
+        # the neighbors sharing a constraint that is checked value by value; propagating ones are left to `propagate`
+        checked: set[V] = {
+            other for constraint in csp.constraints[var] if not constraint.propagates for other in constraint.variables
+        }
+        if not checked:
+            continue
+        for neighbor in csp.neighbors[var]:
+            if neighbor not in assignment and neighbor in checked:
+                if not _prune(csp, neighbor, _check_neighbor(csp, var, neighbor, assignment), trail):
+                    return False
+    # global constraints prune on their own, all of them before the search
+    propagators: dict[int, 'Constraint[V, D]'] = {	# by id, since a constraint is shared by its variables
+        id(constraint): constraint
+        for var in (csp.variables if variable is None else (variable,))
+        for constraint in csp.constraints[var] if constraint.propagates
+    }
+    return all(constraint.propagate(csp, variable, assignment, trail) for constraint in propagators.values())
+
+
+def _revise(csp: 'ConstraintSatisfactionProblem[V, D]', x: V, y: V, constraint: 'Constraint[V, D]', trail: Trail) -> Optional[bool]:
+    """
+    Remove the values of `x` that no value of `y` supports under the binary `constraint`.
+    Return None on a wipeout, otherwise whether the domain of `x` changed.
+    """
+    y_domain: list[D] = csp.domains[y]
+    kept: list[D] = [
+        vx for vx in csp.domains[x]
+        if any(constraint.pair_satisfied(x, vx, y, vy) for vy in y_domain)
+    ]
+    changed: bool = len(kept) < len(csp.domains[x])
+    if not _prune(csp, x, kept, trail):
+        return None
+    return changed
+
+
+def arc_consistency(csp: 'ConstraintSatisfactionProblem[V, D]', variable: Optional[V], assignment: dict[V, D], trail: Trail) -> bool:
+    """
+    Forward check `variable`, then make every binary constraint between unassigned variables arc consistent with AC-3.
+    Only the arcs pointing at variables whose domains shrank need to be revisited.
+    """
+    if not forward_checking(csp, variable, assignment, trail):
+        return False
+
+    if variable is None:
+        queue: deque[tuple[V, V, 'Constraint[V, D]']] = deque(
+            (x, y, constraint)
+            for x in csp.variables if x not in assignment
+            for y, constraint in csp.arcs[x] if y not in assignment
+        )
+    else:
+        # forward checking has already revised the arcs towards `variable`; start from its neighbors' arcs
+        queue = deque(
+            (x, y, constraint)
+            for y in csp.neighbors[variable] if y not in assignment
+            for x, constraint in csp.arcs[y] if x not in assignment
+        )
+
+    while queue:
+        x, y, constraint = queue.popleft()
+        changed: Optional[bool] = _revise(csp, x, y, constraint, trail)
+        if changed is None:
+            return False
+        if changed:
+            queue.extend(
+                (z, x, other_constraint)
+                for z, other_constraint in csp.arcs[x]
+                if z != y and z not in assignment
+            )
+    return True
@@ -1,6 +1,7 @@
 # queens.py
 """
 Place 8 queens on the chess board so that no two queens are threatening each other.
+(More generally, place N queens on an N x N board.)
 
 Variables:
     8 columns (rows) of a chess board
@@ -14,42 +15,250 @@ Constraint:
 """
 from rich import print
 import json
+import random
 from typing import *
 
+import numpy as np
+
 from csp import Constraint, ConstraintSatisfactionProblem
+from heuristics import minimum_remaining_values, least_constraining_value
+from propagation import forward_checking
 
 
 
 class QueenConstraint(Constraint[int, int]):
     
+    incremental: bool = True
+    
     def __init__(self, columns: list[int]) -> None:
         super().__init__(columns)
         self.columns: list[int] = columns
+        self._column_set: set[int] = set(columns)
+        # rows and diagonals taken by the queens placed so far (incremental checking)
+        self.rows: set[int] = set()
+        self.diagonals: set[int] = set()	# row - column is the same along a diagonal
+        self.anti_diagonals: set[int] = set()	# row + column is the same along an anti-diagonal
     
     def satisfied(self, assignment: dict[int, int]) -> bool:
         """
         The constraint is satisfied if no pair of queens are on the same column, row, or diagonal.
         They will be assigned sequentially to different columns, so there is no need to check on the columns.
         
-        Check the diagonal by taking the difference between their columns and between their rows.
-        If these differences are the same values, then they are on a diagonal path.
+        Two queens are on the same diagonal if the differences (or the sums) of their rows and columns are equal,
+        so it is enough to check that the rows, the differences and the sums are all distinct.
         """
-        for col1, row1 in assignment.items():
-            for col2 in self.columns:
-                if (col1 != col2) and (col2 in assignment):
-                    row2: int = assignment[col2]
-                    if row1 == row2:	# check row
-                        return False
-                    if abs(row1 - row2) == abs(col1 - col2):	# check diagonal
-                        return False
+        placed: list[tuple[int, int]] = [(col, row) for col, row in assignment.items() if col in self._column_set]
+        n: int = len(placed)
+        return (
+            len({row for _, row in placed}) == n
+            and len({row - col for col, row in placed}) == n
+            and len({row + col for col, row in placed}) == n
+        )
+    
+    def conflict_set(self, column: int, assignment: dict[int, int]) -> list[int]:
+        """ The columns whose queens attack the queen of `column`. """
+        row: int = assignment[column]
+        return [
+            col for col in self.columns
+            if col != column and col in assignment
+            and (assignment[col] == row or abs(assignment[col] - row) == abs(col - column))
+        ]
+    
+    def reset(self) -> None:
+        self.rows.clear()
+        self.diagonals.clear()
+        self.anti_diagonals.clear()
+    
+    def on_assign(self, column: int, row: int) -> bool:
+        """ A queen can go to (`column`, `row`) if its row and both of its diagonals are free. """
+        if row in self.rows or row - column in self.diagonals or row + column in self.anti_diagonals:
+            return False
+        self.rows.add(row)
+        self.diagonals.add(row - column)
+        self.anti_diagonals.add(row + column)
         return True
+    
+    def on_unassign(self, column: int, row: int) -> None:
+        self.rows.remove(row)
+        self.diagonals.remove(row - column)
+        self.anti_diagonals.remove(row + column)
+    
+    # `min_conflicts` keeps NumPy arrays counting the queens in each row and diagonal,
+    # so that the conflicts of a whole column are counted with a few vectorized operations.
+    # The columns and rows are those of `queens_csp`: 0 to n - 1.
+    
+    def start_moves(self, assignment: dict[int, int]) -> None:
+        n: int = len(self.columns)
+        self.queen_rows: np.ndarray = np.fromiter(
+            (assignment.get(col, -1) for col in self.columns), dtype=np.int64, count=n
+        )	# -1 where the column has no queen yet
+        placed: np.ndarray = self.queen_rows >= 0
+        rows, columns = self.queen_rows[placed], np.flatnonzero(placed)
+        self.row_counts: np.ndarray = np.bincount(rows, minlength=n)
+        self.diagonal_counts: np.ndarray = np.bincount(rows - columns + n - 1, minlength=2 * n - 1)
+        self.anti_diagonal_counts: np.ndarray = np.bincount(rows + columns, minlength=2 * n - 1)
+        self._domain: tuple[Optional[Sequence[int]], Optional[np.ndarray], bool] = (None, None, False)
+    
+    def on_move(self, column: int, old: Optional[int], new: int) -> None:
+        n: int = len(self.columns)
+        if old is not None:
+            self.row_counts[old] -= 1
+            self.diagonal_counts[old - column + n - 1] -= 1
+            self.anti_diagonal_counts[old + column] -= 1
+        self.row_counts[new] += 1
+        self.diagonal_counts[new - column + n - 1] += 1
+        self.anti_diagonal_counts[new + column] += 1
+        self.queen_rows[column] = new
+    
+    def conflicted_variables(self, assignment: dict[int, int]) -> list[int]:
+        """
+        The columns whose queen shares its row or a diagonal with another queen, found from the counters:
+        the rows and diagonals holding several queens are found first, since there are few of them near a solution.
+        """
+        n: int = len(self.columns)
+        rows: np.ndarray = np.flatnonzero(self.row_counts > 1)
+        diagonals: np.ndarray = np.flatnonzero(self.diagonal_counts > 1) - (n - 1)
+        anti_diagonals: np.ndarray = np.flatnonzero(self.anti_diagonal_counts > 1)
+        if not (len(rows) or len(diagonals) or len(anti_diagonals)):
+            return []
+        columns: np.ndarray = np.arange(n)
+        attacked: np.ndarray = (
+            np.isin(self.queen_rows, rows)
+            | np.isin(self.queen_rows - columns, diagonals)
+            | np.isin(self.queen_rows + columns, anti_diagonals)
+        )
+        return np.flatnonzero(attacked).tolist()
+    
+    def count_conflicts(self, column: int, values: Sequence[int], assignment: dict[int, int]) -> np.ndarray:
+        """ The number of queens attacking each of the rows `values` of `column`, as an array. """
+        n: int = len(self.columns)
+        if self._domain[0] is not values:
+            # the same domain list is shared by every column; the whole board is the usual case
+            array: np.ndarray = np.asarray(values, dtype=np.int64)
+            self._domain = (values, array, len(array) == n and bool(np.all(array == np.arange(n))))
+        _, rows, whole = self._domain
+        if whole:
+            # every row in order: the diagonals through the column are contiguous slices of the counters
+            counts: np.ndarray = (
+                self.row_counts
+                + self.diagonal_counts[n - 1 - column:2 * n - 1 - column]
+                + self.anti_diagonal_counts[column:column + n]
+            )
+        else:
+            counts = (
+                self.row_counts[rows]
+                + self.diagonal_counts[rows - column + n - 1]
+                + self.anti_diagonal_counts[rows + column]
+            )
+        own: int = int(self.queen_rows[column])
+        if own >= 0:
+            counts[rows == own] -= 3	# the queen does not attack itself
+        return counts
+
+
+def queens_csp(n: int = 8) -> ConstraintSatisfactionProblem[int, int]:
+    """ Build the N-queens problem on an `n` x `n` board. """
+    columns: list[int] = list(range(n))
+    all_rows: list[int] = list(range(n))
+    rows: dict[int, list[int]] = {
+        col: all_rows	# shared: the search replaces domains, never modifies them
+        for col in columns
+    }
+    csp: ConstraintSatisfactionProblem[int, int] = \
+         ConstraintSatisfactionProblem(columns, rows)
+    csp.add_constraint(QueenConstraint(columns))
+    return csp
+
+
+class BitboardQueens(ConstraintSatisfactionProblem[int, int]):
+    """
+    The N-queens problem of `queens_csp`, searched with bitboards.
+    
+    The rows taken and the diagonals attacked in the next column are each kept as a bitmask of n bits,
+    so the free rows of a column are found with a couple of bitwise operations,
+    and only safe rows are ever tried (`stats.nodes` counts the queens placed).
+    The columns are filled in order, and the `select_variable`, `order_values` and `inference` arguments
+    of the search methods are ignored, but any partial `assignment` is honored,
+    so `backtracking_search`, `iter_solutions` and `count_solutions` (also with `workers`) work as usual.
+    """
+    
+    def __init__(self, n: int = 8) -> None:
+        columns: list[int] = list(range(n))
+        rows: list[int] = list(range(n))
+        super().__init__(columns, {col: rows for col in columns})
+        self.add_constraint(QueenConstraint(columns))
+        self.n: int = n
+    
+    def _search(self, assignment: dict[int, int],
+                select_variable: Optional[Callable],
+                order_values: Optional[Callable],
+                inference: Optional[Callable]) -> Iterator[dict[int, int]]:
+        n: int = self.n
+        if n == 0:
+            yield assignment
+            return
+        full: int = (1 << n) - 1
+        given: dict[int, int] = {col: 1 << row for col, row in assignment.items()}
+        stats = self.stats
+        saved: list[tuple[int, int, int, int]] = [(0, 0, 0, 0)] * n	# the state of each column below the current one
+        
+        col: int = 0
+        taken: int = 0	# rows taken
+        down: int = 0	# rows attacked in this column along the diagonals going down to the right
+        up: int = 0	# rows attacked in this column along the diagonals going up to the right
+        free: int = full & given.get(0, full)
+        while True:
+            if free:
+                bit: int = free & -free	# the lowest free row
+                free ^= bit
+                stats.nodes += 1
+                assignment[col] = bit.bit_length() - 1
+                if col == n - 1:
+                    yield assignment
+                    continue
+                saved[col] = (free, taken, down, up)
+                taken |= bit
+                down = ((down | bit) << 1) & full
+                up = (up | bit) >> 1
+                col += 1
+                free = ~(taken | down | up) & full & given.get(col, full)
+            else:
+                stats.backtracks += 1
+                if col == 0:
+                    return
+                col -= 1	# the rows assigned to the columns after it are overwritten before the next solution
+                free, taken, down, up = saved[col]
+
+
+def greedy_placement(n: int, seed: Optional[int] = None, tries: int = 128) -> dict[int, int]:
+    """
+    Place `n` queens on distinct rows with few conflicts, as a starting point for `min_conflicts` on a big board.
+    
+    Column by column, a row is drawn at random among those left until it is on two free diagonals
+    (Sosič and Gu's initialization), giving up after `tries` draws, which mostly happens for the last few columns.
+    This takes linear time, where the greedy start of `min_conflicts` would count the conflicts of every row of every column.
+    """
+    draw: Callable[[], float] = random.Random(seed).random
+    rows: list[int] = list(range(n))
+    diagonals: bytearray = bytearray(2 * n - 1)
+    anti_diagonals: bytearray = bytearray(2 * n - 1)
+    for col in range(n):
+        for _ in range(tries):
+            i: int = col + int(draw() * (n - col))
+            row: int = rows[i]
+            if not diagonals[row - col + n - 1] and not anti_diagonals[row + col]:
+                break
+        rows[col], rows[i] = rows[i], rows[col]
+        diagonals[row - col + n - 1] = anti_diagonals[row + col] = 1
+    return dict(enumerate(rows))
 
 
 def display_board(solution: dict[int, int]) -> str:
     """Print out the queens on a chessboard layout."""
     QUEEN = 'Q'
+    n: int = len(solution)
     
-    board = [['*'] * 8 for _ in range(8)]
+    board = [['*'] * n for _ in range(n)]
     for col, row in solution.items():
         board[row][col] = QUEEN
     
@@ -60,19 +269,43 @@ def display_board(solution: dict[int, int]) -> str:
 
 
 if __name__ == '__main__':
-    columns: list[int] = list(range(8))
-    rows: dict[int, list[int]] = {
-        col: list(range(8))
-        for col in columns
-    }
+    import sys
     
-    csp: ConstraintSatisfactionProblem[int, int] = \
-         ConstraintSatisfactionProblem(columns, rows)
-    csp.add_constraint(QueenConstraint(columns))
+    csp: ConstraintSatisfactionProblem[int, int] = queens_csp(8)
     
     solution: Optional[dict[int, int]] = csp.backtracking_search()
     if not solution:
         print('No solution found')
     else:
         print(solution)
-        print(display_board(solution))
\ No newline at end of file
+        print(display_board(solution))
+    print(f'{csp.count_solutions()} solutions in all')
+    
+    n: int = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    if 'count' in sys.argv[2:]:
+        # count every solution on a bigger board with all the cores, e.g. `python queens.py 14 count`
+        csp = queens_csp(n)
+        count: int = csp.count_solutions(inference=forward_checking, workers=None)
+        print(f'{n}-queens: {count} solutions, {csp.stats.nodes} nodes, {csp.stats.elapsed:.3f} s')
+        sys.exit()
+    if 'local' in sys.argv[2:]:
+        # repair a greedy placement with min-conflicts, e.g. `python queens.py 1000000 local`
+        csp = queens_csp(n)
+        solution = csp.min_conflicts(assignment=greedy_placement(n, seed=0), seed=0)
+        print(f'{n}-queens: {"solved" if solution else "not solved"} in {csp.stats.nodes} moves, {csp.stats.elapsed:.3f} s')
+        sys.exit()
+    
+    # compare the heuristics on a bigger board, e.g. `python queens.py 30`
+    strategies: dict[str, dict[str, Callable]] = {
+        'declaration order': {},
+        'MRV + degree': {'select_variable': minimum_remaining_values},
+        'MRV + degree, LCV': {'select_variable': minimum_remaining_values, 'order_values': least_constraining_value},
+        'MRV + degree, forward checking': {'select_variable': minimum_remaining_values, 'inference': forward_checking},
+    }
+    if n > 20:
+        del strategies['declaration order']	# takes far too long
+    print(f'[b]{n}-queens[/b]')
+    for name, heuristics in strategies.items():
+        csp = queens_csp(n)
+        csp.backtracking_search(**heuristics)
+        print(f'{name}: {csp.stats.nodes} nodes, {csp.stats.backtracks} backtracks, {csp.stats.elapsed:.3f} s')
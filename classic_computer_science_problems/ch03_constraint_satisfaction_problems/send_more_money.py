@@ -17,13 +17,17 @@ from textwrap import dedent
 from typing import *
 
 from csp import Constraint, ConstraintSatisfactionProblem
+from propagation import forward_checking
+from all_different import AllDifferentConstraint
 
 
 class SendMoreMoneyConstraint(Constraint[str, int]):
     
-    def __init__(self, letters: list[str]) -> None:
+    def __init__(self, letters: list[str], distinct: bool = True) -> None:
+        """ With `distinct` False, the letters are not checked for duplicate digits (leave it to an `AllDifferentConstraint`). """
         super().__init__(letters)
         self.letters: list[str] = letters
+        self.distinct: bool = distinct
     
     def satisfied(self, assignment: dict[str, int]) -> bool:
         """
@@ -35,7 +39,7 @@ class SendMoreMoneyConstraint(Constraint[str, int]):
             return True.
         """
         
-        if len(set(assignment.values())) < len(assignment):
+        if self.distinct and len(set(assignment.values())) < len(assignment):
             return False
         
         if len(assignment) == len(self.letters):
@@ -68,11 +72,11 @@ class SendMoreMoneyConstraint(Constraint[str, int]):
             return send + more == money
         
         return True
-    
 
-if __name__ == '__main__':
-    
-    letters: list[str] = list(set('sendmoremoney'.upper()))
+
+def send_more_money_csp(all_different: bool = False) -> ConstraintSatisfactionProblem[str, int]:
+    """ Build the puzzle, checking that the digits differ with an `AllDifferentConstraint` if `all_different`. """
+    letters: list[str] = sorted(set('sendmoremoney'.upper()))
     digits: dict[str, list[int]] = {
         letter: list(range(10))
         for letter in letters
@@ -80,9 +84,25 @@ if __name__ == '__main__':
     digits['M'] = [1] # so we don't get answers starting with a zero
     
     csp: ConstraintSatisfactionProblem[str, int] = ConstraintSatisfactionProblem(letters, digits)
-    csp.add_constraint(SendMoreMoneyConstraint(letters))
+    if all_different:
+        csp.add_constraint(AllDifferentConstraint(letters))
+    csp.add_constraint(SendMoreMoneyConstraint(letters, distinct=not all_different))
+    return csp
+
+
+if __name__ == '__main__':
+    
+    csp: ConstraintSatisfactionProblem[str, int] = send_more_money_csp()
     
     solution: Optional[dict[str, int]] = csp.backtracking_search()
+    print(f'{csp.stats.nodes} nodes, {csp.stats.elapsed:.3f} s without inference')
+    csp.backtracking_search(inference=forward_checking)
+    print(f'{csp.stats.nodes} nodes, {csp.stats.elapsed:.3f} s with forward checking')
+    for inference in (None, forward_checking):
+        csp = send_more_money_csp(all_different=True)
+        csp.backtracking_search(inference=inference)
+        print(f'{csp.stats.nodes} nodes, {csp.stats.elapsed:.3f} s with AllDifferentConstraint'
+              f'{" and forward checking" if inference else ""}')
     if not solution:
         print('No solution found')
     else:
@@ -0,0 +1,377 @@
+# test_csp.py
+"""
+A pytest script testing the search strategies of `ConstraintSatisfactionProblem` on the problems of this chapter.
+"""
+import unittest
+import random
+from typing import *
+
+from csp import ConstraintSatisfactionProblem
+from heuristics import minimum_remaining_values, least_constraining_value
+from propagation import forward_checking, arc_consistency
+from map_coloring import MapColoringConstraint
+from queens import queens_csp, QueenConstraint, BitboardQueens, greedy_placement
+from all_different import AllDifferentConstraint
+from nogoods import NogoodStore
+from profiling import SearchProfiler
+from benchmark_csp import clustered_map
+from word_search import WordSearchConstraint, PlacementIndex, LivePlacements, generate_domain
+
+
+REGIONS: list[str] = [
+    'Western Australia', 'Northern Territory', 'South Australia', 'Queensland',
+    'New South Wales', 'Victoria', 'Tasmania'
+]
+BORDERS: list[tuple[str, str]] = [
+    ('Western Australia', 'Northern Territory'),
+    ('Western Australia', 'South Australia'),
+    ('Northern Territory', 'Queensland'),
+    ('Northern Territory', 'South Australia'),
+    ('South Australia', 'Queensland'),
+    ('Queensland', 'New South Wales'),
+    ('South Australia', 'New South Wales'),
+    ('South Australia', 'Victoria'),
+    ('New South Wales', 'Victoria'),
+    ('Victoria', 'Tasmania')
+]
+STRATEGIES: list[dict[str, Callable]] = [
+    {},
+    {'select_variable': minimum_remaining_values},
+    {'order_values': least_constraining_value},
+    {'select_variable': minimum_remaining_values, 'order_values': least_constraining_value},
+    {'inference': forward_checking},
+    {'inference': arc_consistency},
+    {'select_variable': minimum_remaining_values, 'inference': forward_checking},
+]
+
+
+def australia_csp(colors: list[str]) -> ConstraintSatisfactionProblem[str, str]:
+    csp: ConstraintSatisfactionProblem[str, str] = ConstraintSatisfactionProblem(
+        REGIONS, {region: list(colors) for region in REGIONS}
+    )
+    for pair in BORDERS:
+        csp.add_constraint(MapColoringConstraint(*pair))
+    return csp
+
+
+def is_valid_queens(solution: dict[int, int], n: int) -> bool:
+    return len(solution) == n and all(
+        solution[c1] != solution[c2] and abs(solution[c1] - solution[c2]) != c2 - c1
+        for c1 in range(n) for c2 in range(c1 + 1, n)
+    )
+
+
+class BacktrackingSearchTests(unittest.TestCase):
+
+    """ Tests for `ConstraintSatisfactionProblem.backtracking_search` with each combination of heuristics. """
+
+    def test_map_coloring(self):
+        """ Australia can be colored with three colors but not with two. """
+        for strategy in STRATEGIES:
+            solution = australia_csp(['red', 'green', 'blue']).backtracking_search(**strategy)
+            self.assertEqual(set(solution), set(REGIONS))
+            self.assertTrue(all(solution[a] != solution[b] for a, b in BORDERS))
+            self.assertIsNone(australia_csp(['red', 'green']).backtracking_search(**strategy))
+
+    def test_queens(self):
+        """ Every strategy places 10 queens. """
+        for strategy in STRATEGIES:
+            csp = queens_csp(10)
+            self.assertTrue(is_valid_queens(csp.backtracking_search(**strategy), 10))
+            self.assertGreater(csp.stats.nodes, 0)
+
+    def test_deep_search(self):
+        """ Coloring a path of 10,000 regions goes deeper than Python's recursion limit. """
+        regions: list[int] = list(range(10_000))
+        csp = ConstraintSatisfactionProblem(regions, {region: ['red', 'green'] for region in regions})
+        for region in regions[1:]:
+            csp.add_constraint(MapColoringConstraint(region - 1, region))
+        solution = csp.backtracking_search()
+        self.assertEqual(len(solution), 10_000)
+        self.assertTrue(all(solution[region - 1] != solution[region] for region in regions[1:]))
+
+    def test_partial_assignment(self):
+        """ The search extends the given assignment without modifying it. """
+        given: dict[int, int] = {0: 1}
+        solution = queens_csp(8).backtracking_search(given)
+        self.assertEqual(given, {0: 1})
+        self.assertEqual(solution[0], 1)
+        self.assertTrue(is_valid_queens(solution, 8))
+
+
+class SolutionEnumerationTests(unittest.TestCase):
+
+    """ Tests for `iter_solutions` and `count_solutions`. """
+
+    def test_all_solutions(self):
+        """ 8 queens have 92 distinct solutions, whatever the strategy. """
+        for strategy in STRATEGIES:
+            solutions = list(queens_csp(8).iter_solutions(**strategy))
+            self.assertEqual(len(solutions), 92)
+            self.assertTrue(all(is_valid_queens(solution, 8) for solution in solutions))
+            self.assertEqual(len({tuple(sorted(solution.items())) for solution in solutions}), 92)
+            self.assertEqual(queens_csp(8).count_solutions(**strategy), 92)
+
+    def test_parallel_count(self):
+        """ Splitting the search across processes counts the same solutions and nodes. """
+        serial, parallel = queens_csp(8), queens_csp(8)
+        self.assertEqual(serial.count_solutions(), 92)
+        self.assertEqual(parallel.count_solutions(workers=2), 92)
+        self.assertEqual(serial.stats.nodes, parallel.stats.nodes)
+        self.assertEqual(australia_csp(['red', 'green', 'blue']).count_solutions(inference=arc_consistency, workers=2), 12)
+
+    def test_early_close(self):
+        """ Abandoning the enumeration restores the domains. """
+        csp = australia_csp(['red', 'green', 'blue'])
+        solutions = csp.iter_solutions(inference=forward_checking)
+        next(solutions)
+        solutions.close()
+        self.assertEqual(csp.domains, {region: ['red', 'green', 'blue'] for region in REGIONS})
+
+
+class BackjumpingTests(unittest.TestCase):
+
+    """ Tests for conflict-directed backjumping and `NogoodStore`. """
+
+    def test_random_maps(self):
+        """ Backjumping agrees with chronological backtracking on random maps with restricted colors, whatever the strategy. """
+        for seed in range(500):
+            rng = random.Random(seed)
+            borders = [(a, b) for a in range(10) for b in range(a + 1, 10) if rng.random() < 0.3]
+            domains = {region: rng.sample(['red', 'green', 'blue'], rng.randint(1, 3)) for region in range(10)}
+            problems = [ConstraintSatisfactionProblem(list(range(10)), dict(domains)) for _ in range(2)]
+            for csp in problems:
+                for pair in borders:
+                    csp.add_constraint(MapColoringConstraint(*pair))
+            expected = problems[0].backtracking_search()
+            for strategy in (
+                {}, {'select_variable': minimum_remaining_values}, {'order_values': least_constraining_value},
+                {'select_variable': minimum_remaining_values, 'order_values': least_constraining_value},
+            ):
+                solution = problems[1].backtracking_search(backjumping=True, **strategy)
+                self.assertEqual(solution is None, expected is None)
+                if solution is not None:
+                    self.assertTrue(all(solution[a] != solution[b] for a, b in borders))
+
+    def test_fewer_nodes(self):
+        """ Backjumping skips the clusters that have nothing to do with the conflict. """
+        for solvable in (True, False):
+            chronological, backjumping = clustered_map(2, solvable=solvable), clustered_map(2, solvable=solvable)
+            chronological.backtracking_search()
+            self.assertEqual(backjumping.backtracking_search(backjumping=True) is None, not solvable)
+            self.assertLess(backjumping.stats.nodes * 100, chronological.stats.nodes)
+            self.assertGreater(backjumping.stats.backjumps, 0)
+        with self.assertRaises(ValueError):
+            backjumping.backtracking_search(backjumping=True, inference=forward_checking)
+
+    def test_nogood_store(self):
+        """ The least recently used nogood is forgotten first, and a nogood matches only a superset of it. """
+        store = NogoodStore(capacity=2)
+        store.learn([('a', 1), ('b', 2)], ('b', 2))
+        store.learn([('a', 1), ('c', 3)], ('c', 3))
+        self.assertIsNotNone(store.match('b', 2, {'a': 1, 'b': 2}))
+        self.assertIsNone(store.match('c', 3, {'a': 2, 'c': 3}))
+        store.learn([('d', 4)], ('d', 4))
+        self.assertEqual((len(store), store.learned, store.hits, store.evicted), (2, 3, 1, 1))
+        self.assertNotIn(frozenset([('a', 1), ('c', 3)]), store)
+        self.assertIn(frozenset([('a', 1), ('b', 2)]), store)
+
+
+class ProfilerTests(unittest.TestCase):
+
+    """ Tests for `SearchProfiler`. """
+
+    def test_counters(self):
+        """ The profiler adds up the searches, and the constraints checked by the search, without changing them. """
+        csp = queens_csp(8)
+        expected = csp.backtracking_search(select_variable=minimum_remaining_values)
+        nodes = csp.stats.nodes
+        csp.profiler = SearchProfiler()
+        self.assertEqual(csp.backtracking_search(select_variable=minimum_remaining_values), expected)
+        self.assertEqual(csp.stats.nodes, nodes)
+        # the chronological search selects and orders each variable it pushes once
+        selected = csp.profiler.functions['select_variable'].calls
+        self.assertEqual(csp.profiler.functions['order_values'].calls, selected)
+        self.assertGreaterEqual(selected, len(expected))
+        csp.backtracking_search(backjumping=True)
+        profiler = csp.profiler
+        self.assertEqual(profiler.searches, 2)
+        self.assertEqual(profiler.nodes, nodes + csp.stats.nodes)
+        # a queen is checked once per value tried, by the one constraint on every queen
+        self.assertEqual(set(profiler.constraints), {'QueenConstraint'})
+        self.assertEqual(profiler.constraints['QueenConstraint'].calls, profiler.nodes)
+        self.assertEqual(set(profiler.functions), {'select_variable', 'order_values'})
+        self.assertGreater(profiler.functions['select_variable'].calls, selected)
+
+    def test_sampling(self):
+        """ Sampled stacks come out in the collapsed format, with the search in them. """
+        csp = queens_csp(8)
+        csp.profiler = SearchProfiler(sample_interval=0.0005)
+        csp.count_solutions(workers=2)	# the profiler goes to the workers with the problem, and stays idle there
+        csp.count_solutions()
+        lines = csp.profiler.collapsed().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+        self.assertTrue(any('csp.py:_search' in line for line in lines))
+        self.assertEqual(csp.profiler.searches, 2)
+
+
+class LocalSearchTests(unittest.TestCase):
+
+    """ Tests for `min_conflicts`. """
+
+    def test_map_coloring(self):
+        """ The generic conflict counts color Australia, and two colors are never enough. """
+        solution = australia_csp(['red', 'green', 'blue']).min_conflicts(seed=0)
+        self.assertTrue(all(solution[a] != solution[b] for a, b in BORDERS))
+        csp = australia_csp(['red', 'green'])
+        self.assertIsNone(csp.min_conflicts(max_steps=500, restart_after=50, seed=0))
+        self.assertGreater(csp.stats.restarts, 0)
+
+    def test_queens(self):
+        """ The vectorized queen counters solve big boards, from scratch or from a greedy placement. """
+        self.assertTrue(is_valid_queens(queens_csp(200).min_conflicts(seed=0), 200))
+        placement: dict[int, int] = greedy_placement(2000, seed=1)
+        self.assertTrue(is_valid_queens(queens_csp(2000).min_conflicts(assignment=placement, seed=1), 2000))
+
+    def test_restarts(self):
+        """ A restart perturbs the current assignment instead of rebuilding it, so the search keeps its progress. """
+        placement: dict[int, int] = greedy_placement(2000, seed=1)
+        csp = queens_csp(2000)
+        self.assertTrue(is_valid_queens(csp.min_conflicts(assignment=placement, restart_after=10, seed=1), 2000))
+        self.assertGreater(csp.stats.restarts, 0)
+
+
+class IncrementalConstraintTests(unittest.TestCase):
+
+    """ Tests for the incremental checking protocol of `Constraint`. """
+
+    def test_same_search(self):
+        """ The incremental queens constraint explores exactly the nodes that `satisfied` alone would. """
+        class WholeQueenConstraint(QueenConstraint):
+            incremental = False
+
+        for strategy in STRATEGIES:
+            incremental = queens_csp(8)
+            whole = ConstraintSatisfactionProblem(list(range(8)), {col: list(range(8)) for col in range(8)})
+            whole.add_constraint(WholeQueenConstraint(list(range(8))))
+            self.assertEqual(incremental.backtracking_search(**strategy), whole.backtracking_search(**strategy))
+            self.assertEqual(incremental.stats.nodes, whole.stats.nodes)
+
+    def test_word_search(self):
+        """ Words are placed without overlapping, and a second search starts from a clean state. """
+        words: list[str] = ['AB', 'CD']
+        domain: list[list[tuple[int, int]]] = [[(0, 0), (0, 1)], [(0, 1), (1, 1)], [(1, 0), (1, 1)], [(0, 0), (1, 0)]]
+        csp = ConstraintSatisfactionProblem(words, {word: domain for word in words})
+        constraint = WordSearchConstraint(words)
+        csp.add_constraint(constraint)
+        for _ in range(2):
+            solution = csp.backtracking_search()
+            cells: list[tuple[int, int]] = [cell for locations in solution.values() for cell in locations]
+            self.assertEqual(len(set(cells)), len(cells))
+            self.assertTrue(constraint.satisfied(solution))
+        self.assertIsNone(csp.backtracking_search({'AB': [(0, 0), (0, 1)], 'CD': [(0, 1), (1, 1)]}))
+
+
+class WordSearchTests(unittest.TestCase):
+
+    """ Tests for the placement index of `word_search`. """
+
+    def test_placements(self):
+        """ Every placement is a straight line of cells inside the grid, and the inverted index matches them. """
+        index = PlacementIndex(4, 5)
+        placements = index.placements(3)
+        self.assertEqual(len(placements), 4 * 3 + 2 * 3 + 2 * 5 + 2 * 3)
+        self.assertEqual(len(set(placements)), len(placements))
+        for placement in generate_domain('CAT', [['X'] * 5] * 4):
+            self.assertEqual(len(placement), 3)
+            self.assertTrue(all(0 <= row < 4 and 0 <= column < 5 for row, column in placement))
+        for cell in range(20):
+            self.assertEqual(
+                {placements[i] for i in placements.crossing(cell)},
+                {placement for placement in placements if cell in placement}
+            )
+        self.assertIs(index.domains(['CAT', 'DOG'])['CAT'], index.domains(['DOG'])['DOG'])
+
+    def test_forward_checking(self):
+        """ Forward checking prunes overlapping placements and fills a grid that has no room to spare. """
+        index = PlacementIndex(3, 3)
+        words: list[str] = ['ABC', 'DEF', 'GHI']
+        csp = ConstraintSatisfactionProblem(words, index.domains(words))
+        csp.add_constraint(WordSearchConstraint(words, index))
+        self.assertEqual(csp.count_solutions(inference=forward_checking), csp.count_solutions())
+        solution = csp.backtracking_search(inference=forward_checking)
+        self.assertEqual(sorted(cell for placement in solution.values() for cell in placement), list(range(9)))
+        self.assertGreater(csp.stats.pruned, 0)
+        self.assertIs(csp.domains['ABC'], index.placements(3))
+
+    def test_live_placements(self):
+        """ The shared live domains hold the placements crossing no placed word, whatever the mix of domains. """
+        index = PlacementIndex(4, 4)
+        placements = index.placements(3)
+        live = LivePlacements(placements)
+        crossed, _ = live.cross([0, 5])
+        self.assertEqual(list(live), [p for p in placements if 0 not in p and 5 not in p])
+        self.assertEqual(len(live), len(list(live)))
+        self.assertEqual(live[-1], list(live)[-1])
+        live.uncross(crossed)
+        self.assertEqual(list(live), list(placements))
+        words: list[str] = ['ABCD', 'EFG', 'HIJ', 'KL']
+        domains = index.domains(words)
+        domains['HIJ'] = list(placements)[::2]	# not the shared placements: filtered instead
+        csp = ConstraintSatisfactionProblem(words, domains)
+        csp.add_constraint(WordSearchConstraint(words, index))
+        self.assertEqual(csp.count_solutions(inference=forward_checking), csp.count_solutions())
+        self.assertEqual(csp.count_solutions(select_variable=minimum_remaining_values, inference=forward_checking), csp.count_solutions())
+
+
+class GlobalConstraintTests(unittest.TestCase):
+
+    """ Tests for `AllDifferentConstraint` and the bitboard N-queens solver. """
+
+    def test_hall_set(self):
+        """ Two variables that can only take 1 or 2 remove 1 and 2 from the third one's domain. """
+        csp = ConstraintSatisfactionProblem(['a', 'b', 'c'], {'a': [1, 2], 'b': [1, 2], 'c': [1, 2, 3]})
+        csp.add_constraint(AllDifferentConstraint(['a', 'b', 'c']))
+        self.assertEqual(csp.count_solutions(), 2)
+        self.assertEqual(csp.backtracking_search(inference=forward_checking)['c'], 3)
+        self.assertEqual(csp.stats.backtracks, 0)
+        csp.domains['c'] = [1, 2]
+        self.assertIsNone(csp.backtracking_search(inference=forward_checking))
+        self.assertEqual(csp.stats.nodes, 0)
+
+    def test_bitboard_queens(self):
+        """ The bitboard solver finds the same solutions as the generic search and honors a partial assignment. """
+        for n in range(1, 9):
+            self.assertEqual(list(BitboardQueens(n).iter_solutions()), list(queens_csp(n).iter_solutions()))
+        self.assertEqual(BitboardQueens(8).count_solutions(workers=2), 92)
+        solution = BitboardQueens(12).backtracking_search({5: 0})
+        self.assertEqual(solution[5], 0)
+        self.assertTrue(is_valid_queens(solution, 12))
+
+
+class PropagationTests(unittest.TestCase):
+
+    """ Tests for the inference functions in `propagation`. """
+
+    def test_domains_restored(self):
+        """ The domains are left as they were after the search, whether it succeeds or fails. """
+        for colors in (['red', 'green', 'blue'], ['red', 'green']):
+            csp = australia_csp(colors)
+            csp.backtracking_search(inference=arc_consistency)
+            self.assertEqual(csp.domains, {region: colors for region in REGIONS})
+
+    def test_fewer_nodes(self):
+        """ Forward checking explores fewer nodes on 12 queens. """
+        plain, checked = queens_csp(12), queens_csp(12)
+        plain.backtracking_search()
+        checked.backtracking_search(inference=forward_checking)
+        self.assertLess(checked.stats.nodes, plain.stats.nodes)
+        self.assertGreater(checked.stats.pruned, 0)
+
+
+if __name__ == '__main__':
+
+    unittest.main(verbosity=2)
@@ -11,14 +11,28 @@ Domains:
     
 Constraint:
     All the letters of a word must fit on the same row, column, or diagonal.
+
+The cells of the grid are numbered row by row (`row * columns + column`),
+so a placement of a word is a `range` of cell numbers: its start, its step (the direction) and its length.
+A `PlacementIndex` builds the placements of each word length once, as two arrays of starts and steps
+seen through a lazy `Placements` sequence, which all the words of that length share as their domain.
+It also keeps, for each cell, the placements crossing it, so that placing a word rules out
+the other words' placements that overlap it by looking up its cells only.
+During forward checking, the words of one length share a `LivePlacements` domain, which counts
+how many placed letters cross each placement: placing a word only updates the counts of the placements
+crossing its cells, and backtracking decrements them again.
 """
 from rich import print
 from typing import *
+from array import array
 import random
 import string
+import sys
 from collections import namedtuple
+from functools import partial
 
 from csp import Constraint, ConstraintSatisfactionProblem
+from propagation import Trail, _prune, _record_undo
 
 
 ROW, COLUMN = 0, 1
@@ -26,6 +40,11 @@ ROW, COLUMN = 0, 1
 
 Grid = list[list[str]]
 GridLocation = tuple[int, int]
+Placement = range	# the cell numbers of a word's letters, in order
+
+# (row, column) steps of the directions a word can be written in:
+# left to right, diagonally toward bottom right, top down, diagonally toward bottom left
+DIRECTIONS: list[tuple[int, int]] = [(0, 1), (1, 1), (1, 0), (1, -1)]
 
 
 def generate_grid(rows: int, columns: int) -> Grid:
@@ -45,86 +64,246 @@ def display_grid(grid: Grid) -> None:
         print(''.join(row))
         
 
+class Placements(Sequence[Placement]):
+    """ The placements of the words of one length on a grid, built once as arrays of starts and steps. """
+    
+    def __init__(self, rows: int, columns: int, length: int) -> None:
+        self.rows, self.columns, self.length = rows, columns, length
+        self.starts: array = array('i')
+        self.steps: array = array('i')
+        for d_row, d_column in (DIRECTIONS[:1] if length == 1 else DIRECTIONS):	# one letter has no direction
+            step: int = d_row * columns + d_column
+            first_column: int = (length - 1) if d_column < 0 else 0
+            last_column: int = columns - 1 - (length - 1) * max(d_column, 0)
+            for row in range(rows - (length - 1) * d_row):
+                for column in range(first_column, last_column + 1):
+                    self.starts.append(row * columns + column)
+                    self.steps.append(step)
+        self._crossing: Optional[list[array]] = None
+    
+    def __len__(self) -> int:
+        return len(self.starts)
+    
+    def __getitem__(self, i: int) -> Placement:
+        start, step = self.starts[i], self.steps[i]
+        return range(start, start + step * self.length, step)
+    
+    def crossing(self, cell: int) -> array:
+        """ Return the indices of the placements that cover `cell` (the inverted index is built on first use). """
+        if self._crossing is None:
+            self._crossing = [array('i') for _ in range(self.rows * self.columns)]
+            for i in range(len(self)):
+                for covered in self[i]:
+                    self._crossing[covered].append(i)
+        return self._crossing[cell]
+
+
+class LivePlacements(Sequence[Placement]):
+    """ The placements of one length that no placed word crosses, with the count of placed letters crossing each. """
+    
+    def __init__(self, placements: Placements) -> None:
+        self.placements: Placements = placements
+        self.crossed: array = array('H', bytes(2 * len(placements)))
+        self.alive: int = len(placements)
+    
+    def __len__(self) -> int:
+        return self.alive
+    
+    def __iter__(self) -> Iterator[Placement]:
+        # lazy: the search undoes the pruning below a variable before taking its next value
+        placements, crossed = self.placements, self.crossed
+        for i in range(len(placements)):
+            if not crossed[i]:
+                yield placements[i]
+    
+    def __getitem__(self, i: int) -> Placement:
+        if i < 0:
+            i += self.alive
+        if not 0 <= i < self.alive:
+            raise IndexError('placement index out of range')
+        for placement in self:
+            if not i:
+                return placement
+            i -= 1
+    
+    def cross(self, cells: Iterable[int]) -> tuple[list[int], int]:
+        """ Count the placements crossing `cells` as crossed once more. Return their indices and how many were alive. """
+        crossed: array = self.crossed
+        indices: list[int] = [i for cell in cells for i in self.placements.crossing(cell)]
+        dead: int = 0
+        for i in indices:
+            if not crossed[i]:
+                dead += 1
+            crossed[i] += 1
+        self.alive -= dead
+        return indices, dead
+    
+    def uncross(self, indices: list[int]) -> None:
+        """ Undo `cross`, given the indices it returned. """
+        crossed: array = self.crossed
+        for i in indices:
+            crossed[i] -= 1
+            if not crossed[i]:
+                self.alive += 1
+
+
+class PlacementIndex:
+    """ The placements of words on a `rows` x `columns` grid, shared by all the words of the same length. """
+    
+    def __init__(self, rows: int, columns: int) -> None:
+        self.rows, self.columns = rows, columns
+        self._by_length: dict[int, Placements] = {}
+    
+    def __len__(self) -> int:
+        """ The number of distinct placements built so far. """
+        return sum(len(placements) for placements in self._by_length.values())
+    
+    def placements(self, length: int) -> Placements:
+        if length not in self._by_length:
+            self._by_length[length] = Placements(self.rows, self.columns, length)
+        return self._by_length[length]
+    
+    def domains(self, words: list[str]) -> dict[str, Placements]:
+        """ Return the domain of each word: the (shared, lazily expanded) placements of its length. """
+        return {word: self.placements(len(word)) for word in words}
+    
+    def location(self, cell: int) -> GridLocation:
+        return divmod(cell, self.columns)
+
+
 def generate_domain(word: str, grid: Grid) -> list[list[GridLocation]]:
     """Build a list of possible GridLocations for each lettter of the word"""
-    domain: list[list[GridLocation]] = []
-    
-    height, width = len(grid), len(grid[0])
-    length: int = len(word)
-    
-    for row in range(height):
-        for col in range(width):
-            columns, rows = \
-                range(col, col + length + 1),\
-                range(row, row + length + 1)
-            if col + length <= width:
-                # place letters left to right
-                domain.append(
-                    [
-                        (row, c) for c in columns
-                    ]
-                )
-                if row + length <= height:
-                    # place letters diagonally toward bottom right
-                    domain.append(
-                        [
-                            (row, col + (r - row)) for r in rows
-                        ]
-                    )
-            if row + length <= height:
-                # place letters top down
-                domain.append(
-                    [
-                        (row, col) for row in rows
-                    ]
-                )
-                if col - length >= 0:
-                    domain.append(
-                        [
-                            (row, col - (r - row))
-                            for r in rows
-                        ]
-                    )
-    return domain
-
-
-class WordSearchConstraint(Constraint[str, list[GridLocation]]):
-    """Check the locations proposed for one word does not overlap with other words'."""
-    
-    def __init__(self, words: list[str]) -> None:
+    index: PlacementIndex = PlacementIndex(len(grid), len(grid[0]))
+    return [
+        [index.location(cell) for cell in placement]
+        for placement in index.placements(len(word))
+    ]
+
+
+class WordSearchConstraint(Constraint[str, Sequence[Any]]):
+    """
+    Check the locations proposed for one word does not overlap with other words'.
+    
+    The locations may be `GridLocation`s or cell numbers.
+    Given the `PlacementIndex` the domains come from, the constraint also prunes overlapping placements
+    during forward checking, in time proportional to the placements crossing the word's cells:
+    the words whose domain is the shared `Placements` of their length get the shared `LivePlacements` instead,
+    and other domains are filtered.
+    """
+    
+    incremental: bool = True
+    
+    def __init__(self, words: list[str], index: Optional[PlacementIndex] = None) -> None:
         super().__init__(words)
         self.words: list[str] = words
+        self.index: Optional[PlacementIndex] = index
+        self.propagates: bool = index is not None
+        self.occupied: set[Any] = set()	# locations taken by the words placed so far (incremental checking)
+        self._live: dict[int, LivePlacements] = {}	# the shared domain of each word length (forward checking)
     
-    def satisfied(self, assignment: dict[str, list[GridLocation]]) -> bool:
+    def satisfied(self, assignment: dict[str, Sequence[Any]]) -> bool:
         """The constraint is satisfied if there are no duplicate GridLocation between words."""
-        all_locations: list[GridLocation] = [
-            loc
-            for list_of_locs in assignment.values()
-            for loc in list_of_locs
-        ]
-        return len(set(all_locations)) == len(all_locations)
-        
-        
+        seen: set[Any] = set()
+        for word, locations in assignment.items():
+            if word in self.words:
+                for loc in locations:
+                    if loc in seen:
+                        return False
+                    seen.add(loc)
+        return True
+    
+    def reset(self) -> None:
+        self.occupied.clear()
+        self._live.clear()
+    
+    def on_assign(self, word: str, locations: Sequence[Any]) -> bool:
+        """ A word can be placed if none of its locations is taken, which costs O(length of the word). """
+        if not self.occupied.isdisjoint(locations):
+            return False
+        self.occupied.update(locations)
+        return True
+    
+    def on_unassign(self, word: str, locations: Sequence[Any]) -> None:
+        self.occupied.difference_update(locations)
+    
+    def propagate(self, csp: ConstraintSatisfactionProblem[str, Placement], variable: Optional[str],
+                  assignment: dict[str, Placement], trail: Trail) -> bool:
+        """ Remove from the unassigned words' domains the placements crossing the cells of `variable` (or of every word). """
+        cells: list[int] = (
+            list(assignment[variable]) if variable is not None
+            else [cell for word in self.words if word in assignment for cell in assignment[word]]
+        )
+        by_length: dict[int, list[str]] = {}
+        for word in self.words:
+            if word not in assignment:
+                by_length.setdefault(len(word), []).append(word)
+        for length, words in by_length.items():
+            placements: Placements = self.index.placements(length)
+            if length not in self._live:
+                self._live[length] = LivePlacements(placements)
+            live: LivePlacements = self._live[length]
+            sharing: int = 0
+            others: list[str] = []
+            for word in words:
+                if csp.domains[word] is placements:
+                    trail.append((word, placements))
+                    csp.domains[word] = live
+                if csp.domains[word] is live:
+                    sharing += 1
+                else:
+                    others.append(word)
+            if sharing and cells:
+                indices, dead = live.cross(cells)
+                _record_undo(trail, partial(live.uncross, indices))
+                csp.stats.pruned += dead * sharing
+                if not live.alive:
+                    return False
+            if others:
+                crossing: set[Placement] = {placements[i] for cell in cells for i in placements.crossing(cell)}
+                for word in others:
+                    kept: list[Placement] = [placement for placement in csp.domains[word] if placement not in crossing]
+                    if not _prune(csp, word, kept, trail):
+                        return False
+        return True
+
+
+def fill_grid(grid: Grid, index: PlacementIndex, solution: dict[str, Placement]) -> None:
+    """ Write the letters of each word of `solution` on `grid`. """
+    for word, placement in solution.items():
+        for letter, cell in zip(word, placement):
+            row, column = index.location(cell)
+            grid[row][column] = letter
 
 
 if __name__ == '__main__':
     
+    from propagation import forward_checking
+    
     grid: Grid = generate_grid(9, 9)
+    index: PlacementIndex = PlacementIndex(9, 9)
     words: list[str] = ['PHOENIX', 'MAYA', 'IRIS', 'GODOT']
-    locations: dict[str, list[list[GridLocation]]] = {}
-    for word in words:
-        locations[word] = generate_domain(word, grid)
     
-    csp: ConstraintSatisfactionProblem[str, list[GridLocation]] = \
-             ConstraintSatisfactionProblem(words, locations)
-    csp.add_constraint(WordSearchConstraint(words))
+    csp: ConstraintSatisfactionProblem[str, Placement] = \
+             ConstraintSatisfactionProblem(words, index.domains(words))
+    csp.add_constraint(WordSearchConstraint(words, index))
     
-    solution: Optional[dict[str, list[GridLocation]]] = csp.backtracking_search()
+    solution: Optional[dict[str, Placement]] = csp.backtracking_search(inference=forward_checking)
     if not solution:
         print('No solution found')
     else:
-        for word, grid_locations in solution.items():
-            for letter, (row, column) in zip(word, grid_locations):
-                grid[row][column] = letter
+        fill_grid(grid, index, solution)
         display_grid(grid)
-                
\ No newline at end of file
+    
+    # a bigger puzzle, e.g. `python word_search.py 100 200` for 200 random words on a 100 x 100 grid
+    if len(sys.argv) > 2:
+        size, n_words = int(sys.argv[1]), int(sys.argv[2])
+        index = PlacementIndex(size, size)
+        words = [
+            ''.join(random.choices(string.ascii_uppercase, k=random.randint(3, 10)))
+            for _ in range(n_words)
+        ]
+        csp = ConstraintSatisfactionProblem(words, index.domains(words))
+        csp.add_constraint(WordSearchConstraint(words, index))
+        solution = csp.backtracking_search()
+        print(f'{n_words} words on a {size} x {size} grid: {len(index):,} distinct placements, '
+              f'{"solved" if solution else "no solution"} in {csp.stats.elapsed:.3f} s ({csp.stats.nodes} nodes)')
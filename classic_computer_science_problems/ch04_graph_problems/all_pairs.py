@@ -0,0 +1,96 @@
+# all_pairs.py
+"""
+A script computing the shortest distances between many pairs of vertices by running Dijkstra's algorithm from every source.
+
+Each source is independent of the others, so the sources are split into chunks and handed out to a pool of processes.
+The graph is frozen into a `CSRGraph` and sent to each worker once, when the worker starts,
+rather than being pickled along with every chunk of sources.
+
+The result is a 2-D `memoryview` of doubles (one row per source, one column per vertex) backed by a single `array`,
+which can be indexed as `matrix[i, j]` or handed to NumPy with `numpy.asarray(matrix)` without copying.
+"""
+from typing import *
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from weighted_graph import WeightedGraph
+from csr_graph import CSRGraph
+from dijkstra import dijkstra_search
+
+V = TypeVar('Vertex')
+
+# the graph shared by all tasks within a worker process, set by `_init_worker()`
+_shared_graph: Optional[CSRGraph] = None
+
+
+def _init_worker(graph: CSRGraph) -> None:
+    global _shared_graph
+    _shared_graph = graph
+
+
+def _distance_rows(graph: CSRGraph, sources: list[int]) -> array:
+    """ Return the distances from each of `sources` to every vertex, one row after another. """
+    rows: array = array('d')
+    for first in sources:
+        rows.extend(dijkstra_search(graph, first)[0])
+    return rows
+
+
+def _distance_rows_in_worker(sources: list[int]) -> array:
+    return _distance_rows(_shared_graph, sources)
+
+
+def _chunked(items: list[int], size: int) -> Iterator[list[int]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def all_pairs_shortest_paths(graph: WeightedGraph[V] | CSRGraph[V],
+                             sources: Optional[Iterable[V]] = None,
+                             workers: Optional[int] = None,
+                             chunks_per_worker: int = 4
+                             ) -> memoryview:
+    """
+    Return the matrix of shortest distances from each of `sources` (every vertex by default) to every vertex.
+    Row `i` holds the distances from the `i`th source; unreachable vertices are at distance `math.inf`.
+    With no sources or no vertices, the matrix is empty and one-dimensional (`shape` is (0,)).
+
+    workers: int
+        number of processes to run (`os.cpu_count()` by default); with 1 everything runs in this process
+    chunks_per_worker: int
+        the sources are split into about `workers * chunks_per_worker` tasks to balance the load
+    """
+    frozen: CSRGraph[V] = graph if isinstance(graph, CSRGraph) else graph.freeze()
+    firsts: list[int] = (
+        list(range(frozen.vertex_count)) if sources is None
+        else [frozen.index_of(source) for source in sources]
+    )
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(firsts) <= 1:
+        distances: array = _distance_rows(frozen, firsts)
+    else:
+        chunk_size: int = max(1, -(-len(firsts) // (workers * chunks_per_worker)))
+        distances = array('d')
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frozen,)) as pool:
+            # `map` yields the chunks in order, so the rows line up with `firsts`
+            for rows in pool.map(_distance_rows_in_worker, _chunked(firsts, chunk_size)):
+                distances.extend(rows)
+
+    if not distances:
+        return memoryview(distances)	# a memoryview cannot be cast to a shape with a zero in it
+    return memoryview(distances).cast('B').cast('d', shape=[len(firsts), frozen.vertex_count])
+
+
+if __name__ == '__main__':
+
+    from rich import print
+
+    from city_graph import city_graph_weighted, CITIES
+
+    matrix: memoryview = all_pairs_shortest_paths(city_graph_weighted, workers=2)
+    print('[b]Distances between cities[/b]')
+    for city, row in zip(CITIES, matrix.tolist()):
+        print(f"{city:>14} {[int(distance) for distance in row]}")
+    print(f"Boston to Miami: {matrix[CITIES.index('Boston'), CITIES.index('Miami')]}")
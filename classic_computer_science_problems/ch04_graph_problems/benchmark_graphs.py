@@ -0,0 +1,158 @@
+# benchmark_graphs.py
+"""
+A script timing the graph algorithms of this chapter on random weighted graphs.
+
+Run it from this directory:
+```
+python benchmark_graphs.py
+```
+"""
+from typing import *
+import math
+import os
+import random
+import time
+
+from rich import print
+from rich.table import Table
+
+from weighted_graph import WeightedGraph
+from csr_graph import CSRGraph
+from priority_queue import PriorityQueue
+from dijkstra import dijkstra, shortest_path, bidirectional_shortest_path
+from all_pairs import all_pairs_shortest_paths
+from mst import minimum_spanning_tree, kruskal, boruvka
+
+V = TypeVar('Vertex')
+SIZES: list[tuple[int, int]] = [(1_000, 5_000), (10_000, 50_000), (100_000, 500_000)]
+
+
+def random_weighted_graph(n_vertices: int, n_edges: int, seed: int = 0) -> WeightedGraph[int]:
+    """
+    Build a connected random graph: a random spanning tree plus `n_edges - n_vertices + 1` random edges,
+    with weights drawn uniformly from [1, 100).
+    """
+    rng: random.Random = random.Random(seed)
+    graph: WeightedGraph[int] = WeightedGraph(range(n_vertices))
+    for v in range(1, n_vertices):
+        graph.add_edge_by_indices(rng.randrange(v), v, rng.uniform(1, 100))
+    for _ in range(n_edges - n_vertices + 1):
+        graph.add_edge_by_indices(rng.randrange(n_vertices), rng.randrange(n_vertices), rng.uniform(1, 100))
+    return graph
+
+
+def lazy_dijkstra(graph: WeightedGraph[V] | CSRGraph[V], root: V) -> list[float]:
+    """
+    The previous implementation of `dijkstra.dijkstra`: push a new (distance, vertex) entry on every relaxation
+    and never skip the stale ones when they are popped.
+    """
+    first: int = graph.index_of(root)
+    distances: list[float] = [math.inf] * graph.vertex_count
+    distances[first] = 0
+    queue: PriorityQueue[tuple[float, int]] = PriorityQueue()
+    queue.push((0, first))
+    while not queue.empty:
+        _, u = queue.pop()
+        for v, weight in graph.weighted_neighbor_indices(u):
+            alt: float = weight + distances[u]
+            if alt < distances[v]:
+                distances[v] = alt
+                queue.push((alt, v))
+    return distances
+
+
+def best_of(repeat: int, func: Callable, *args: Any) -> float:
+    """ Return the fastest of `repeat` runs of `func(*args)` in seconds. """
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_dijkstra(sizes: list[tuple[int, int]] = SIZES, repeat: int = 3) -> Table:
+    """ Compare the lazy-push and the decrease-key `dijkstra` on lists of edges and on CSR buffers. """
+    table: Table = Table(title='Dijkstra: lazy push vs. decrease-key (seconds)')
+    for column in ('vertices', 'edges', 'lazy', 'decrease-key', 'decrease-key (CSR)'):
+        table.add_column(column, justify='right')
+
+    for n_vertices, n_edges in sizes:
+        graph: WeightedGraph[int] = random_weighted_graph(n_vertices, n_edges)
+        frozen: CSRGraph[int] = graph.freeze()
+        assert lazy_dijkstra(graph, 0) == dijkstra(graph, 0)[0]
+        table.add_row(
+            f'{n_vertices:,}', f'{n_edges:,}',
+            f'{best_of(repeat, lazy_dijkstra, graph, 0):.3f}',
+            f'{best_of(repeat, dijkstra, graph, 0):.3f}',
+            f'{best_of(repeat, dijkstra, frozen, 0):.3f}'
+        )
+    return table
+
+
+def benchmark_point_to_point(sizes: list[tuple[int, int]] = SIZES, n_queries: int = 20) -> Table:
+    """ Compare full `dijkstra` with the early-exit and bidirectional searches on random source-target pairs. """
+    table: Table = Table(title=f'Point-to-point shortest paths: {n_queries} random queries on a frozen graph (seconds)')
+    for column in ('vertices', 'edges', 'full dijkstra', 'early exit', 'bidirectional'):
+        table.add_column(column, justify='right')
+
+    rng: random.Random = random.Random(0)
+    for n_vertices, n_edges in sizes:
+        frozen: CSRGraph[int] = random_weighted_graph(n_vertices, n_edges).freeze()
+        queries: list[tuple[int, int]] = [
+            (rng.randrange(n_vertices), rng.randrange(n_vertices)) for _ in range(n_queries)
+        ]
+        timings: list[str] = []
+        for search in (lambda g, s, t: dijkstra(g, s), shortest_path, bidirectional_shortest_path):
+            start: float = time.perf_counter()
+            for source, target in queries:
+                search(frozen, source, target)
+            timings.append(f'{time.perf_counter() - start:.3f}')
+        table.add_row(f'{n_vertices:,}', f'{n_edges:,}', *timings)
+    return table
+
+
+def benchmark_all_pairs(n_vertices: int = 10_000, n_edges: int = 50_000, n_sources: int = 64) -> Table:
+    """ Time `all_pairs_shortest_paths` from `n_sources` sources with 1, 2, 4, ... processes up to the number of cores. """
+    table: Table = Table(title=f'All-pairs shortest paths from {n_sources} sources, {n_vertices:,} vertices, {n_edges:,} edges')
+    for column in ('workers', 'seconds', 'sources per second', 'speed-up'):
+        table.add_column(column, justify='right')
+
+    frozen: CSRGraph[int] = random_weighted_graph(n_vertices, n_edges).freeze()
+    sources: list[int] = list(range(n_sources))
+    counts: list[int] = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    serial: float = 0.0
+    for workers in counts:
+        seconds: float = best_of(1, all_pairs_shortest_paths, frozen, sources, workers)
+        serial = serial or seconds
+        table.add_row(str(workers), f'{seconds:.3f}', f'{n_sources / seconds:.1f}', f'{serial / seconds:.2f}x')
+    return table
+
+
+def benchmark_mst(sizes: list[tuple[int, int]] = SIZES) -> Table:
+    """ Compare Jarníck's (Prim's) algorithm with Kruskal's and Borůvka's algorithms on frozen graphs. """
+    workers: int = os.cpu_count() or 1
+    table: Table = Table(title='Minimum spanning tree (seconds)')
+    for column in ('vertices', 'edges', 'Jarník/Prim', 'Kruskal', 'Borůvka', f'Borůvka ({workers} workers)'):
+        table.add_column(column, justify='right')
+
+    for n_vertices, n_edges in sizes:
+        frozen: CSRGraph[int] = random_weighted_graph(n_vertices, n_edges).freeze()
+        table.add_row(
+            f'{n_vertices:,}', f'{n_edges:,}',
+            f'{best_of(1, minimum_spanning_tree, frozen):.3f}',
+            f'{best_of(1, kruskal, frozen):.3f}',
+            f'{best_of(1, boruvka, frozen):.3f}',
+            f'{best_of(1, boruvka, frozen, workers):.3f}'
+        )
+    return table
+
+
+if __name__ == '__main__':
+
+    print(benchmark_dijkstra())
+    print(benchmark_point_to_point())
+    print(benchmark_all_pairs())
+    print(benchmark_mst())
@@ -0,0 +1,173 @@
+# csr_graph.py
+"""
+A script defining `CSRGraph`, a frozen, compressed sparse row (CSR) representation of `Graph` and `WeightedGraph`.
+
+Instead of one `Edge` object per directed half-edge, the adjacency is stored in three flat buffers.
+
+    offsets: the neighbors of vertex at index `i` are found at positions `offsets[i]` to `offsets[i + 1]`
+    targets: the index of the vertex at the other end of each half-edge
+    weights: the weight of each half-edge (only for weighted graphs)
+
+Each half-edge costs 4 bytes (+ 8 bytes if weighted) instead of a whole dataclass instance.
+Build one with `Graph.freeze()` or `WeightedGraph.freeze()`.
+"""
+from typing import *
+from array import array
+
+from edge import Edge
+from weighted_edge import WeightedEdge
+
+V = TypeVar('Vertex')
+
+
+class CSRGraph(Generic[V]):
+
+    def __init__(self, vertices: list[V], offsets: array, targets: array, weights: Optional[array] = None) -> None:
+        self._vertices: list[V] = list(vertices)
+        self._indices: dict[V, int] = {}
+        for i, vertex in enumerate(self._vertices):
+            self._indices.setdefault(vertex, i)
+        self.offsets: array = offsets
+        self.targets: array = targets
+        self.weights: Optional[array] = weights
+        self._make_views()
+
+    def _make_views(self) -> None:
+        # zero-copy views so that slicing a neighborhood does not copy the buffer
+        self._targets_view: memoryview = memoryview(self.targets)
+        self._weights_view: Optional[memoryview] = memoryview(self.weights) if self.weights is not None else None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # memoryviews cannot be pickled (the process pools send the graph to their workers): rebuild them on arrival
+        return {**self.__dict__, '_targets_view': None, '_weights_view': None}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._make_views()
+
+    @classmethod
+    def from_edge_lists(cls, vertices: list[V], edges: list[list[Any]], weighted: bool = False) -> 'CSRGraph[V]':
+        """ Pack the adjacency lists of a `Graph` (or `WeightedGraph` if `weighted`) into CSR buffers. """
+        offsets: array = array('q', [0])
+        targets: array = array('i')
+        weights: Optional[array] = array('d') if weighted else None
+        for edges_of_vertex in edges:
+            targets.extend(edge.v for edge in edges_of_vertex)
+            if weighted:
+                weights.extend(edge.weight for edge in edges_of_vertex)
+            offsets.append(len(targets))
+        return cls(vertices, offsets, targets, weights)
+
+    @property
+    def vertex_count(self) -> int:
+        """ Number of vertices """
+        return len(self._vertices)
+
+    @property
+    def edge_count(self) -> int:
+        """ Number of (directed half-)edges """
+        return len(self.targets)
+
+    @property
+    def is_weighted(self) -> bool:
+        return self.weights is not None
+
+    @property
+    def nbytes(self) -> int:
+        """ Number of bytes held by the adjacency buffers """
+        buffers: list[array] = [self.offsets, self.targets]
+        if self.weights is not None:
+            buffers.append(self.weights)
+        return sum(buffer.itemsize * len(buffer) for buffer in buffers)
+
+    def vertex_at(self, i: int) -> V:
+        """ Find the vertex at index `i`. """
+        return self._vertices[i]
+
+    def index_of(self, v: V) -> int:
+        """ Find the index of vertex `v`. """
+        try:
+            return self._indices[v]
+        except KeyError:
+            raise ValueError(f'{v!r} is not in graph') from None
+
+    def degree(self, i: int) -> int:
+        """ Number of edges coming out of vertex at index `i`. """
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def neighbor_indices(self, i: int) -> memoryview:
+        """ Indices of the vertices adjacent to vertex at index `i`, as a view into `targets`. """
+        return self._targets_view[self.offsets[i]:self.offsets[i + 1]]
+
+    def weighted_neighbor_indices(self, i: int) -> Iterator[tuple[int, float]]:
+        """ Iterate over (index, weight) pairs of the vertices adjacent to vertex at index `i`. """
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return zip(self._targets_view[start:end], self._weights_view[start:end])
+
+    def neighbors_of_index(self, i: int) -> list[V]:
+        """ Find the vertices that are adjacent to vertex at index `i`."""
+        return [self._vertices[j] for j in self.neighbor_indices(i)]
+
+    def neighbors_for_vertex(self, v: V) -> list[V]:
+        """ Find the vertices that are adjacent to vertex `v`. """
+        return self.neighbors_of_index(self.index_of(v))
+
+    def neighbors_for_index_with_weights(self, i: int) -> list[tuple[V, float]]:
+        """ Return the vertices adjacent to vertex with index `i` and their weights."""
+        return [
+            (self._vertices[j], weight)
+            for j, weight in self.weighted_neighbor_indices(i)
+        ]
+
+    def edges_for_index(self, i: int) -> list[Edge]:
+        """
+        Materialize the edges coming out of vertex at index `i`.
+        Only meant for compatibility; use `neighbor_indices()` or `weighted_neighbor_indices()` in hot loops.
+        """
+        if not self.is_weighted:
+            return [Edge(i, j) for j in self.neighbor_indices(i)]
+        return [
+            WeightedEdge(i, j, weight)
+            for j, weight in self.weighted_neighbor_indices(i)
+        ]
+
+    def __str__(self) -> str:
+        if self.is_weighted:
+            return '\n'.join(
+                f"{v} -> {self.neighbors_for_index_with_weights(i)!r}"
+                for i, v in enumerate(self._vertices)
+            )
+        return '\n'.join(
+            f"{v!r} -> {self.neighbors_of_index(i)!r}"
+            for i, v in enumerate(self._vertices)
+        )
+
+
+if __name__ == '__main__':
+    
+    import random
+    import tracemalloc
+    
+    from rich import print
+    
+    from weighted_graph import WeightedGraph
+    from dijkstra import dijkstra
+    from city_graph import city_graph_weighted
+    
+    frozen: CSRGraph[str] = city_graph_weighted.freeze()
+    print(frozen)
+    assert dijkstra(frozen, 'Los Angeles') == dijkstra(city_graph_weighted, 'Los Angeles')
+    
+    # compare the memory held by the adjacency of a random graph before and after freezing
+    random.seed(0)
+    n_vertices, n_edges = 10_000, 100_000
+    tracemalloc.start()
+    graph: WeightedGraph[int] = WeightedGraph(list(range(n_vertices)))
+    for _ in range(n_edges):
+        graph.add_edge_by_indices(random.randrange(n_vertices), random.randrange(n_vertices), random.random())
+    list_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    frozen_random: CSRGraph[int] = graph.freeze()
+    print(f"[b]{n_edges} undirected edges[/b]")
+    print(f"list of `WeightedEdge` lists: {list_bytes / n_edges:.1f} bytes per edge")
+    print(f"CSR buffers: {frozen_random.nbytes / n_edges:.1f} bytes per edge")
@@ -10,75 +10,161 @@ The Dijkstra algorithm procees in the following steps.
         If they have not been recorded, or if the edge offers a new shortest path to them,
         update each vertex's distance from the starting vertex,
         record the edge that produced this distance,
-        add the new vertex to the priority queue.
+        add the new vertex to the priority queue (or lower its priority if it is already queued).
     3. Repeat steps 2 and 3 until the priority queue is empty.
     4. Return the shortest distance to every vertex from the starting vertex
+
+When only the path between two vertices is needed, `shortest_path` stops as soon as the target is settled,
+and `bidirectional_shortest_path` runs one search from each end until the two searches meet.
 """
 from typing import *
-from dataclasses import dataclass
 import math
 
 from rich import print
 
 from mst import WeightedPath
 from weighted_graph import WeightedGraph
+from csr_graph import CSRGraph
 from weighted_edge import WeightedEdge
-from priority_queue import PriorityQueue
+from priority_queue import IndexedPriorityQueue
 from city_graph import city_graph_weighted as city_graph2
 
 V = TypeVar('Vertex')
 
 
-@dataclass
-class DijkstraNode:
-    vertex: int
-    distance: float
-    
-    def __lt__(self, other: 'DijkstraNode') -> bool:
-        if not isinstance(other, type(self)):
-            return NotImplemented
-        else:
-            return self.distance < other.distance
-    
-    def __eq__(self, other: 'DijkstraNode') -> bool:
-        if not isinstance(other, type(self)):
-            return NotImplemented
-        else:
-            return self.distance == other.distance
-
-
-def dijkstra(graph: WeightedGraph[V], root: V) -> tuple[list[float], dict[int, WeightedEdge]]:
+def dijkstra_search(graph: WeightedGraph[V] | CSRGraph[V], first: int, last: int = -1) -> tuple[list[float], list[int], list[float]]:
     """
-    Returns a list of distances from `root` to each index vertex
-    and a dictionary of their paths from `root`.
-    """
-    first: int = graph.index_of(root)
+    Run Dijkstra's algorithm from the vertex at index `first`, stopping early once vertex at index `last` is settled.
     
+    Return the distance to each vertex, the index of the vertex before it on its shortest path (-1 if none)
+    and the weight of that last leg.
+    `graph` can be a `WeightedGraph` or its frozen `CSRGraph` copy.
+    Each vertex is queued at most once and settled exactly once when it is popped.
+    """
     # distance from root to all vertices
     distances: list[float] = [math.inf] * graph.vertex_count
     distances[first] = 0 # the root is always 0 distance from itself
     
-    # dictionary of the last edge along the path from `root` to each vertex
-    legs: dict[int, WeightedEdge] = {}
+    # the vertex before each vertex along its path from the root and the weight of that last leg
+    parents: list[int] = [-1] * graph.vertex_count
+    leg_weights: list[float] = [0.0] * graph.vertex_count
     
-    queue: PriorityQueue[DijkstraNode] = PriorityQueue()
-    queue.push(DijkstraNode(first, 0))
+    queue: IndexedPriorityQueue = IndexedPriorityQueue(graph.vertex_count)
+    queue.push(first, 0)
     
     while not queue.empty:
-        u: int = queue.pop().vertex
+        u, dist_u = queue.pop()
+        if u == last:
+            break
         
         # look at every edge extending from `u` 
-        for edge in graph.edges_for_index(u):
-            _, v, weight = edge
-            alt: float = weight + distances[u]	# distance from root to vertex `v` via `u`
+        for v, weight in graph.weighted_neighbor_indices(u):
+            alt: float = weight + dist_u	# distance from root to vertex `v` via `u`
             if alt < distances[v]:	# check whether the two-edge path is shorter than the edge from root to `v`
                 distances[v] = alt
-                legs[v] = edge
-                queue.push(DijkstraNode(v, alt))
+                parents[v] = u
+                leg_weights[v] = weight
+                queue.push_or_decrease(v, alt)
+    
+    return distances, parents, leg_weights
+
 
+def dijkstra(graph: WeightedGraph[V] | CSRGraph[V], root: V) -> tuple[list[float], dict[int, WeightedEdge]]:
+    """
+    Returns a list of distances from `root` to each index vertex
+    and a dictionary of their paths from `root`.
+    """
+    distances, parents, leg_weights = dijkstra_search(graph, graph.index_of(root))
+    
+    # dictionary of the last edge along the path from `root` to each vertex
+    legs: dict[int, WeightedEdge] = {
+        v: WeightedEdge(u, v, leg_weights[v])
+        for v, u in enumerate(parents)
+        if u >= 0
+    }
     return distances, legs
 
 
+def _walk_back(parents: list[int], leg_weights: list[float], end: int) -> WeightedPath:
+    """ Follow `parents` from `end` back to the root and return the edges in root-to-`end` order. """
+    path: WeightedPath = []
+    while parents[end] >= 0:
+        path.append(WeightedEdge(parents[end], end, leg_weights[end]))
+        end = parents[end]
+    path.reverse()
+    return path
+
+
+def shortest_path(graph: WeightedGraph[V] | CSRGraph[V], source: V, target: V) -> Optional[WeightedPath]:
+    """
+    Return the edges of the shortest path from `source` to `target`, or None if `target` is unreachable.
+    
+    Same as `dijkstra` except that the search stops as soon as `target` is popped (i.e. settled).
+    """
+    first, last = graph.index_of(source), graph.index_of(target)
+    distances, parents, leg_weights = dijkstra_search(graph, first, last)
+    if distances[last] == math.inf:
+        return None
+    return _walk_back(parents, leg_weights, last)
+
+
+def bidirectional_shortest_path(graph: WeightedGraph[V] | CSRGraph[V], source: V, target: V) -> Optional[WeightedPath]:
+    """
+    Return the edges of the shortest path from `source` to `target`, or None if `target` is unreachable.
+    
+    Run Dijkstra forward from `source` and backward from `target` (the graph is undirected,
+    so both searches follow the same edges), always advancing the search whose next vertex is closer.
+    `best` is the length of the shortest source-to-target path seen where the two searches touch;
+    once the two closest queued vertices are together at least `best` away, no shorter path can exist.
+    """
+    first, last = graph.index_of(source), graph.index_of(target)
+    if first == last:
+        return []
+    
+    n: int = graph.vertex_count
+    # index 0 is the forward search from `source`, index 1 the backward search from `target`
+    distances: tuple[list[float], list[float]] = ([math.inf] * n, [math.inf] * n)
+    parents: tuple[list[int], list[int]] = ([-1] * n, [-1] * n)
+    leg_weights: tuple[list[float], list[float]] = ([0.0] * n, [0.0] * n)
+    queues: tuple[IndexedPriorityQueue, IndexedPriorityQueue] = (IndexedPriorityQueue(n), IndexedPriorityQueue(n))
+    for side, root in enumerate((first, last)):
+        distances[side][root] = 0
+        queues[side].push(root, 0)
+    
+    best: float = math.inf
+    meeting: int = -1	# the vertex where the best path crosses from one search to the other
+    
+    while not queues[0].empty and not queues[1].empty:
+        forward_top, backward_top = queues[0].peek()[1], queues[1].peek()[1]
+        if forward_top + backward_top >= best:
+            break
+        side: int = 0 if forward_top <= backward_top else 1
+        dist, other_dist = distances[side], distances[1 - side]
+        
+        u, dist_u = queues[side].pop()
+        for v, weight in graph.weighted_neighbor_indices(u):
+            alt: float = weight + dist_u
+            if alt < dist[v]:
+                dist[v] = alt
+                parents[side][v] = u
+                leg_weights[side][v] = weight
+                queues[side].push_or_decrease(v, alt)
+                if alt + other_dist[v] < best:
+                    best = alt + other_dist[v]
+                    meeting = v
+    
+    if meeting < 0:
+        return None
+    
+    # source -> meeting comes from the forward search; meeting -> target is the backward search walked in reverse
+    path: WeightedPath = _walk_back(parents[0], leg_weights[0], meeting)
+    v: int = meeting
+    while parents[1][v] >= 0:
+        path.append(WeightedEdge(v, parents[1][v], leg_weights[1][v]))
+        v = parents[1][v]
+    return path
+
+
 if __name__ == '__main__':
     
     # Find shortest distances from Los Angeles to cities in `city_graph2`
@@ -87,6 +173,14 @@ if __name__ == '__main__':
     print("[b]Distances from Los Angeles[/b]")
     for i, dist in enumerate(distances):
         print(f"{city_graph2.vertex_at(i)!r} : {dist}")
+    
+    # Find the shortest path from Los Angeles to Boston only
+    from mst import display_weighted_path
+    
+    print("[b]Shortest path from Los Angeles to Boston[/b]")
+    display_weighted_path(city_graph2, shortest_path(city_graph2, "Los Angeles", "Boston"))
+    assert shortest_path(city_graph2, "Los Angeles", "Boston") == \
+        bidirectional_shortest_path(city_graph2, "Los Angeles", "Boston")
 
 
 
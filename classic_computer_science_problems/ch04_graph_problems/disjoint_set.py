@@ -0,0 +1,54 @@
+# disjoint_set.py
+"""
+A script defining `DisjointSet` (a.k.a. union-find), which keeps track of a partition of the integers 0 to n - 1.
+
+Each set is a tree whose root represents the set.
+
+    - `find` halves the path to the root as it walks it (path compression),
+        so the trees stay nearly flat.
+    - `union` hangs the root of the shallower tree under the root of the deeper one (union by rank),
+        so the trees grow in height only logarithmically.
+
+Together they make both operations run in nearly constant amortized time.
+"""
+from typing import *
+
+
+class DisjointSet:
+
+    def __init__(self, n: int) -> None:
+        self._parents: list[int] = list(range(n))
+        self._ranks: list[int] = [0] * n
+        self.count: int = n	# number of disjoint sets
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    def find(self, x: int) -> int:
+        """ Return the representative of the set that contains `x`. """
+        parents: list[int] = self._parents
+        while parents[x] != x:
+            parents[x] = parents[parents[x]]	# point `x` to its grandparent
+            x = parents[x]
+        return x
+
+    def union(self, x: int, y: int) -> bool:
+        """ Merge the sets that contain `x` and `y`. Return False if they were already the same set. """
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return False
+        if self._ranks[root_x] < self._ranks[root_y]:
+            root_x, root_y = root_y, root_x
+        self._parents[root_y] = root_x
+        if self._ranks[root_x] == self._ranks[root_y]:
+            self._ranks[root_x] += 1
+        self.count -= 1
+        return True
+
+    def connected(self, x: int, y: int) -> bool:
+        """ Are `x` and `y` in the same set? """
+        return self.find(x) == self.find(y)
+
+    def labels(self) -> list[int]:
+        """ Return the representative of every element's set. """
+        return [self.find(x) for x in range(len(self._parents))]
@@ -9,6 +9,7 @@ sys.path.insert(0, '..')
 from rich import print
 
 from edge import Edge
+from csr_graph import CSRGraph
 
 
 V = TypeVar('Vertex')
@@ -16,9 +17,23 @@ V = TypeVar('Vertex')
 
 class Graph(Generic[V]):
     
-    def __init__(self, vertices: list[V] = []) -> None:
-        self._vertices: list[V] = vertices
-        self._edges: list[list[Edge]] = [ [] for _ in vertices]
+    def __init__(self, vertices: Iterable[V] = ()) -> None:
+        self._vertices: list[V] = []
+        self._indices: dict[V, int] = {}	# vertex -> index, kept in sync by `add_vertex()`
+        self._edges: list[list[Edge]] = []
+        for vertex in vertices:
+            self.add_vertex(vertex)
+    
+    @classmethod
+    def from_edge_list(cls, edges: Iterable[tuple[V, V]], vertices: Iterable[V] = ()) -> 'Graph[V]':
+        """
+        Build a graph from (first, second) vertex pairs in time linear to the number of edges.
+        Vertices are added in the order they are first seen, after any listed in `vertices`.
+        """
+        graph: Graph[V] = cls(vertices)
+        for first, second in edges:
+            graph.add_edge_by_indices(graph._index_or_add(first), graph._index_or_add(second))
+        return graph
 
     @property
     def vertex_count(self) -> int:
@@ -34,7 +49,14 @@ class Graph(Generic[V]):
         """ Add `vertex` to the graph and return its index. """
         self._vertices.append(vertex)
         self._edges.append([]) # edges for `vertex`
-        return self.vertex_count - 1
+        i: int = self.vertex_count - 1
+        self._indices.setdefault(vertex, i)
+        return i
+    
+    def _index_or_add(self, vertex: V) -> int:
+        """ Find the index of `vertex`, adding it to the graph first if necessary. """
+        i: Optional[int] = self._indices.get(vertex)
+        return self.add_vertex(vertex) if i is None else i
     
     def add_edge(self, edge: Edge) -> None:
         """ Add an undirected edge to the graph. """
@@ -48,8 +70,8 @@ class Graph(Generic[V]):
     
     def add_edge_by_vertices(self, first: V, second: V) -> None:
         """ Add an edge by looking up vertex indices. """
-        u: int = self._vertices.index(first)
-        v: int = self._vertices.index(second)
+        u: int = self.index_of(first)
+        v: int = self.index_of(second)
         self.add_edge_by_indices(u, v)
     
     def vertex_at(self, i: int) -> V:
@@ -58,7 +80,14 @@ class Graph(Generic[V]):
     
     def index_of(self, v: V) -> int:
         """ Find the index of vertex `v`. """
-        return self._vertices.index(v)
+        try:
+            return self._indices[v]
+        except KeyError:
+            raise ValueError(f'{v!r} is not in graph') from None
+    
+    def neighbor_indices(self, i: int) -> list[int]:
+        """ Find the indices of the vertices that are adjacent to vertex at index `i`."""
+        return [edge.v for edge in self._edges[i]]
     
     def neighbors_of_index(self, i: int) -> list[V]:
         """ Find the vertices that are adjacent to vertex at index `i`."""
@@ -71,14 +100,18 @@ class Graph(Generic[V]):
         """ Find the vertices that are adjacent to vertex `v`. """
         return self.neighbors_of_index(self.index_of(v))
     
-    def edges_for_index(self, i) -> list[Edge]:
+    def edges_for_index(self, i: int) -> list[Edge]:
         """ Return all the edges associated with vertex at index `i`. """
         return self._edges[i]
     
-    def edges_for_vertex(self, i) -> list[Edge]:
+    def edges_for_vertex(self, v: V) -> list[Edge]:
         """ Return all the edges associated with vertex `v`. """
         return self._edges[self.index_of(v)]
     
+    def freeze(self) -> CSRGraph[V]:
+        """ Return a read-only, compressed sparse row copy of the graph. """
+        return CSRGraph.from_edge_lists(self._vertices, self._edges)
+    
     def __str__(self) -> str:
         lines: Iterator[str] = (
             f"{vertex!r} -> {self.neighbors_for_vertex(vertex)!r}"
@@ -1,6 +1,6 @@
 # mst.py
 """
-A script for solving minimum spanning tree problem with Jarníck's algorithm.
+A script for solving minimum spanning tree problem with Jarníck's, Kruskal's and Borůvka's algorithms.
 
 Jarníck's algorithm finds the minimum spanning tree in following steps.
     
@@ -10,14 +10,28 @@ Jarníck's algorithm finds the minimum spanning tree in following steps.
     4. Repeat steps 2 and 3 until every vertex in the graph is in the tree.
 
 The algorithm assumes a connected, undirected graph.
+
+Kruskal's algorithm sorts all the edges by weight and adds each edge to the tree
+unless its ends are already connected, which a `DisjointSet` tells in nearly constant time.
+
+Borůvka's algorithm repeatedly finds the lightest edge leaving each component and adds all of them at once.
+The per-component searches of a round are independent, so they can be split across processes.
+
+On a disconnected graph, Kruskal's and Borůvka's algorithms (and `minimum_spanning_forest`)
+return a minimum spanning forest, i.e. a minimum spanning tree for each connected component.
 """
 from typing import *
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import os
 
 from rich import print
 
 from weighted_graph import WeightedGraph
+from csr_graph import CSRGraph
 from weighted_edge import WeightedEdge
-from priority_queue import PriorityQueue
+from priority_queue import IndexedPriorityQueue
+from disjoint_set import DisjointSet
 
 
 V = TypeVar('V')
@@ -28,37 +42,170 @@ def total_weight(path: WeightedPath) -> float:
     return sum(edge.weight for edge in path)
 
 
-def minimum_spanning_tree(graph: WeightedGraph[V], start: int = 0) -> Optional[WeightedPath]:
+def _grow_tree(graph: WeightedGraph[V] | CSRGraph[V], start: int, visited: list[bool],
+               frontier: IndexedPriorityQueue, parents: list[int]) -> WeightedPath:
     """
-    Find the minimum spanning tree of `graph` with Jarníck's algorithm.
-    """
-    if start < 0 or start >= graph.vertex_count:
-        return None
+    Grow a tree from vertex at index `start` with Jarníck's algorithm until no more vertices can be reached,
+    marking the vertices of the tree in `visited`.
     
+    The frontier keeps each vertex outside the tree once, keyed by the lightest edge known to connect it to the tree,
+    so every vertex is popped (i.e. added to the tree) exactly once.
+    `parents` records the tree end of the lightest edge reaching each frontier vertex.
+    The (empty) frontier and `parents` can be reused from one tree to the next.
+    """
     tree: WeightedPath = []
     
-    frontier: PriorityQueue[WeightedEdge] = PriorityQueue()
-    visited: list[bool] = [False] * graph.vertex_count 	# if it's visited, it's in the tree
-    
     def visit(i: int) -> None:
         """ Visit vertex at index `i`."""
         visited[i] = True
-        for edge in graph.edges_for_index(i):
-            # queue all untouched edges coming from vertex at index `i`
-            if not visited[edge.v]:
-                frontier.push(edge)
+        for j, weight in graph.weighted_neighbor_indices(i):
+            # queue all untouched vertices adjacent to vertex at index `i`, or lower their priority
+            if not visited[j] and frontier.push_or_decrease(j, weight):
+                parents[j] = i
     
     visit(start)
     
     while not frontier.empty:
-        edge = frontier.pop()	# this is the lowest cost edge
-        if not visited[edge.v]: # only add the edge if the destination vertex has yet to be visited
-            tree.append(edge)
-            visit(edge.v)
+        v, weight = frontier.pop()	# this is the end of the lowest cost edge
+        tree.append(WeightedEdge(parents[v], v, weight))
+        visit(v)
+    
+    return tree
+
+
+def minimum_spanning_tree(graph: WeightedGraph[V] | CSRGraph[V], start: int = 0) -> Optional[WeightedPath]:
+    """
+    Find the minimum spanning tree of `graph` with Jarníck's algorithm.
+    Return None if `start` is not a vertex index or if `graph` is disconnected (see `minimum_spanning_forest`).
+    
+    `graph` can be a `WeightedGraph` or its frozen `CSRGraph` copy.
+    """
+    if start < 0 or start >= graph.vertex_count:
+        return None
     
+    visited: list[bool] = [False] * graph.vertex_count 	# if it's visited, it's in the tree
+    tree: WeightedPath = _grow_tree(
+        graph, start, visited, IndexedPriorityQueue(graph.vertex_count), [-1] * graph.vertex_count
+    )
+    if len(tree) < graph.vertex_count - 1:
+        return None	# some vertices cannot be reached from `start`
     return tree
 
 
+def minimum_spanning_forest(graph: WeightedGraph[V] | CSRGraph[V]) -> list[WeightedPath]:
+    """ Find the minimum spanning tree of each connected component of `graph` with Jarníck's algorithm. """
+    visited: list[bool] = [False] * graph.vertex_count
+    frontier: IndexedPriorityQueue = IndexedPriorityQueue(graph.vertex_count)
+    parents: list[int] = [-1] * graph.vertex_count
+    return [
+        _grow_tree(graph, start, visited, frontier, parents)
+        for start in range(graph.vertex_count)
+        if not visited[start]
+    ]
+
+
+def kruskal(graph: WeightedGraph[V] | CSRGraph[V]) -> WeightedPath:
+    """
+    Find the minimum spanning forest of `graph` with Kruskal's algorithm.
+    The edges come out in increasing order of weight rather than tree by tree.
+    """
+    # each undirected edge is stored in both directions; only keep the copy going to a higher index
+    edges: list[tuple[float, int, int]] = [
+        (weight, u, v)
+        for u in range(graph.vertex_count)
+        for v, weight in graph.weighted_neighbor_indices(u)
+        if u < v
+    ]
+    edges.sort()
+    
+    forest: WeightedPath = []
+    components: DisjointSet = DisjointSet(graph.vertex_count)
+    for weight, u, v in edges:
+        if components.union(u, v):
+            forest.append(WeightedEdge(u, v, weight))
+            if components.count == 1:
+                break	# everything is connected
+    return forest
+
+
+# the graph shared by all tasks within a worker process, set by `_init_worker()`
+_shared_graph: Optional[CSRGraph] = None
+
+
+def _init_worker(graph: CSRGraph) -> None:
+    global _shared_graph
+    _shared_graph = graph
+
+
+def _cheapest_edges(graph: WeightedGraph[V] | CSRGraph[V], labels: Sequence[int], start: int, end: int) -> dict[int, tuple[float, int, int]]:
+    """
+    Return the lightest edge leaving each component, looking only at the edges coming out of vertices `start` to `end - 1`.
+    `labels` gives the component of every vertex.
+    
+    Edges are compared as (weight, lower index, higher index) so that ties are broken the same way everywhere,
+    which keeps Borůvka's algorithm from closing a cycle out of equally light edges.
+    """
+    cheapest: dict[int, tuple[float, int, int]] = {}
+    for u in range(start, end):
+        component: int = labels[u]
+        for v, weight in graph.weighted_neighbor_indices(u):
+            if labels[v] != component:
+                edge: tuple[float, int, int] = (weight, u, v) if u < v else (weight, v, u)
+                current: Optional[tuple[float, int, int]] = cheapest.get(component)
+                if current is None or edge < current:
+                    cheapest[component] = edge
+    return cheapest
+
+
+def _cheapest_edges_in_worker(labels: array, start: int, end: int) -> dict[int, tuple[float, int, int]]:
+    return _cheapest_edges(_shared_graph, labels, start, end)
+
+
+def boruvka(graph: WeightedGraph[V] | CSRGraph[V], workers: Optional[int] = 1) -> WeightedPath:
+    """
+    Find the minimum spanning forest of `graph` with Borůvka's algorithm.
+    
+    With `workers` > 1 (or None for `os.cpu_count()`), the search for the lightest edge leaving each component
+    is split by ranges of vertices across a pool of processes, which receive a frozen copy of `graph` once.
+    """
+    workers = workers or os.cpu_count() or 1
+    n: int = graph.vertex_count
+    forest: WeightedPath = []
+    components: DisjointSet = DisjointSet(n)
+    
+    pool: Optional[ProcessPoolExecutor] = None
+    if workers > 1:
+        frozen: CSRGraph[V] = graph if isinstance(graph, CSRGraph) else graph.freeze()
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(frozen,))
+    
+    try:
+        while True:
+            labels: array = array('i', components.labels())
+            if pool is None:
+                cheapest: dict[int, tuple[float, int, int]] = _cheapest_edges(graph, labels, 0, n)
+            else:
+                step: int = -(-n // workers)
+                starts: list[int] = list(range(0, n, step))
+                cheapest = {}
+                for partial in pool.map(
+                    _cheapest_edges_in_worker,
+                    [labels] * len(starts), starts, [min(start + step, n) for start in starts]
+                ):
+                    for component, edge in partial.items():
+                        if component not in cheapest or edge < cheapest[component]:
+                            cheapest[component] = edge
+            
+            if not cheapest:
+                return forest	# no edge leaves any component
+            for weight, u, v in cheapest.values():
+                # two components may have picked the same edge
+                if components.union(u, v):
+                    forest.append(WeightedEdge(u, v, weight))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
 def display_weighted_path(graph: WeightedGraph, tree: WeightedPath) -> None:
     for edge in tree:
         print(f"{graph.vertex_at(edge.u)!r} > {graph.vertex_at(edge.v)!r}")
@@ -74,4 +221,7 @@ if __name__ == '__main__':
     if not tree:
         print('No solution found')
     else:
-        display_weighted_path(city_graph_weighted, tree)
\ No newline at end of file
+        display_weighted_path(city_graph_weighted, tree)
+    
+    assert total_weight(kruskal(city_graph_weighted)) == total_weight(tree)
+    assert total_weight(boruvka(city_graph_weighted)) == total_weight(tree)
\ No newline at end of file
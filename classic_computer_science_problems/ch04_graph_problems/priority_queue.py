@@ -1,6 +1,7 @@
 # priority_queue.py
 """
-A script defining `PriorityQueue` class object so that the item with the lowest priority is pushed out first.
+A script defining `PriorityQueue` class object so that the item with the lowest priority is pushed out first,
+and `IndexedPriorityQueue`, which supports lowering the priority of an item already in the queue.
 """
 from typing import *
 from heapq import heappush, heappop
@@ -26,4 +27,120 @@ class PriorityQueue(Generic[T]):
     
     @property
     def empty(self) -> bool:
-        return not self._container
\ No newline at end of file
+        return not self._container
+
+class IndexedPriorityQueue:
+    """
+    A binary min heap over the integer keys 0 to `capacity - 1` with a priority attached to each key.
+    
+    Unlike `PriorityQueue`, a key is stored at most once: lowering the priority of a key already
+    in the heap moves it up in place (`decrease_key`) instead of pushing a duplicate entry.
+    `_positions` remembers where each key sits in `_heap` (-1 if it is not in the heap).
+    """
+    
+    def __init__(self, capacity: int) -> None:
+        self._heap: list[int] = []
+        self._positions: list[int] = [-1] * capacity
+        self._priorities: list[float] = [0.0] * capacity
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def __contains__(self, key: int) -> bool:
+        return self._positions[key] >= 0
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({[(key, self._priorities[key]) for key in self._heap]!r})"
+    
+    @property
+    def empty(self) -> bool:
+        return not self._heap
+    
+    def priority_of(self, key: int) -> float:
+        """ Return the current priority of `key`, which must be in the heap. """
+        if key not in self:
+            raise KeyError(key)
+        return self._priorities[key]
+    
+    def push(self, key: int, priority: float) -> None:
+        """ Put `key` according to its priority. """
+        if key in self:
+            raise ValueError(f'{key!r} is already in the queue')
+        self._priorities[key] = priority
+        self._positions[key] = len(self._heap)
+        self._heap.append(key)
+        self._sift_up(len(self._heap) - 1)
+    
+    def decrease_key(self, key: int, priority: float) -> None:
+        """ Lower the priority of `key`, which must be in the heap. """
+        if priority > self.priority_of(key):
+            raise ValueError(f'New priority {priority!r} is higher than the current one')
+        self._priorities[key] = priority
+        self._sift_up(self._positions[key])
+    
+    def push_or_decrease(self, key: int, priority: float) -> bool:
+        """
+        Push `key` if it is not in the heap, or lower its priority if `priority` is lower.
+        Return whether the heap changed.
+        """
+        if self._positions[key] < 0:
+            self.push(key, priority)
+            return True
+        if priority < self._priorities[key]:
+            self._priorities[key] = priority
+            self._sift_up(self._positions[key])
+            return True
+        return False
+    
+    def peek(self) -> tuple[int, float]:
+        """ Return the key with the lowest priority along with its priority without removing it. """
+        top: int = self._heap[0]
+        return top, self._priorities[top]
+    
+    def pop(self) -> tuple[int, float]:
+        """ Pop out the key with the lowest priority along with its priority. """
+        heap: list[int] = self._heap
+        top: int = heap[0]
+        last: int = heap.pop()
+        self._positions[top] = -1
+        if heap:
+            heap[0] = last
+            self._positions[last] = 0
+            self._sift_down(0)
+        return top, self._priorities[top]
+    
+    def _sift_up(self, pos: int) -> None:
+        heap, positions, priorities = self._heap, self._positions, self._priorities
+        key: int = heap[pos]
+        priority: float = priorities[key]
+        while pos > 0:
+            parent_pos: int = (pos - 1) >> 1
+            parent: int = heap[parent_pos]
+            if priority >= priorities[parent]:
+                break
+            heap[pos] = parent
+            positions[parent] = pos
+            pos = parent_pos
+        heap[pos] = key
+        positions[key] = pos
+    
+    def _sift_down(self, pos: int) -> None:
+        heap, positions, priorities = self._heap, self._positions, self._priorities
+        size: int = len(heap)
+        key: int = heap[pos]
+        priority: float = priorities[key]
+        while True:
+            child_pos: int = 2 * pos + 1
+            if child_pos >= size:
+                break
+            right_pos: int = child_pos + 1
+            if right_pos < size and priorities[heap[right_pos]] < priorities[heap[child_pos]]:
+                child_pos = right_pos
+            child: int = heap[child_pos]
+            if priorities[child] >= priority:
+                break
+            heap[pos] = child
+            positions[child] = pos
+            pos = child_pos
+        heap[pos] = key
+        positions[key] = pos
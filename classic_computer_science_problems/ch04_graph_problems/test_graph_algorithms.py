@@ -0,0 +1,232 @@
+# test_graph_algorithms.py
+"""
+A pytest script testing the shortest path and minimum spanning tree algorithms on the city graph and on random graphs.
+"""
+import unittest
+import random
+import os
+import pickle
+import subprocess
+import sys
+from typing import *
+
+from graph import Graph
+from weighted_graph import WeightedGraph
+from priority_queue import IndexedPriorityQueue
+from mst import minimum_spanning_tree, minimum_spanning_forest, kruskal, boruvka, total_weight
+from disjoint_set import DisjointSet
+from dijkstra import dijkstra, shortest_path, bidirectional_shortest_path
+from city_graph import city_graph_weighted
+from all_pairs import all_pairs_shortest_paths
+from benchmark_graphs import random_weighted_graph, lazy_dijkstra
+
+
+def run_spawned(code: str) -> None:
+    """ Run `code` in a fresh interpreter whose process pools start their workers with spawn. """
+    subprocess.run(
+        [sys.executable, '-c', "import multiprocessing\nmultiprocessing.set_start_method('spawn')\n" + code],
+        cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+    )
+
+
+class EdgeListTests(unittest.TestCase):
+
+    """ Tests for `Graph.from_edge_list` and `WeightedGraph.from_edge_list`. """
+
+    def test_graph(self):
+        """ Listed vertices come first, then the others as first seen; duplicate edges are kept. """
+        graph: Graph[str] = Graph.from_edge_list([('b', 'c'), ('c', 'd'), ('b', 'c')], vertices=['a', 'c'])
+        self.assertEqual([graph.vertex_at(i) for i in range(graph.vertex_count)], ['a', 'c', 'b', 'd'])
+        self.assertEqual([graph.index_of(v) for v in 'abcd'], [0, 2, 1, 3])
+        self.assertEqual(graph.edge_count, 6)
+        self.assertEqual(graph.neighbors_for_vertex('c'), ['b', 'd', 'b'])
+        self.assertEqual(graph.neighbors_for_vertex('a'), [])
+        with self.assertRaises(ValueError):
+            graph.index_of('e')
+
+    def test_weighted_graph(self):
+        """ Each duplicate edge keeps its own weight. """
+        graph: WeightedGraph[str] = WeightedGraph.from_edge_list([('x', 'y', 2.0), ('y', 'z', 1.0), ('y', 'x', 3.0)])
+        self.assertEqual([graph.vertex_at(i) for i in range(graph.vertex_count)], ['x', 'y', 'z'])
+        self.assertEqual(graph.neighbors_for_index_with_weights(graph.index_of('x')), [('y', 2.0), ('y', 3.0)])
+        self.assertEqual(graph.edge_count, 6)
+        with self.assertRaises(ValueError):
+            graph.index_of('w')
+        with self.assertRaises(ValueError):
+            graph.add_edge_by_vertices('x', 'w', 1.0)
+
+
+class IndexedPriorityQueueTests(unittest.TestCase):
+
+    """ Tests for `IndexedPriorityQueue`. """
+
+    def test_pops_in_priority_order(self):
+        """ Keys come out sorted by their latest priority. """
+        rng: random.Random = random.Random(1)
+        queue: IndexedPriorityQueue = IndexedPriorityQueue(100)
+        priorities: dict[int, float] = {}
+        for key in range(100):
+            priorities[key] = rng.random()
+            queue.push(key, priorities[key])
+        for key in rng.sample(range(100), 30):
+            priorities[key] /= 2
+            queue.decrease_key(key, priorities[key])
+        popped: list[float] = [queue.pop()[1] for _ in range(100)]
+        self.assertEqual(popped, sorted(priorities.values()))
+        self.assertTrue(queue.empty)
+
+    def test_push_or_decrease(self):
+        """ Only a lower priority changes a key already in the queue. """
+        queue: IndexedPriorityQueue = IndexedPriorityQueue(3)
+        self.assertTrue(queue.push_or_decrease(0, 5.0))
+        self.assertFalse(queue.push_or_decrease(0, 7.0))
+        self.assertTrue(queue.push_or_decrease(0, 2.0))
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(queue.pop(), (0, 2.0))
+
+
+class ShortestPathTests(unittest.TestCase):
+
+    """ Tests for `dijkstra` on the original and the frozen graphs. """
+
+    def test_city_graph(self):
+        """ Distances from Los Angeles match the book. """
+        distances, _ = dijkstra(city_graph_weighted, 'Los Angeles')
+        self.assertEqual(distances[city_graph_weighted.index_of('Boston')], 2605)
+        self.assertEqual(distances[city_graph_weighted.index_of('Miami')], 2340)
+
+    def test_matches_lazy_dijkstra(self):
+        """ The decrease-key version finds the same distances as the lazy-push version. """
+        graph = random_weighted_graph(500, 2_000, seed=3)
+        self.assertEqual(dijkstra(graph, 0)[0], lazy_dijkstra(graph, 0))
+        self.assertEqual(dijkstra(graph.freeze(), 0)[0], lazy_dijkstra(graph, 0))
+
+    def test_point_to_point(self):
+        """ Both point-to-point searches return a path as long as the distance found by `dijkstra`. """
+        graph = random_weighted_graph(500, 2_000, seed=4)
+        distances, _ = dijkstra(graph, 0)
+        for target in range(0, 500, 37):
+            for search in (shortest_path, bidirectional_shortest_path):
+                path = search(graph, 0, target)
+                self.assertAlmostEqual(total_weight(path), distances[target])
+                if path:
+                    self.assertEqual((path[0].u, path[-1].v), (0, target))
+                    self.assertTrue(all(a.v == b.u for a, b in zip(path, path[1:])))
+
+    def test_unreachable(self):
+        """ There is no path to a vertex without edges. """
+        graph = random_weighted_graph(50, 100, seed=5)
+        graph.add_vertex(50)
+        self.assertIsNone(shortest_path(graph, 0, 50))
+        self.assertIsNone(bidirectional_shortest_path(graph, 0, 50))
+
+
+class CSRGraphTests(unittest.TestCase):
+
+    """ Tests for `CSRGraph`. """
+
+    def test_pickle(self):
+        """ A frozen graph survives pickling, as it must to reach the workers of a pool started with spawn. """
+        for graph in (city_graph_weighted, Graph.from_edge_list([('a', 'b'), ('b', 'c')])):
+            frozen = graph.freeze()
+            copy = pickle.loads(pickle.dumps(frozen))
+            self.assertEqual(str(copy), str(frozen))
+            self.assertEqual(list(copy.neighbor_indices(1)), list(frozen.neighbor_indices(1)))
+        frozen = pickle.loads(pickle.dumps(city_graph_weighted.freeze()))
+        self.assertEqual(dijkstra(frozen, 'Boston'), dijkstra(city_graph_weighted, 'Boston'))
+
+
+class AllPairsShortestPathsTests(unittest.TestCase):
+
+    """ Tests for `all_pairs_shortest_paths`. """
+
+    def test_matches_dijkstra(self):
+        """ Each row holds the distances found by `dijkstra`, with and without a process pool. """
+        graph = random_weighted_graph(200, 800, seed=6)
+        sources: list[int] = [5, 0, 199, 42]
+        for workers in (1, 2):
+            matrix = all_pairs_shortest_paths(graph, sources, workers=workers)
+            self.assertEqual(matrix.shape, (4, 200))
+            for row, source in zip(matrix.tolist(), sources):
+                self.assertEqual(row, dijkstra(graph, source)[0])
+
+    def test_empty(self):
+        """ No sources or no vertices give an empty matrix. """
+        for graph, sources in ((city_graph_weighted, []), (WeightedGraph(), None), (WeightedGraph(), [])):
+            for workers in (1, 2):
+                matrix = all_pairs_shortest_paths(graph, sources, workers=workers)
+                self.assertEqual(len(matrix), 0)
+                self.assertEqual(matrix.tolist(), [])
+
+    def test_spawn(self):
+        """ The workers receive the graph when they are started with spawn (the default on macOS and Windows). """
+        run_spawned(
+            'from all_pairs import all_pairs_shortest_paths\n'
+            'from dijkstra import dijkstra\n'
+            'from city_graph import city_graph_weighted\n'
+            'matrix = all_pairs_shortest_paths(city_graph_weighted, workers=2)\n'
+            'assert matrix.tolist()[3] == dijkstra(city_graph_weighted, city_graph_weighted.vertex_at(3))[0]\n'
+        )
+
+
+class MinimumSpanningTreeTests(unittest.TestCase):
+
+    """ Tests for `minimum_spanning_tree`. """
+
+    def test_city_graph(self):
+        """ The minimum spanning tree of the city graph weighs 5372 miles. """
+        tree = minimum_spanning_tree(city_graph_weighted)
+        self.assertEqual(len(tree), city_graph_weighted.vertex_count - 1)
+        self.assertEqual(total_weight(tree), 5372)
+        self.assertEqual(total_weight(minimum_spanning_tree(city_graph_weighted.freeze())), 5372)
+        self.assertEqual(total_weight(kruskal(city_graph_weighted)), 5372)
+        self.assertEqual(total_weight(boruvka(city_graph_weighted)), 5372)
+
+    def test_algorithms_agree(self):
+        """ Jarníck's, Kruskal's and Borůvka's algorithms find trees of the same weight. """
+        graph = random_weighted_graph(300, 1_500, seed=7)
+        expected: float = total_weight(minimum_spanning_tree(graph))
+        for tree in (kruskal(graph), boruvka(graph), boruvka(graph, workers=2)):
+            self.assertEqual(len(tree), 299)
+            self.assertAlmostEqual(total_weight(tree), expected)
+
+    def test_boruvka_spawn(self):
+        """ Borůvka's workers receive the graph when they are started with spawn. """
+        run_spawned(
+            'from mst import boruvka, total_weight\n'
+            'from city_graph import city_graph_weighted\n'
+            'assert total_weight(boruvka(city_graph_weighted, workers=2)) == 5372\n'
+        )
+
+    def test_disconnected_graph(self):
+        """ A disconnected graph has no spanning tree but a spanning forest. """
+        graph = random_weighted_graph(100, 300, seed=8)
+        for i in range(100, 110):
+            graph.add_vertex(i)
+        graph.add_edge_by_indices(100, 101, 1.0)
+        self.assertIsNone(minimum_spanning_tree(graph))
+        forest = minimum_spanning_forest(graph)
+        self.assertEqual(len(forest), 1 + 1 + 8)	# the random graph, the pair, 8 isolated vertices
+        self.assertEqual(sum(len(tree) for tree in forest), 100)
+        self.assertAlmostEqual(total_weight(kruskal(graph)), sum(total_weight(tree) for tree in forest))
+        self.assertAlmostEqual(total_weight(boruvka(graph)), total_weight(kruskal(graph)))
+
+
+class DisjointSetTests(unittest.TestCase):
+
+    """ Tests for `DisjointSet`. """
+
+    def test_union_and_find(self):
+        components: DisjointSet = DisjointSet(6)
+        self.assertTrue(components.union(0, 1))
+        self.assertTrue(components.union(2, 3))
+        self.assertTrue(components.union(1, 3))
+        self.assertFalse(components.union(0, 2))
+        self.assertTrue(components.connected(0, 3))
+        self.assertFalse(components.connected(0, 4))
+        self.assertEqual(components.count, 3)
+
+
+if __name__ == '__main__':
+
+    unittest.main(verbosity=2)
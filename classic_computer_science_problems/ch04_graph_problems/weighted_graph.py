@@ -5,6 +5,7 @@ A script defining a class representing a graph with weighted edges, `WeightedGra
 from typing import *
 
 from graph import Graph
+from csr_graph import CSRGraph
 from weighted_edge import WeightedEdge
 
 V = TypeVar('Vertex')
@@ -12,19 +13,34 @@ V = TypeVar('Vertex')
 
 class WeightedGraph(Generic[V], Graph[V]):
     
-    def __init__(self, vertices: list[V]) -> None:
-        self._vertices: list[V] = vertices
-        self._edges: list[list[WeightedEdge]] = [ [] for _ in self._vertices ]
+    def __init__(self, vertices: Iterable[V] = ()) -> None:
+        super().__init__(vertices)
+        self._edges: list[list[WeightedEdge]]
+    
+    @classmethod
+    def from_edge_list(cls, edges: Iterable[tuple[V, V, float]], vertices: Iterable[V] = ()) -> 'WeightedGraph[V]':
+        """
+        Build a graph from (first, second, weight) triples in time linear to the number of edges.
+        Vertices are added in the order they are first seen, after any listed in `vertices`.
+        """
+        graph: WeightedGraph[V] = cls(vertices)
+        for first, second, weight in edges:
+            graph.add_edge_by_indices(graph._index_or_add(first), graph._index_or_add(second), weight)
+        return graph
     
     def add_edge_by_indices(self, u: int, v: int, weight: float) -> None:
         edge: WeightedEdge = WeightedEdge(u, v, weight)
         self.add_edge(edge)
     
     def add_edge_by_vertices(self, first: V, second: V, weight: float) -> None:
-        u: int = self._vertices.index(first)
-        v: int = self._vertices.index(second)
+        u: int = self.index_of(first)
+        v: int = self.index_of(second)
         self.add_edge_by_indices(u, v, weight)
     
+    def weighted_neighbor_indices(self, i: int) -> Iterator[tuple[int, float]]:
+        """ Iterate over (index, weight) pairs of the vertices adjacent to vertex at index `i`. """
+        return ((edge.v, edge.weight) for edge in self._edges[i])
+    
     def neighbors_for_index_with_weights(self, i: int) -> list[tuple[V, float]]:
         """ Return the vertices adjacent to vertex with index `i` and their weights."""
         return [
@@ -32,6 +48,10 @@ class WeightedGraph(Generic[V], Graph[V]):
             for edge in self.edges_for_index(i)
         ]
     
+    def freeze(self) -> CSRGraph[V]:
+        """ Return a read-only, compressed sparse row copy of the graph with edge weights. """
+        return CSRGraph.from_edge_lists(self._vertices, self._edges, weighted=True)
+    
     def __str__(self) -> str:
         return '\n'.join(
             f"{v} -> {self.neighbors_for_index_with_weights(i)!r}"
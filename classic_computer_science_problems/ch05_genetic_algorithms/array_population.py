@@ -0,0 +1,210 @@
+# array_population.py
+"""
+A script defining `ArrayGeneticAlgorithm`, a `GeneticAlgorithm` whose population of fixed-length integer genomes
+is a single 2-D NumPy array, one row per individual, instead of a list of `Chromosome` objects.
+
+Each step of a generation is a handful of array operations on the whole population:
+
+    - fitness: a function of the whole array returning one fitness per row
+        (see `simple_equation.equation_fitness` and `send_more_money.send_more_money_fitness`),
+        or `rowwise(f)` to call a function of one genome per row,
+    - selection: roulette wheel by binary search in the cumulative fitness, stochastic universal sampling,
+        or tournaments of `tournament_size` individuals drawn with replacement, the two best of each becoming parents,
+        after the `elitism` fittest rows, which are copied unchanged,
+    - crossover: for integer genomes, each child takes the genes of one parent up to a random cut
+        and those of the other parent after it (like `SimpleEquation.crossover`, which cuts between x and y);
+        for permutations, each child copies a parent and swaps a gene into the place it has in the other parent
+        (like `SendMoreMoney.crossover`), so children stay permutations,
+    - mutation: for integer genomes, one gene moves by ±1 (like `SimpleEquation.mutate`),
+        kept within [`low`, `high`) if given; for permutations, two genes are swapped.
+
+`run` is that of `GeneticAlgorithm` and returns the best genome as a 1-D array.
+The random numbers come from a NumPy generator seeded with `seed`, so runs are reproducible.
+With the book's tournament of half the population, a generation would be quadratic,
+so tournaments default to `tournament_size` = 8.
+
+Run it from this directory to time generations of 100,000 individuals:
+```
+python array_population.py
+```
+"""
+from typing import *
+import time
+
+import numpy as np
+
+from genetic_algorithm import GeneticAlgorithm
+
+# fitness(genes) returns the fitness of each row of the 2-D array `genes`
+ArrayFitness = Callable[[np.ndarray], np.ndarray]
+
+
+def rowwise(fitness: Callable[[np.ndarray], float]) -> ArrayFitness:
+    """ Turn a function of one genome into a function of a population (a Python loop, not vectorized). """
+    def fitnesses(genes: np.ndarray) -> np.ndarray:
+        return np.fromiter((fitness(row) for row in genes), dtype=float, count=len(genes))
+    return fitnesses
+
+
+class ArrayGeneticAlgorithm(GeneticAlgorithm):
+
+    def __init__(self, initial_pop: np.ndarray, fitness: ArrayFitness, threshold: float,
+                 max_gen: int = 100,
+                 mutate_prob: float = 0.01,
+                 xover_prob: float = 0.7,
+                 selection_type: GeneticAlgorithm.SelectionType = GeneticAlgorithm.SelectionType.TOURNAMENT,
+                 tournament_size: int = 8,
+                 elitism: int = 0,
+                 permutation: bool = False,
+                 low: Optional[int] = None,
+                 high: Optional[int] = None,
+                 seed: Optional[int] = None) -> None:
+        """
+        initial_pop: np.ndarray
+            the first generation, one genome per row
+
+        fitness: ArrayFitness
+            returns the fitness of each row of a population (non-negative for the roulette wheel)
+
+        tournament_size: int
+            number of individuals drawn for each tournament, at least 2 (checked by `GeneticAlgorithm`)
+
+        permutation: bool
+            whether each genome is a permutation, which crossover and mutation must preserve
+
+        low, high: int
+            bounds of the genes of integer genomes, kept by mutation (default: unbounded)
+
+        seed: int
+            seeds the random generator
+
+        The other arguments are those of `GeneticAlgorithm`.
+        """
+        super().__init__(initial_pop, threshold, max_gen, mutate_prob, xover_prob, selection_type,
+                         tournament_size=tournament_size, elitism=elitism, memo_size=0)
+        self._population: np.ndarray = np.array(initial_pop)
+        self._array_fitness: ArrayFitness = fitness
+        self._permutation: bool = permutation
+        self._low: Optional[int] = low
+        self._high: Optional[int] = high
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._fitnesses: np.ndarray = np.empty(0)	# the fitness of each row of the population
+
+    def _evaluate_population(self) -> None:
+        self._fitnesses = np.asarray(self._array_fitness(self._population), dtype=float)
+        self.evaluations[-1] += len(self._population)
+
+    def _best(self) -> tuple[np.ndarray, float]:
+        i: int = int(self._fitnesses.argmax())
+        return self._population[i].copy(), float(self._fitnesses[i])
+
+    def _mean_fitness(self) -> float:
+        return float(self._fitnesses.mean())
+
+    def emigrants(self, k: int) -> np.ndarray:
+        """ Return a copy of the rows of the `k` fittest individuals. """
+        return self._population[np.argsort(-self._fitnesses, kind='stable')[:k]]
+
+    def immigrate(self, immigrants: np.ndarray) -> None:
+        """ Replace the rows of the least fit individuals with `immigrants`. """
+        worst: np.ndarray = np.argsort(self._fitnesses, kind='stable')[:len(immigrants)]
+        self._population[worst] = immigrants
+        self._fitnesses[worst] = self._array_fitness(np.asarray(immigrants).reshape(len(worst), -1))
+        self.evaluations[-1] += len(worst)
+
+    def _pick_parents(self, pairs: int) -> tuple[np.ndarray, np.ndarray]:
+        """ Return the row indices of the first and second parents of `pairs` pairs. """
+        n: int = len(self._population)
+        if self._selection_type == GeneticAlgorithm.SelectionType.ROULETTE:
+            wheel: np.ndarray = np.cumsum(self._fitnesses)
+            spins: np.ndarray = self._rng.random((pairs, 2)) * wheel[-1]
+            picks: np.ndarray = np.minimum(np.searchsorted(wheel, spins, side='right'), n - 1)
+            return picks[:, 0], picks[:, 1]
+        if self._selection_type == GeneticAlgorithm.SelectionType.SUS:
+            wheel = np.cumsum(self._fitnesses)
+            step: float = wheel[-1] / (2 * pairs)
+            pointers: np.ndarray = (self._rng.random() + np.arange(2 * pairs)) * step
+            picks = self._rng.permutation(np.minimum(np.searchsorted(wheel, pointers, side='right'), n - 1))
+            return picks[:pairs], picks[pairs:]
+        participants: np.ndarray = self._rng.integers(n, size=(pairs, self._tournament_size))
+        # the two best of each tournament, best first
+        top: np.ndarray = np.argsort(-self._fitnesses[participants], axis=1, kind='stable')[:, :2]
+        winners: np.ndarray = np.take_along_axis(participants, top, axis=1)
+        return winners[:, 0], winners[:, 1]
+
+    def _reproduce_and_replace(self) -> None:
+        """ Replace the population with the children of pairs of parents, crossed over with probability `_xover_prob`. """
+        genes: np.ndarray = self._population
+        n, length = genes.shape
+        elite: np.ndarray = genes[np.argsort(-self._fitnesses, kind='stable')[:self._elitism]]
+        first, second = self._pick_parents(-(-(n - len(elite)) // 2))
+        children1: np.ndarray = genes[first]	# copies
+        children2: np.ndarray = genes[second]
+        cross: np.ndarray = self._rng.random(len(first)) < self._xover_prob
+        if length > 1 and cross.any():
+            parents1, parents2 = children1[cross], children2[cross]
+            if self._permutation:
+                children1[cross] = self._swap_in(parents1, parents2)
+                children2[cross] = self._swap_in(parents2, parents1)
+            else:
+                cuts: np.ndarray = self._rng.integers(1, length, size=len(parents1))
+                after: np.ndarray = np.arange(length) >= cuts[:, None]
+                children1[cross] = np.where(after, parents2, parents1)
+                children2[cross] = np.where(after, parents1, parents2)
+        self._population = np.concatenate((elite, children1, children2))[:n]
+
+    def _swap_in(self, genes: np.ndarray, donors: np.ndarray) -> np.ndarray:
+        """ Return copies of the permutations `genes`, each with the gene of its donor at a random place swapped into that place. """
+        rows: np.ndarray = np.arange(len(genes))
+        places: np.ndarray = self._rng.integers(genes.shape[1], size=len(genes))
+        wanted: np.ndarray = donors[rows, places]
+        where: np.ndarray = (genes == wanted[:, None]).argmax(axis=1)	# where each row holds the wanted gene
+        children: np.ndarray = genes.copy()
+        children[rows, where] = genes[rows, places]
+        children[rows, places] = wanted
+        return children
+
+    def _mutate(self) -> None:
+        """ Mutate each individual but the elite with probability `_mutate_prob`. """
+        genes: np.ndarray = self._population
+        n, length = genes.shape
+        rows: np.ndarray = self._elitism + np.flatnonzero(self._rng.random(n - self._elitism) < self._mutate_prob)
+        places: np.ndarray = self._rng.integers(length, size=len(rows))
+        if self._permutation:
+            if length < 2:
+                return
+            others: np.ndarray = (places + self._rng.integers(1, length, size=len(rows))) % length
+            genes[rows, places], genes[rows, others] = genes[rows, others], genes[rows, places]
+        else:
+            moved: np.ndarray = genes[rows, places] + self._rng.choice(np.array([-1, 1], dtype=genes.dtype), size=len(rows))
+            if self._low is not None or self._high is not None:
+                moved = np.clip(moved, self._low, None if self._high is None else self._high - 1)
+            genes[rows, places] = moved
+
+
+if __name__ == '__main__':
+
+    from rich import print
+
+    from send_more_money import LETTERS, send_more_money_fitness
+    from simple_equation import equation_fitness
+
+    SIZE: int = 100_000
+    GENERATIONS: int = 20
+    rng: np.random.Generator = np.random.default_rng(0)
+
+    # with 100,000 individuals, both problems are usually solved from the start; time full runs instead
+    for name, algo in (
+        ('SimpleEquation', ArrayGeneticAlgorithm(
+            rng.integers(100, size=(SIZE, 2)), equation_fitness, threshold=float('inf'),
+            max_gen=GENERATIONS, mutate_prob=0.7, xover_prob=0.1, low=0, high=100, seed=0
+        )),
+        ('SendMoreMoney', ArrayGeneticAlgorithm(
+            rng.permuted(np.tile(np.arange(len(LETTERS)), (SIZE, 1)), axis=1), send_more_money_fitness,
+            threshold=float('inf'), max_gen=GENERATIONS, mutate_prob=0.2, xover_prob=0.7, permutation=True, seed=0
+        )),
+    ):
+        start: float = time.perf_counter()
+        solution: np.ndarray = algo.run()
+        seconds: float = time.perf_counter() - start
+        print(f'{name}: best {solution} after {GENERATIONS} generations of {SIZE:,}, {seconds / GENERATIONS:.3f} s per generation')
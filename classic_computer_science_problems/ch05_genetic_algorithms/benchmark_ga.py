@@ -0,0 +1,81 @@
+# benchmark_ga.py
+"""
+A script timing one generation of `GeneticAlgorithm` on `SendMoreMoney` with each selection operator,
+and of `ArrayGeneticAlgorithm` for comparison.
+
+Run it from this directory:
+```
+python benchmark_ga.py
+```
+"""
+from typing import *
+import random
+import time
+
+import numpy as np
+from rich import print
+from rich.table import Table
+
+from array_population import ArrayGeneticAlgorithm
+from genetic_algorithm import GeneticAlgorithm
+from send_more_money import SendMoreMoney, LETTERS, send_more_money_fitness
+
+SIZES: list[int] = [1_000, 10_000, 100_000]
+QUADRATIC_LIMIT: int = 10_000	# the quadratic operators are skipped above this size
+
+
+class PerPairRouletteAlgorithm(GeneticAlgorithm):
+    """ The roulette wheel as it was: the weights are rebuilt, and summed up by `choices`, for every pair of parents. """
+
+    def _pick_roulette(self, wheel: list[float]) -> tuple[SendMoreMoney, SendMoreMoney]:
+        return tuple(random.choices(self._population, weights=[self._fitness(x) for x in self._population], k=2))
+
+
+def time_generation(algo: GeneticAlgorithm) -> float:
+    """ Evaluate the initial population of `algo`, then return the duration of one generation in seconds. """
+    algo._start()
+    start: float = time.perf_counter()
+    algo._step()
+    return time.perf_counter() - start
+
+
+def benchmark_selection(sizes: list[int] = SIZES) -> Table:
+    """ Time a generation with each selection operator, for each population size. """
+    selection = GeneticAlgorithm.SelectionType
+    operators: list[tuple[str, Callable[[list[SendMoreMoney]], GeneticAlgorithm], bool]] = [
+        ('roulette, per pair (before)', lambda pop: PerPairRouletteAlgorithm(pop, 2.0, selection_type=selection.ROULETTE), True),
+        ('roulette', lambda pop: GeneticAlgorithm(pop, 2.0, selection_type=selection.ROULETTE), False),
+        ('SUS', lambda pop: GeneticAlgorithm(pop, 2.0, selection_type=selection.SUS), False),
+        ('tournament of n/2', lambda pop: GeneticAlgorithm(pop, 2.0), True),
+        ('tournament of 8', lambda pop: GeneticAlgorithm(pop, 2.0, tournament_size=8), False),
+        ('tournament of 8, elitism 10', lambda pop: GeneticAlgorithm(pop, 2.0, tournament_size=8, elitism=10), False),
+    ]
+    table: Table = Table(title='SEND+MORE=MONEY, one generation (seconds)')
+    for column in ['selection'] + [f'{size:,}' for size in sizes]:
+        table.add_column(column, justify='right')
+
+    for name, make_algorithm, quadratic in operators:
+        row: list[str] = [name]
+        for size in sizes:
+            if quadratic and size > QUADRATIC_LIMIT:
+                row.append('-')
+                continue
+            random.seed(0)
+            population: list[SendMoreMoney] = [SendMoreMoney.random_instance() for _ in range(size)]
+            row.append(f'{time_generation(make_algorithm(population)):.3f}')
+        table.add_row(*row)
+
+    row = ['ArrayGeneticAlgorithm, tournament of 8']
+    for size in sizes:
+        genes: np.ndarray = np.random.default_rng(0).permuted(np.tile(np.arange(len(LETTERS)), (size, 1)), axis=1)
+        array_algo: ArrayGeneticAlgorithm = ArrayGeneticAlgorithm(
+            genes, send_more_money_fitness, 2.0, permutation=True, seed=0
+        )
+        row.append(f'{time_generation(array_algo):.3f}')
+    table.add_row(*row)
+    return table
+
+
+if __name__ == '__main__':
+
+    print(benchmark_selection())
@@ -1,33 +1,79 @@
 # chromosome.py
 """
 A script defining `Chromosome` class object for genetic algorithm.
+
+A chromosome caches its fitness: `cached_fitness()` computes `fitness()` once,
+and the `mutate` and `crossover` of every subclass are wrapped so that they forget it
+(for the mutated chromosome, and for both children, which are often copies of their parents).
+Code that changes the genes of a chromosome in any other way must call `invalidate()`.
+
+`genotype()` returns a hashable copy of the genes, which `GeneticAlgorithm` uses as the key of a fitness memo
+shared by the whole population, so that identical individuals are only evaluated once.
 """
 from typing import *
 from abc import ABC, abstractmethod
+from functools import wraps
 
 T = TypeVar('T', bound='Chromosome') # type of chromosome
 
 
 class Chromosome(ABC):
-    """All methods must be overridden."""
-    
+    """`fitness`, `random_instance`, `crossover` and `mutate` must be overridden."""
+
+    _fitness: Optional[float] = None	# the cached fitness, None until computed
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'mutate' in cls.__dict__:
+            cls.mutate = _invalidating_mutate(cls.__dict__['mutate'])
+        if 'crossover' in cls.__dict__:
+            cls.crossover = _invalidating_crossover(cls.__dict__['crossover'])
+
     @abstractmethod
     def fitness(self) -> float:
         """ Determine its own fitness. """
-    
+
     @classmethod
     @abstractmethod
     def random_instance(cls: Type[T]) -> T:
         """ Create an instance with randomly selected genes. """
-    
+
     @abstractmethod
     def crossover(self: T, other: T) -> tuple[T, T]:
         """ Combine itself with another chromosome to create children. """
-    
+
     @abstractmethod
     def mutate(self) -> None:
         """ Make a small change in itself. """
-    
-    
-    
 
+    def genotype(self) -> Optional[Hashable]:
+        """ Return a hashable value identifying its genes, or None (the default) not to share fitness by genotype. """
+        return None
+
+    def cached_fitness(self) -> float:
+        """ Return `fitness()`, computed only once since the genes last changed. """
+        if self._fitness is None:
+            self._fitness = self.fitness()
+        return self._fitness
+
+    def invalidate(self) -> None:
+        """ Forget the cached fitness, after the genes changed. """
+        self._fitness = None
+
+
+def _invalidating_mutate(mutate: Callable[[T], None]) -> Callable[[T], None]:
+    @wraps(mutate)
+    def wrapper(self: T) -> None:
+        mutate(self)
+        self.invalidate()
+    return wrapper
+
+
+def _invalidating_crossover(crossover: Callable[[T, T], tuple[T, T]]) -> Callable[[T, T], tuple[T, T]]:
+    @wraps(crossover)
+    def wrapper(self: T, other: T) -> tuple[T, T]:
+        children: tuple[T, T] = crossover(self, other)
+        for child in children:
+            child.invalidate()
+        return children
+    return wrapper
@@ -0,0 +1,99 @@
+# evaluators.py
+"""
+A script defining the fitness evaluators of `GeneticAlgorithm`, which compute the fitness of a batch of chromosomes.
+
+    SerialEvaluator: one after the other, in this thread (the default)
+    ThreadEvaluator: in a pool of threads, for fitness functions that release the GIL (I/O, NumPy, zlib on big inputs)
+    ProcessEvaluator: in a pool of processes, for pure-Python fitness functions;
+        the chromosomes are pickled, so their classes must be importable (no lambdas or local classes)
+
+`GeneticAlgorithm` hands each generation's unevaluated genotypes to `evaluate` in one call.
+The pools split the batch into `chunksize` chromosomes per task (by default, about 4 tasks per worker),
+so that each worker receives a few large messages rather than one per chromosome.
+Fitness functions must be pure: the results are then the same whatever the evaluator, and do not depend on timing.
+
+A pool is started on the first batch and kept until `close()`; evaluators are also context managers:
+```
+with ProcessEvaluator(workers=4) as evaluator:
+    best = GeneticAlgorithm(population, threshold, evaluator=evaluator).run()
+```
+"""
+from typing import *
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from chromosome import Chromosome
+
+C = TypeVar('C', bound='Chromosome') # type of chromosomes
+
+
+def _fitnesses(chromosomes: list[C]) -> list[float]:
+    return [chromosome.fitness() for chromosome in chromosomes]
+
+
+class Evaluator(ABC):
+
+    @abstractmethod
+    def evaluate(self, chromosomes: Sequence[C]) -> list[float]:
+        """ Return the fitness of each of `chromosomes`, in order. """
+
+    def close(self) -> None:
+        """ Release the workers, if any. """
+
+    def __enter__(self) -> 'Evaluator':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class SerialEvaluator(Evaluator):
+
+    def evaluate(self, chromosomes: Sequence[C]) -> list[float]:
+        return _fitnesses(list(chromosomes))
+
+
+class _PoolEvaluator(Evaluator):
+
+    def __init__(self, workers: Optional[int] = None, chunksize: Optional[int] = None) -> None:
+        """
+        workers: int
+            number of workers (default: `os.cpu_count()`)
+        chunksize: int
+            number of chromosomes sent to a worker at once (default: a quarter of a worker's share of the batch)
+        """
+        self.workers: int = workers or os.cpu_count() or 1
+        self.chunksize: Optional[int] = chunksize
+        self._pool: Optional[Executor] = None
+
+    @abstractmethod
+    def _start(self) -> Executor:
+        """ Create the pool. """
+
+    def evaluate(self, chromosomes: Sequence[C]) -> list[float]:
+        chromosomes = list(chromosomes)
+        if len(chromosomes) <= 1:
+            return _fitnesses(chromosomes)
+        if self._pool is None:
+            self._pool = self._start()
+        size: int = self.chunksize or max(1, -(-len(chromosomes) // (4 * self.workers)))
+        chunks: list[list[C]] = [chromosomes[i:i + size] for i in range(0, len(chromosomes), size)]
+        return [fitness for chunk in self._pool.map(_fitnesses, chunks) for fitness in chunk]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class ThreadEvaluator(_PoolEvaluator):
+
+    def _start(self) -> Executor:
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+
+class ProcessEvaluator(_PoolEvaluator):
+
+    def _start(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.workers)
@@ -5,25 +5,49 @@ which gives each chromosome a chance of being picked, proportional to its fitnes
 
 An alternative selection method is tournament selection where a number of
 randomly chosen chromosomes are challenged against one another and that the survivor (i.e. the fittest) is selected.
+Stochastic universal sampling (SUS) is a roulette wheel spun once with as many evenly spaced pointers as parents to pick,
+so that each chromosome is picked a number of times within 1 of its expected share.
+
+The roulette wheel is a table of cumulative fitness built once per generation, in which each spin is a binary search,
+and a tournament keeps its two best participants in one pass, so a generation takes O(n log n) time
+with the roulette wheel and SUS, and O(n k) with tournaments of k participants.
+With `elitism`, the fittest individuals are carried over to the next generation unchanged.
+
+Fitness is evaluated at most once per individual and genotype: each chromosome caches its own fitness
+until it mutates or is born from a crossover, and the fitness of the last `memo_size` genotypes evaluated is memoized,
+so that duplicates (e.g. parents copied into the next generation) cost a dictionary lookup.
+`evaluations` records the number of calls to `fitness()` made in each generation.
+
+Each generation is evaluated in a single batch, made of one individual per genotype to evaluate,
+by an `evaluators.Evaluator`, which can spread it over threads or processes.
 """
 from typing import *
+from collections import OrderedDict
+from copy import deepcopy
 from enum import Enum
-from random import choices, random
+from heapq import nlargest, nsmallest
+from itertools import accumulate
+from random import choices, random, shuffle
 from statistics import mean
 
 from chromosome import Chromosome
+from evaluators import Evaluator, SerialEvaluator
 
 C = TypeVar('C', bound='Chromosome') # type of chromosomes
 
 
 class GeneticAlgorithm(Generic[C]):
-    SelectionType = Enum('SelectionType', ['ROULETTE', 'TOURNAMENT'])
+    SelectionType = Enum('SelectionType', ['ROULETTE', 'TOURNAMENT', 'SUS'])
     
     def __init__(self, initial_pop: list[C], threshold: float,
                  max_gen: int = 100,
                  mutate_prob: float = 0.01,
                  xover_prob: float = 0.7,
-                 selection_type: SelectionType = SelectionType.TOURNAMENT) -> None:
+                 selection_type: SelectionType = SelectionType.TOURNAMENT,
+                 tournament_size: Optional[int] = None,
+                 elitism: int = 0,
+                 memo_size: int = 10_000,
+                 evaluator: Optional[Evaluator] = None) -> None:
         """
         initial_pop: list[C]
             the first generation of chromosomes
@@ -42,25 +66,119 @@ class GeneticAlgorithm(Generic[C]):
             otherwise, the children are just duplicates of their parents
         
         selection_type: SelectionType
-            the type of selection type used
+            the type of selection type used (ROULETTE and SUS need non-negative fitness)
+        
+        tournament_size: int
+            number of participants in each tournament, at least 2 since the two best become parents
+            (default: half the population, or 2 if that is fewer)
+        
+        elitism: int
+            number of the fittest individuals copied unchanged into the next generation
+        
+        memo_size: int
+            number of genotypes whose fitness is remembered, the least recently used being forgotten first
+            (0 disables the memo; chromosomes still cache their own fitness)
+        
+        evaluator: Evaluator
+            computes the fitness of each generation (default: `SerialEvaluator()`);
+            see `evaluators.ThreadEvaluator` and `evaluators.ProcessEvaluator`
         """
         
+        if tournament_size is not None and tournament_size < 2:
+            raise ValueError(f'tournament_size must be at least 2 to pick two parents, not {tournament_size}')
         self._population: list[C] = initial_pop
         self._threshold: float = threshold
         self._max_gen: int = max_gen
         self._mutate_prob: float = mutate_prob
         self._xover_prob: float = xover_prob
         self._selection_type: GeneticAlgorithm.SelectionType = selection_type
-        self._fitness_key: Callable = type(self._population[0]).fitness
-        
+        self._tournament_size: Optional[int] = tournament_size
+        self._elitism: int = elitism
+        self._memo_size: int = memo_size
+        self._memo: OrderedDict[Hashable, float] = OrderedDict()	# fitness by genotype, least recently used first
+        self.evaluations: list[int] = []	# calls to `fitness()` in each generation, the initial population being generation 0
+        self._evaluator: Evaluator = evaluator or SerialEvaluator()
+    
+    def _recall(self, individual: C) -> Optional[Hashable]:
+        """
+        Give `individual` its fitness from the memo if possible.
+        Otherwise return the genotype to remember its fitness by (None if it has none, or the memo is disabled).
+        """
+        key: Optional[Hashable] = individual.genotype() if self._memo_size > 0 else None
+        if key is not None:
+            fitness: Optional[float] = self._memo.get(key)
+            if fitness is not None:
+                self._memo.move_to_end(key)
+                individual._fitness = fitness
+        return key
+    
+    def _remember(self, key: Optional[Hashable], fitness: float) -> None:
+        if key is not None:
+            self._memo[key] = fitness
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+    
+    def _fitness(self, individual: C) -> float:
+        """ Return the fitness of `individual`, from its cache or the memo if possible. """
+        if individual._fitness is None:
+            key: Optional[Hashable] = self._recall(individual)
+            if individual._fitness is None:
+                individual.cached_fitness()
+                self.evaluations[-1] += 1
+                self._remember(key, individual._fitness)
+        return individual._fitness
+    
+    def _evaluate_population(self) -> None:
+        """ Evaluate the individuals of the population that are neither cached nor memoized, in one batch of the evaluator. """
+        by_genotype: dict[Hashable, list[C]] = {}	# individuals sharing a genotype are evaluated once
+        anonymous: list[C] = []
+        for individual in self._population:
+            if individual._fitness is None:
+                key: Optional[Hashable] = self._recall(individual)
+                if individual._fitness is not None:
+                    continue
+                if key is None:
+                    anonymous.append(individual)
+                else:
+                    by_genotype.setdefault(key, []).append(individual)
+        batch: list[C] = [twins[0] for twins in by_genotype.values()] + anonymous
+        if not batch:
+            return
+        fitnesses: list[float] = self._evaluator.evaluate(batch)
+        self.evaluations[-1] += len(batch)
+        for (key, twins), fitness in zip(by_genotype.items(), fitnesses):
+            for individual in twins:
+                individual._fitness = fitness
+            self._remember(key, fitness)
+        for individual, fitness in zip(anonymous, fitnesses[len(by_genotype):]):
+            individual._fitness = fitness
+    
+    def _wheel(self) -> list[float]:
+        """ Return the cumulative fitness of the population, the table of the roulette wheel and SUS. """
+        return list(accumulate(self._fitness(x) for x in self._population))
+    
     def _pick_roulette(self, wheel: list[float]) -> tuple[C, C]:
-        """ Use the probability distribution wheel to pick two parents """
-        return tuple(choices(self._population, weights=wheel, k=2))
+        """ Use the cumulative probability distribution wheel to pick two parents, each by binary search """
+        return tuple(choices(self._population, cum_weights=wheel, k=2))
+    
+    def _pick_sus(self, wheel: list[float], n: int) -> list[C]:
+        """ Pick `n` parents with `n` evenly spaced pointers on the cumulative wheel, in random order. """
+        step: float = wheel[-1] / n
+        pointer: float = random() * step
+        picked: list[C] = []
+        i: int = 0
+        for _ in range(n):
+            while i < len(wheel) - 1 and wheel[i] <= pointer:
+                i += 1
+            picked.append(self._population[i])
+            pointer += step
+        shuffle(picked)
+        return picked
     
     def _pick_tournament(self, n: int) -> tuple[C, C]:
         """ Choose `n` chromosomes at random and take the two best. """
         participants: list[C] = choices(self._population, k=n)
-        return tuple(sorted(participants, key=self._fitness_key, reverse=True)[:2])
+        return tuple(nlargest(2, participants, key=self._fitness))	# like a stable sort, in one pass
     
     def _reproduce_and_replace(self) -> None:
         """
@@ -70,51 +188,96 @@ class GeneticAlgorithm(Generic[C]):
         until there are as many elements as `_population`.
         
         The steps are:
+            0. Copies of the `_elitism` fittest individuals are added to `new_pop`.
             1. Two chrosomes (`parents`) are selected for reproduction.
             2. The parents will cross over with probability `_xover_prob`.
                 If there is no cross over, just add the parents to `new_pop`.
             3. Repeat steps 2 and 3 until `new_pop` is filled up.
         """
-        new_pop: list[C] = []
+        size: int = len(self._population)
+        new_pop: list[C] = [deepcopy(x) for x in nlargest(self._elitism, self._population, key=self._fitness)]
         
-        while len(new_pop) < len(self._population):
+        if self._selection_type == GeneticAlgorithm.SelectionType.TOURNAMENT:
+            tournament_size: int = self._tournament_size or max(2, size // 2)
+        else:
+            wheel: list[float] = self._wheel()
+            if self._selection_type == GeneticAlgorithm.SelectionType.SUS:
+                sampled: list[C] = self._pick_sus(wheel, 2 * -(-(size - len(new_pop)) // 2))
+        
+        while len(new_pop) < size:
             if self._selection_type == GeneticAlgorithm.SelectionType.ROULETTE:
-                parents: tuple[C, C] = \
-                    self._pick_roulette(
-                        [x.fitness() for x in self._population]
-                    )
+                parents: tuple[C, C] = self._pick_roulette(wheel)
+            elif self._selection_type == GeneticAlgorithm.SelectionType.SUS:
+                parents = sampled.pop(), sampled.pop()
             else:
-                parents = self._pick_tournament(len(self._population)//2)
+                parents = self._pick_tournament(tournament_size)
             
             if random() < self._xover_prob:
                 new_pop.extend(parents[0].crossover(parents[1]))
             else:
                 new_pop.extend(parents)
         
-        if len(new_pop) > len(self._population):
-            new_population.pop()	# remove 1 extra if population size is an odd number
+        if len(new_pop) > size:
+            new_pop.pop()	# remove 1 extra if population size is an odd number
         
         self._population = new_pop
             
     def _mutate(self) -> None:
-        """ Mutate each individual """
-        for individual in self._population:
+        """ Mutate each individual but the elite """
+        for individual in self._population[self._elitism:]:
             if random() < self._mutate_prob:
                 individual.mutate()
     
+    def _best(self) -> tuple[C, float]:
+        """
+        Return a copy of the fittest individual of the population and its fitness
+        (a copy, since the individual itself may mutate in a later generation).
+        """
+        best: C = max(self._population, key=self._fitness)
+        return deepcopy(best), self._fitness(best)
+    
+    def _mean_fitness(self) -> float:
+        return mean(self._fitness(x) for x in self._population)
+    
+    def _start(self) -> tuple[C, float]:
+        """ Evaluate the initial population and return its best individual and fitness. """
+        self.evaluations.append(0)
+        self._evaluate_population()
+        return self._best()
+    
+    def _step(self) -> tuple[C, float]:
+        """ Breed the next generation and return its best individual and fitness. """
+        self.evaluations.append(0)
+        self._reproduce_and_replace()
+        self._mutate()
+        self._evaluate_population()
+        return self._best()
+    
+    def emigrants(self, k: int) -> list[C]:
+        """ Return copies of the `k` fittest individuals. """
+        return [deepcopy(individual) for individual in nlargest(k, self._population, key=self._fitness)]
+    
+    def immigrate(self, immigrants: list[C]) -> None:
+        """ Replace the least fit individuals with `immigrants`. """
+        worst: list[int] = nsmallest(
+            len(immigrants), range(len(self._population)), key=lambda i: self._fitness(self._population[i])
+        )
+        for i, immigrant in zip(worst, immigrants):
+            self._population[i] = immigrant
+        self._evaluate_population()
+    
     def run(self) -> C:
         """ Run the genetic algorithm for `max_gen` iterations and return the best individual found. """
-        best: C = max(self._population, key=self._fitness_key)
+        best, best_fitness = self._start()
         for gen in range(self._max_gen):
             
-            if best.fitness() >= self._threshold:
+            if best_fitness >= self._threshold:
                 return best	# exit early if we beat the threshold
             
-            print(f"Generation {gen} has best fitness {best.fitness()} and average fitness {mean(self._fitness_key(x) for x in self._population)}.")
+            print(f"Generation {gen} has best fitness {best_fitness} and average fitness {self._mean_fitness()} "
+                  f"({self.evaluations[-1]} evaluations).")
             
-            self._reproduce_and_replace()
-            self._mutate()
-            highest: C = max(self._population, key=self._fitness_key)
-            if highest.fitness() > best.fitness():
-                best = highest
-        return best
\ No newline at end of file
+            highest, highest_fitness = self._step()
+            if highest_fitness > best_fitness:
+                best, best_fitness = highest, highest_fitness
+        return best
@@ -0,0 +1,162 @@
+# island_model.py
+"""
+A script running several populations of a genetic algorithm ("islands") side by side in separate processes,
+with the best individuals of each island migrating to another island every few generations.
+
+Islands explore different parts of the search space, which keeps a run from stalling on one local optimum,
+while migration spreads good genes. Every `migration_interval` generations, each island sends copies of its
+`migrants` fittest individuals, which replace the least fit individuals of their destination:
+
+    'ring': island i sends to island i + 1 (and the last one to the first)
+    'random': each island sends to another island picked at random
+
+An island is a `GeneticAlgorithm` (or `ArrayGeneticAlgorithm`) built in its own process by `make_algorithm(seed)`,
+which must be a picklable function (defined at the top level of a module).
+`random` is seeded with the same per-island seed before it is called, and the seeds, like the random topology,
+all derive from `seed`, so a run is reproducible whatever the timing of the processes.
+Each island stops after its `max_gen` generations, and every island stops as soon as one reaches its threshold.
+
+Run it from this directory to evolve four islands of the `list_compression.py` problem:
+```
+python island_model.py
+```
+"""
+from typing import *
+import multiprocessing
+import random
+import time
+from multiprocessing.connection import Connection
+
+import numpy as np
+
+from genetic_algorithm import GeneticAlgorithm
+from list_compression import ListCompression
+
+C = TypeVar('C') # type of individuals
+
+TOPOLOGIES: tuple[str, ...] = ('ring', 'random')
+
+
+def _island(connection: Connection, make_algorithm: Callable[[int], GeneticAlgorithm], seed: int,
+            migration_interval: int, migrants: int) -> None:
+    """
+    Evolve an island by `migration_interval` generations at a time. After each epoch, send the parent process
+    (the best individual so far, its fitness, the emigrants, whether the island is done)
+    and receive the immigrants to take in, or None to stop.
+    """
+    random.seed(seed)
+    algo: GeneticAlgorithm = make_algorithm(seed)
+    best, best_fitness = algo._start()
+    generation: int = 0
+    while True:
+        for _ in range(migration_interval):
+            if best_fitness >= algo._threshold or generation >= algo._max_gen:
+                break
+            highest, highest_fitness = algo._step()
+            generation += 1
+            if highest_fitness > best_fitness:
+                best, best_fitness = highest, highest_fitness
+        done: bool = best_fitness >= algo._threshold or generation >= algo._max_gen
+        connection.send((best, best_fitness, algo.emigrants(migrants), done))
+        batches: Optional[list[Any]] = connection.recv()
+        if batches is None:
+            break
+        for immigrants in batches:
+            algo.immigrate(immigrants)
+    connection.close()
+
+
+def run_islands(make_algorithm: Callable[[int], GeneticAlgorithm],
+                islands: int = 4,
+                migration_interval: int = 10,
+                migrants: int = 2,
+                topology: str = 'ring',
+                seed: int = 0,
+                on_best: Optional[Callable[[C, float, int], None]] = None
+                ) -> tuple[C, float]:
+    """
+    Run `islands` genetic algorithms built by `make_algorithm(seed)` in as many processes, with migrations,
+    and return the best individual found by any of them and its fitness.
+
+    migration_interval: int
+        number of generations between two migrations
+    migrants: int
+        number of individuals each island sends at each migration
+    topology: str
+        'ring' or 'random', see above
+    seed: int
+        seeds the islands and the random topology
+    on_best: Callable
+        called in this process with (individual, fitness, generation) each time the best individual of all the islands
+        improves, generation being that of the last migration (ties go to the lowest island)
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f'Unknown topology {topology!r}, expected one of {TOPOLOGIES}')
+    seeds: list[int] = [
+        int(sequence.generate_state(1)[0]) for sequence in np.random.SeedSequence(seed).spawn(islands)
+    ]
+    rng: random.Random = random.Random(seed)
+    connections: list[Connection] = []
+    processes: list[multiprocessing.Process] = []
+    for island_seed in seeds:
+        ours, theirs = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_island, args=(theirs, make_algorithm, island_seed, migration_interval, migrants), daemon=True
+        )
+        process.start()
+        theirs.close()
+        connections.append(ours)
+        processes.append(process)
+
+    best: Optional[C] = None
+    best_fitness: float = float('-inf')
+    generation: int = 0
+    try:
+        while True:
+            reports: list[tuple[C, float, Any, bool]] = [connection.recv() for connection in connections]
+            for island_best, island_fitness, _, _ in reports:
+                if island_fitness > best_fitness:
+                    best, best_fitness = island_best, island_fitness
+                    if on_best is not None:
+                        on_best(best, best_fitness, generation)
+            if any(done for *_, done in reports):
+                break
+            generation += migration_interval
+
+            batches: list[list[Any]] = [[] for _ in range(islands)]
+            for source, (_, _, emigrants, _) in enumerate(reports):
+                if islands > 1:
+                    if topology == 'ring':
+                        destination: int = (source + 1) % islands
+                    else:
+                        destination = rng.choice([island for island in range(islands) if island != source])
+                    batches[destination].append(emigrants)
+            for connection, immigrants in zip(connections, batches):
+                connection.send(immigrants)
+    finally:
+        for connection in connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass	# the island is already gone
+            connection.close()
+        for process in processes:
+            process.join()
+    return best, best_fitness
+
+
+def _list_compression(seed: int) -> GeneticAlgorithm:
+    population: list[ListCompression] = [ListCompression.random_instance() for _ in range(250)]
+    return GeneticAlgorithm(population, threshold=1.0, max_gen=100, mutate_prob=0.2, xover_prob=0.7)
+
+
+if __name__ == '__main__':
+
+    from rich import print
+
+    def report(best: ListCompression, fitness: float, generation: int) -> None:
+        print(f'generation {generation}: {best}')
+
+    start: float = time.perf_counter()
+    best, fitness = run_islands(_list_compression, islands=4, migration_interval=10, migrants=2, seed=0, on_best=report)
+    print(f'4 islands of 250: {best} in {time.perf_counter() - start:.2f} s')
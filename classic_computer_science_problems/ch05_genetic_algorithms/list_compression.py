@@ -60,6 +60,9 @@ class ListCompression(Chromosome):
         """ Lower the bytes size, the closer to 1, the more fit. """
         return 1 / self.bytes_compressed
     
+    def genotype(self) -> tuple[T, ...]:
+        return tuple(self.mylist)
+    
     @classmethod
     def random_instance(cls) -> 'ListCompression':
         """ Randomlly shuffle `PEOPLE`. """
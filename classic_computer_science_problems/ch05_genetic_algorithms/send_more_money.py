@@ -10,6 +10,8 @@ from typing import *
 import random
 from copy import deepcopy
 
+import numpy as np
+
 from rich import print
 
 from chromosome import Chromosome
@@ -47,6 +49,9 @@ class SendMoreMoney(Chromosome):
         diff: int = abs(money - (send + more))
         return 1 / (diff + 1)
     
+    def genotype(self) -> tuple[str, ...]:
+        return tuple(self.letters)
+    
     @classmethod
     def random_instance(cls) -> 'SendMoreMoney':
         letters = list(LETTERS)
@@ -79,6 +84,20 @@ class SendMoreMoney(Chromosome):
         send, more, money = self.substitute()
         diff: int = abs(money - (send + more))
         return f"{money} - ({send} + {more}) = {diff}"
+
+
+
+def send_more_money_fitness(genes: np.ndarray) -> np.ndarray:
+    """
+    The fitness of `SendMoreMoney` for each row of `genes`, a permutation of the indices of `LETTERS`
+    whose position is the digit of the letter (for `array_population.ArrayGeneticAlgorithm`).
+    """
+    digits: np.ndarray = genes.argsort(axis=1).astype(np.int64)	# digits[:, i] is the digit of LETTERS[i]
+    s, e, n, d, m, o, r, y = (digits[:, LETTERS.index(letter)] for letter in 'SENDMORY')
+    send: np.ndarray = 1000 * s + 100 * e + 10 * n + d
+    more: np.ndarray = 1000 * m + 100 * o + 10 * r + e
+    money: np.ndarray = 10_000 * m + 1000 * o + 100 * n + 10 * e + y
+    return 1 / (np.abs(money - (send + more)) + 1)
         
         
 if __name__ == '__main__':
@@ -60,6 +60,8 @@ from typing import *
 from random import randrange, random
 from copy import deepcopy
 
+import numpy as np
+
 from rich import print
 
 from chromosome import Chromosome
@@ -75,6 +77,9 @@ class SimpleEquation(Chromosome):
         yield self.x
         yield self.y
     
+    def genotype(self) -> tuple[int, int]:
+        return self.x, self.y
+    
     def fitness(self) -> float:
         return (6 * self.x) - (self.x * self.x) + (4 * self.y) - (self.y * self.y)
     
@@ -107,6 +112,12 @@ class SimpleEquation(Chromosome):
         return f"X: {self.x} Y: {self.y} Fitness: {self.fitness()}"
     
 
+def equation_fitness(genes: np.ndarray) -> np.ndarray:
+    """ The fitness of `SimpleEquation` for each (x, y) row of `genes` (for `array_population.ArrayGeneticAlgorithm`). """
+    x, y = genes[:, 0], genes[:, 1]
+    return (6 * x) - (x * x) + (4 * y) - (y * y)
+
+
 if __name__ == '__main__':
     
     
@@ -0,0 +1,257 @@
+# test_genetic_algorithm.py
+"""
+A pytest script testing the fitness caching and the evaluators of `GeneticAlgorithm` on the chromosomes of this chapter.
+"""
+import unittest
+import random
+from typing import *
+
+import numpy as np
+
+from genetic_algorithm import GeneticAlgorithm
+from evaluators import SerialEvaluator, ThreadEvaluator, ProcessEvaluator
+from array_population import ArrayGeneticAlgorithm, rowwise
+from island_model import run_islands
+from benchmark_ga import PerPairRouletteAlgorithm
+from simple_equation import SimpleEquation, equation_fitness
+from send_more_money import SendMoreMoney, LETTERS, send_more_money_fitness
+from list_compression import ListCompression
+
+
+class CountingEquation(SimpleEquation):
+    """ A `SimpleEquation` counting the calls to `fitness()`. """
+
+    calls: int = 0
+
+    def fitness(self) -> float:
+        CountingEquation.calls += 1
+        return super().fitness()
+
+
+def send_more_money_island(seed: int) -> GeneticAlgorithm:
+    population = [SendMoreMoney.random_instance() for _ in range(60)]
+    return GeneticAlgorithm(population, threshold=2.0, max_gen=12, mutate_prob=0.2)
+
+
+def array_island(seed: int) -> ArrayGeneticAlgorithm:
+    population = np.random.default_rng(seed).permuted(np.tile(np.arange(len(LETTERS)), (60, 1)), axis=1)
+    return ArrayGeneticAlgorithm(population, send_more_money_fitness, threshold=2.0, max_gen=12,
+                                 mutate_prob=0.2, permutation=True, seed=seed)
+
+
+def fitness_of(individual) -> float:
+    return individual.fitness()
+
+
+class FitnessCacheTests(unittest.TestCase):
+
+    """ Tests for the cached fitness of `Chromosome` and the genotype memo of `GeneticAlgorithm`. """
+
+    def test_invalidation(self):
+        """ Mutating a chromosome or crossing it over makes its fitness (or its children's) be computed again. """
+        random.seed(0)
+        for chromosome_type in (SimpleEquation, SendMoreMoney, ListCompression):
+            parent1, parent2 = chromosome_type.random_instance(), chromosome_type.random_instance()
+            parent1.cached_fitness(), parent2.cached_fitness()
+            for child in parent1.crossover(parent2):
+                self.assertIsNone(child._fitness)
+                self.assertEqual(child.cached_fitness(), child.fitness())
+            for _ in range(5):
+                parent1.mutate()
+                self.assertIsNone(parent1._fitness)
+                self.assertEqual(parent1.cached_fitness(), parent1.fitness())
+
+    def test_evaluations(self):
+        """ Each genotype is evaluated once while it stays in the memo, and `evaluations` counts every call. """
+        random.seed(1)
+        CountingEquation.calls = 0
+        population = [CountingEquation(random.randrange(100), random.randrange(100)) for _ in range(50)]
+        algo = GeneticAlgorithm(population, threshold=14.0, max_gen=30, mutate_prob=0.3, xover_prob=0.3)
+        best = algo.run()
+        self.assertEqual(sum(algo.evaluations), CountingEquation.calls)
+        self.assertLessEqual(algo.evaluations[0], 50)
+        self.assertEqual(len(algo.evaluations), 31)
+        self.assertLess(sum(algo.evaluations[1:]), 50 * 30)
+        self.assertEqual(algo._fitness(best), best.fitness())
+
+    def test_memo_eviction(self):
+        """ The memo keeps at most `memo_size` genotypes, forgetting the least recently used. """
+        population = [CountingEquation(x, 0) for x in range(5)]
+        algo = GeneticAlgorithm(population, threshold=13.0, memo_size=3)
+        algo.evaluations.append(0)
+        for individual in population:
+            algo._fitness(individual)
+        self.assertEqual(list(algo._memo), [(2, 0), (3, 0), (4, 0)])
+        twin = CountingEquation(3, 0)
+        algo._fitness(twin)
+        self.assertEqual(algo.evaluations, [5])
+        self.assertEqual(list(algo._memo), [(2, 0), (4, 0), (3, 0)])
+        algo._fitness(CountingEquation(0, 0))
+        self.assertEqual(algo.evaluations, [6])
+        self.assertNotIn((2, 0), algo._memo)
+
+
+
+class EvaluatorTests(unittest.TestCase):
+
+    """ Tests for the serial, thread and process evaluators. """
+
+    def test_batches(self):
+        """ Every evaluator returns the fitnesses in order, whatever the chunk size. """
+        random.seed(2)
+        chromosomes = [ListCompression.random_instance() for _ in range(50)]
+        expected = [chromosome.fitness() for chromosome in chromosomes]
+        for evaluator in (SerialEvaluator(), ThreadEvaluator(2), ProcessEvaluator(2), ProcessEvaluator(2, chunksize=7)):
+            with evaluator:
+                self.assertEqual(evaluator.evaluate(chromosomes), expected)
+                self.assertEqual(evaluator.evaluate(chromosomes[:1]), expected[:1])
+
+    def test_same_run(self):
+        """ Under the same seed, a run is the same with every evaluator. """
+        runs = []
+        for evaluator in (SerialEvaluator(), ThreadEvaluator(2), ProcessEvaluator(2)):
+            random.seed(3)
+            population = [SendMoreMoney.random_instance() for _ in range(200)]
+            with evaluator:
+                algo = GeneticAlgorithm(population, threshold=2.0, max_gen=10, mutate_prob=0.2,
+                                        selection_type=GeneticAlgorithm.SelectionType.ROULETTE, evaluator=evaluator)
+                best = algo.run()
+            runs.append((best.genotype(), algo.evaluations))
+        self.assertEqual(runs[1], runs[0])
+        self.assertEqual(runs[2], runs[0])
+
+
+
+class ArrayPopulationTests(unittest.TestCase):
+
+    """ Tests for `ArrayGeneticAlgorithm`. """
+
+    def test_vectorized_fitness(self):
+        """ The vectorized fitness functions agree with the chromosomes. """
+        random.seed(4)
+        equations = [SimpleEquation.random_instance() for _ in range(20)]
+        self.assertEqual(list(equation_fitness(np.array([list(e) for e in equations]))), [e.fitness() for e in equations])
+        words = [SendMoreMoney.random_instance() for _ in range(20)]
+        genes = []
+        for word in words:
+            blanks = iter([8, 9])	# the indices of the two blanks of `LETTERS`
+            genes.append([LETTERS.index(letter) if letter else next(blanks) for letter in word.letters])
+        self.assertEqual(list(send_more_money_fitness(np.array(genes))), [word.fitness() for word in words])
+
+    def test_operators(self):
+        """ Permutations stay permutations, integer genes stay within bounds, and a seed makes runs reproducible. """
+        rng = np.random.default_rng(5)
+        runs = []
+        population = rng.permuted(np.tile(np.arange(len(LETTERS)), (301, 1)), axis=1)
+        for _ in range(2):
+            algo = ArrayGeneticAlgorithm(population, send_more_money_fitness, threshold=2.0, max_gen=10,
+                                         mutate_prob=0.5, permutation=True, seed=6)
+            runs.append(algo.run().tolist())
+            self.assertEqual(algo._population.shape, (301, len(LETTERS)))
+            self.assertTrue((np.sort(algo._population, axis=1) == np.arange(len(LETTERS))).all())
+            self.assertEqual(algo.evaluations, [301] * 11)
+        self.assertEqual(runs[0], runs[1])
+        for selection_type in GeneticAlgorithm.SelectionType:
+            algo = ArrayGeneticAlgorithm(rng.integers(100, size=(200, 2)), rowwise(lambda row: 50 + equation_fitness(row[None])[0] / 1000),
+                                         threshold=100.0, max_gen=20, mutate_prob=0.9, selection_type=selection_type,
+                                         low=0, high=100, seed=7)
+            best = algo.run()
+            self.assertTrue(((algo._population >= 0) & (algo._population < 100)).all())
+            self.assertEqual(algo._best()[1], max(50 + equation_fitness(algo._population) / 1000))
+            self.assertEqual(len(best), 2)
+
+
+
+class IslandModelTests(unittest.TestCase):
+
+    """ Tests for `run_islands`. """
+
+    def test_reproducible(self):
+        """ The same seed gives the same progress of the best individual, with both topologies and both populations. """
+        for make_algorithm in (send_more_money_island, array_island):
+            for topology in ('ring', 'random'):
+                runs = []
+                for _ in range(2):
+                    progress = []
+                    best, fitness = run_islands(
+                        make_algorithm, islands=3, migration_interval=4, migrants=2, topology=topology, seed=8,
+                        on_best=lambda individual, fitness, generation: progress.append((fitness, generation))
+                    )
+                    runs.append(progress)
+                    self.assertEqual(progress[-1][0], fitness)
+                    if make_algorithm is array_island:
+                        self.assertEqual(fitness, send_more_money_fitness(best[None])[0])
+                    else:
+                        self.assertEqual(fitness, best.fitness())
+                self.assertEqual(runs[0], runs[1])
+                self.assertTrue(all(generation % 4 == 0 for _, generation in runs[0]))
+        with self.assertRaises(ValueError):
+            run_islands(send_more_money_island, topology='star')
+
+
+
+class SelectionTests(unittest.TestCase):
+
+    """ Tests for the selection operators and elitism. """
+
+    def test_same_picks(self):
+        """ The cumulative wheel and the one-pass tournament pick the same parents as the per-pair wheel and a full sort. """
+        random.seed(9)
+        population = [SendMoreMoney.random_instance() for _ in range(100)]
+        before = PerPairRouletteAlgorithm(population, 2.0, selection_type=GeneticAlgorithm.SelectionType.ROULETTE)
+        after = GeneticAlgorithm(population, 2.0, selection_type=GeneticAlgorithm.SelectionType.ROULETTE)
+        for algo in (before, after):
+            algo.evaluations.append(0)
+        wheel = after._wheel()
+        for seed in range(20):
+            random.seed(seed)
+            expected = before._pick_roulette(wheel)
+            random.seed(seed)
+            self.assertEqual(after._pick_roulette(wheel), expected)
+            random.seed(seed)
+            participants = random.choices(population, k=30)
+            random.seed(seed)
+            self.assertEqual(after._pick_tournament(30), tuple(sorted(participants, key=fitness_of, reverse=True)[:2]))
+
+    def test_tournament_size(self):
+        """ Tournaments need two participants, which small populations get by default. """
+        population = [SimpleEquation(x, 0) for x in range(1, 4)]
+        with self.assertRaises(ValueError):
+            GeneticAlgorithm(population, 14.0, tournament_size=1)
+        with self.assertRaises(ValueError):
+            ArrayGeneticAlgorithm(np.array([[x, 0] for x in range(1, 4)]), equation_fitness, 14.0, tournament_size=1)
+        random.seed(14)
+        algo = GeneticAlgorithm(population, 14.0, max_gen=5)
+        algo.run()
+        self.assertEqual(len(algo._population), 3)
+
+    def test_sus(self):
+        """ SUS picks each individual a number of times within 1 of its expected share. """
+        random.seed(10)
+        population = [SimpleEquation(x, 0) for x in range(1, 6)]	# fitness 5, 8, 9, 8, 5
+        algo = GeneticAlgorithm(population, 14.0, selection_type=GeneticAlgorithm.SelectionType.SUS)
+        algo.evaluations.append(0)
+        for _ in range(20):
+            picked = algo._pick_sus(algo._wheel(), 70)
+            for individual in population:
+                self.assertLessEqual(abs(picked.count(individual) - 70 * individual.fitness() / 35), 1)
+
+    def test_elitism(self):
+        """ With elitism, the best fitness of the population never decreases, with objects and arrays. """
+        for selection_type in GeneticAlgorithm.SelectionType:
+            random.seed(11)
+            population = [SendMoreMoney.random_instance() for _ in range(40)]
+            algo = GeneticAlgorithm(population, 2.0, mutate_prob=0.9, selection_type=selection_type,
+                                    tournament_size=4, elitism=2)
+            fitnesses = [algo._start()[1]] + [algo._step()[1] for _ in range(15)]
+            self.assertEqual(fitnesses, sorted(fitnesses))
+            genes = np.random.default_rng(12).permuted(np.tile(np.arange(len(LETTERS)), (41, 1)), axis=1)
+            array_algo = ArrayGeneticAlgorithm(genes, send_more_money_fitness, 2.0, mutate_prob=0.9,
+                                               selection_type=selection_type, elitism=2, permutation=True, seed=13)
+            fitnesses = [array_algo._start()[1]] + [array_algo._step()[1] for _ in range(15)]
+            self.assertEqual(fitnesses, sorted(fitnesses))
+            self.assertEqual(array_algo._population.shape, (41, len(LETTERS)))
+
+
+if __name__ == '__main__':
+    unittest.main()